@@ -0,0 +1,292 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from bitsets import row_mask
+from evaluation import BoardEvaluator, measure_throughput
+from grid import Grid
+from sampler import PieceSampler
+from shape_generation import ShapeGenerator, iter_polyominoes, has_holes
+from shapes import as_shape
+from simulator import BatchSimulator
+from solver import Solver
+from tetromino_functionality import Tetromino
+
+SEED = 1234
+# Benchmarks are flagged as a regression when slower by more than this fraction
+DEFAULT_THRESHOLD = 0.10
+# Board sides of the scaling benchmark, from one 64-bit word up to 64 packed rows
+SCALING_SIZES = (8, 10, 16, 32, 64)
+
+
+def board_fixtures(count: int = 16, size: int = 8, seed: int = SEED) -> List[List[List[int]]]:
+    """
+    Reproducible half-filled boards, with one full row and one full column every other board
+    so line clears have work to do.
+    """
+    rng = random.Random(seed)
+    boards = []
+    for index in range(count):
+        rows = [[int(rng.random() < 0.45) for _ in range(size)] for _ in range(size)]
+        if index % 2 == 0:
+            rows[rng.randrange(size)] = [1] * size
+            column = rng.randrange(size)
+            for row in rows:
+                row[column] = 1
+        boards.append(rows)
+    return boards
+
+
+def hotbar_fixtures(count: int = 16, seed: int = SEED) -> List[List[List[List[int]]]]:
+    """
+    Reproducible three-piece hotbars drawn from the sorted shape catalog.
+    """
+    rng = random.Random(seed)
+    shapes = [ShapeGenerator.bitmask_to_2D(bitmask) for bitmask in sorted(ShapeGenerator().unique_shapes)]
+    return [[rng.choice(shapes) for _ in range(3)] for _ in range(count)]
+
+
+def evaluation_fixtures(count: int = 4096, size: int = 8, seed: int = SEED) -> np.ndarray:
+    """
+    Reproducible candidate boards for batch evaluation, about a quarter filled; packed
+    (count, size) row words when a board does not fit in 64 bits, as BoardEvaluator expects.
+    """
+    rng = np.random.default_rng(seed)
+    packed = size * size > 64
+    full_mask = row_mask(size) if packed else np.uint64((1 << size * size) - 1)
+    shape = (count, size) if packed else count
+    draw = lambda: rng.integers(0, 2 ** 64, size=shape, dtype=np.uint64)
+    return draw() & draw() & full_mask
+
+
+def measure(func: Callable[[], object], calls: int, repeat: int) -> Dict[str, float]:
+    """
+    Time func and report the best of repeat runs of calls calls.
+    """
+    best = min(timeit.repeat(func, number=calls, repeat=repeat))
+    return {'seconds_per_call': best / calls, 'calls': calls, 'repeat': repeat}
+
+
+def build_benchmarks(size: int = 8) -> Dict[str, Tuple[Callable[[], object], int]]:
+    """
+    Every benchmark as name -> (zero-argument callable, calls per timing run).
+
+    Each callable covers the whole fixture set, so results are per fixture sweep.
+    """
+    boards = board_fixtures(size=size)
+    grids = [Grid.from_rows(rows) for rows in boards]
+    hotbars = hotbar_fixtures()
+    raw_shapes = {bitmask for bitmask in iter_polyominoes(3) if not has_holes(bitmask)}
+    shape_gen = ShapeGenerator()
+    tetrominoes = [Tetromino(hotbar[0], 0, 0, hotbar) for hotbar in hotbars]
+    shape_tetrominoes = [Tetromino(as_shape(hotbar[0]), 0, 0, hotbar) for hotbar in hotbars]
+    positions = [(x, y) for y in range(-1, size) for x in range(-1, size)]
+    solver = Solver(beam_width=32)
+    evaluator = BoardEvaluator(size)
+    candidate_boards = evaluation_fixtures(size=size)
+
+    def construct_cold():
+        ShapeGenerator(use_cache=False).unique_shapes
+
+    def construct_cached():
+        ShapeGenerator.clear_catalog_cache()
+        ShapeGenerator().unique_shapes
+
+    def canonical_forms():
+        for bitmask in range(1, 2 ** 9):
+            ShapeGenerator.get_canonical_form(bitmask)
+
+    def filter_isomorphic():
+        shape_gen.filter_isomorphic_shapes(raw_shapes)
+
+    def valid_moves(targets, pieces=tetrominoes):
+        def run():
+            for tetromino, target in zip(pieces, targets):
+                for x, y in positions:
+                    tetromino.is_valid_move(tetromino.shape, x, y, target)
+        return run
+
+    def line_clears_lists():
+        for tetromino, rows in zip(tetrominoes, boards):
+            tetromino.handle_line_clears([list(row) for row in rows])
+
+    def line_clears_grid():
+        for tetromino, grid in zip(tetrominoes, grids):
+            copy = Grid(grid.size)
+            copy.board = grid.board
+            tetromino.handle_line_clears(copy)
+
+    def game_over(targets):
+        def run():
+            for tetromino, target in zip(tetrominoes, targets):
+                tetromino.is_game_over(target)
+        return run
+
+    def solve():
+        for grid, hotbar in zip(grids[:4], hotbars[:4]):
+            solver.solve(grid, hotbar)
+
+    def evaluate_batch():
+        evaluator.evaluate(candidate_boards)
+
+    return {
+        'shape_generator_construction_cold': (construct_cold, 1),
+        'shape_generator_construction_cached': (construct_cached, 5),
+        'get_canonical_form_all_3x3': (canonical_forms, 5),
+        'filter_isomorphic_shapes': (filter_isomorphic, 20),
+        'is_valid_move_lists': (valid_moves(boards), 2),
+        'is_valid_move_grid': (valid_moves(grids), 2),
+        'is_valid_move_grid_shapes': (valid_moves(grids, shape_tetrominoes), 2),
+        'handle_line_clears_lists': (line_clears_lists, 20),
+        'handle_line_clears_grid': (line_clears_grid, 20),
+        'is_game_over_lists': (game_over(boards), 20),
+        'is_game_over_grid': (game_over(grids), 20),
+        'solver_beam32': (solve, 1),
+        'evaluate_batch_4096': (evaluate_batch, 5),
+    }
+
+
+def run_benchmarks(repeat: int = 5, only: List[str] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Run the suite and return name -> timing dict.
+    """
+    results = {}
+    solver_nodes = Solver(beam_width=32)
+    for name, (func, calls) in build_benchmarks().items():
+        if only and not any(pattern in name for pattern in only):
+            continue
+        results[name] = measure(func, calls, repeat)
+
+    # Throughput of the solver itself, not just wall time per sweep
+    if not only or any(pattern in 'solver_beam32' for pattern in only):
+        for grid, hotbar in zip(board_fixtures()[:4], hotbar_fixtures()[:4]):
+            solver_nodes.solve(Grid.from_rows(grid), hotbar)
+        results['solver_beam32']['nodes_per_second'] = solver_nodes.nodes_per_second
+    if 'evaluate_batch_4096' in results:
+        results['evaluate_batch_4096']['boards_per_second'] = measure_throughput(BoardEvaluator(), evaluation_fixtures(), repeat)
+    return results
+
+
+def grid_seconds_per_move(size: int, moves: int, seed: int = SEED) -> float:
+    """
+    Wall time per move of a single Grid game playing the first legal move of every dealt
+    piece, starting over whenever a piece does not fit.
+    """
+    sampler = PieceSampler(seed)
+    grid = Grid((size, size))
+    start = time.perf_counter()
+    for _ in range(moves):
+        move = next(grid.legal_moves([sampler.next_shape()]), None)
+        if move is None:
+            grid = Grid((size, size))
+            continue
+        grid.place_mask(move.mask)
+        grid.row_column_clear()
+    return (time.perf_counter() - start) / moves
+
+
+def board_scaling(sizes=SCALING_SIZES, games: int = 256, moves: int = 20, boards: int = 1024,
+                  seed: int = SEED) -> Dict[int, Dict[str, float]]:
+    """
+    How the cost of a move grows with the board area.
+
+    Per board side: the batch simulator's time per simulated move (packed row bitsets
+    above 64 cells), a single Grid game's time per move and the evaluator's time per
+    scored board.
+    """
+    results = {}
+    for size in sizes:
+        simulator = BatchSimulator(games, size=size, seed=seed)
+        stats = simulator.run(moves)
+        evaluator = BoardEvaluator(size)
+        results[size] = {
+            'cells': size * size,
+            'packed': simulator.packed,
+            'simulator_seconds_per_move': stats.elapsed / stats.moves if stats.moves else 0.0,
+            'grid_seconds_per_move': grid_seconds_per_move(size, games, seed),
+            'evaluate_seconds_per_board': 1 / measure_throughput(evaluator, evaluation_fixtures(boards, size, seed), 3),
+        }
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, float]]:
+    """
+    Compare timings against a saved baseline.
+
+    Returns:
+        One row per benchmark present in both, with the ratio new/old and whether it
+        regressed by more than threshold.
+    """
+    rows = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]['seconds_per_call']
+        new = result['seconds_per_call']
+        ratio = new / old if old > 0 else float('inf')
+        rows.append({'name': name, 'baseline': old, 'current': new, 'ratio': ratio,
+                     'regression': ratio > 1 + threshold})
+    return rows
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark shape generation, placement, clears, game over, evaluation and solving.')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--compare', help='Baseline JSON file to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Allowed slowdown before a benchmark counts as a regression (fraction)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing runs per benchmark, the best is kept')
+    parser.add_argument('--only', nargs='*', help='Only run benchmarks whose name contains one of these')
+    parser.add_argument('--scaling', action='store_true', help='Also measure the cost per move against board area')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.repeat, args.only)
+    scaling = board_scaling() if args.scaling else None
+    report = {
+        'meta': {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'seed': SEED,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    if scaling is not None:
+        report['scaling'] = scaling
+
+    for name, result in results.items():
+        print(f"{name:40s} {result['seconds_per_call'] * 1e6:14.1f} us")
+    if scaling is not None:
+        print()
+        print(f"{'board':>7s} {'cells':>6s} {'simulator/move':>15s} {'grid/move':>12s} {'evaluate/board':>15s}")
+        for size, row in scaling.items():
+            print(f"{size:>3d}x{size:<3d} {row['cells']:6d} {row['simulator_seconds_per_move'] * 1e6:12.2f} us "
+                  f"{row['grid_seconds_per_move'] * 1e6:9.2f} us {row['evaluate_seconds_per_board'] * 1e6:12.2f} us")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)['results']
+        rows = compare(results, baseline, args.threshold)
+        print()
+        for row in rows:
+            flag = 'REGRESSION' if row['regression'] else ''
+            print(f"{row['name']:40s} x{row['ratio']:6.2f} {flag}")
+        if any(row['regression'] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
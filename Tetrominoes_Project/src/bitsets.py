@@ -0,0 +1,134 @@
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from shapes import Shape, catalog_shapes
+
+# A packed board stores one uint64 word per row, so rows can be at most this wide
+MAX_COLUMNS = 64
+
+
+def popcount(values: np.ndarray) -> np.ndarray:
+    """
+    Number of set bits of every element of a uint64 array.
+    """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values).astype(np.int64)
+    values = values - ((values >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    values = (values & np.uint64(0x3333333333333333)) + ((values >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    values = (values + (values >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((values * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.int64)
+
+
+def row_mask(columns: int) -> np.uint64:
+    """
+    Word with the bits of every column of a row set.
+    """
+    return np.uint64((1 << columns) - 1)
+
+
+def pack_rows(boards: Iterable[int], rows: int, columns: int) -> np.ndarray:
+    """
+    Split Grid bitboards (cell (row, col) at bit row * columns + col) into row words.
+
+    Returns:
+        (boards, rows) uint64 array, column col of a row at bit col of its word.
+    """
+    mask = (1 << columns) - 1
+    boards = list(boards)
+    packed = np.zeros((len(boards), rows), dtype=np.uint64)
+    for index, board in enumerate(boards):
+        packed[index] = [(board >> (row * columns)) & mask for row in range(rows)]
+    return packed
+
+
+def unpack_rows(packed: np.ndarray, columns: int) -> List[int]:
+    """
+    Join the row words of every board back into a Grid bitboard.
+    """
+    boards = []
+    for words in np.atleast_2d(packed):
+        board = 0
+        for row, word in enumerate(words.tolist()):
+            board |= word << (row * columns)
+        boards.append(board)
+    return boards
+
+
+def unpack_bits(words: np.ndarray, columns: int) -> np.ndarray:
+    """
+    Expand every word into one boolean per column.
+
+    Returns:
+        Boolean array of shape words.shape + (columns,).
+    """
+    as_bytes = np.ascontiguousarray(words, dtype='<u8').view(np.uint8).reshape(words.shape + (8,))
+    return np.unpackbits(as_bytes, axis=-1, bitorder='little')[..., :columns].astype(bool)
+
+
+class RowLayout(NamedTuple):
+    """
+    A shape normalized to its bounding box, as row words and as cell offsets.
+    """
+    height: int
+    width: int
+    words: Tuple[int, ...]              # One word per bounding-box row, leftmost column at bit 0
+    cells: Tuple[Tuple[int, int], ...]  # (row, column) of every cell inside the bounding box
+
+
+def row_layouts(shapes: Optional[Sequence[Shape]] = None) -> Tuple[RowLayout, ...]:
+    """
+    Row layout of every shape, by id; the 3x3 catalog if shapes is None.
+    """
+    layouts = []
+    for shape in catalog_shapes() if shapes is None else shapes:
+        min_row, min_col, height, width = shape.bounding_box
+        cells = tuple((i - min_row, j - min_col) for i, j in shape.cells)
+        words = [0] * height
+        for i, j in cells:
+            words[i] |= 1 << j
+        layouts.append(RowLayout(height, width, tuple(words), cells))
+    return tuple(layouts)
+
+
+def row_fit_maps(empty: np.ndarray, layout: RowLayout, columns: int) -> np.ndarray:
+    """
+    Grid.fit_map on a batch of packed boards.
+
+    For each shape cell, the empty row words its row offset below the anchor are
+    shifted right by its column and ANDed in, so an anchor survives only if every
+    cell of the shape lands on an empty cell. The batch is taken rows first, so each
+    of these row slices is one contiguous block.
+
+    Args:
+        empty: (rows, boards) uint64 empty-cell row words, i.e. the transposed packed boards.
+        layout: The shape.
+        columns: Number of columns on the board.
+
+    Returns:
+        (rows, boards) uint64 array with bit col of row row set for every valid top-left
+        corner (row, col) of the shape's bounding box.
+    """
+    rows = empty.shape[0]
+    fits = np.zeros_like(empty)
+    anchor_rows = rows - layout.height + 1
+    if anchor_rows <= 0 or layout.width > columns:
+        return fits
+    anchors = fits[:anchor_rows]
+    anchors[:] = np.uint64((1 << (columns - layout.width + 1)) - 1)
+    for i, j in layout.cells:
+        anchors &= empty[i:i + anchor_rows] >> np.uint64(j)
+    return fits
+
+
+def clear_full_lines(boards: np.ndarray, columns: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Grid.clear_lines on a batch of packed boards: every full row and column is removed at once.
+
+    Returns:
+        The cleared (boards, rows) array and the number of lines removed from every board.
+    """
+    full_rows = boards == row_mask(columns)
+    full_columns = np.bitwise_and.reduce(boards, axis=1)
+    lines = full_rows.sum(axis=1) + popcount(full_columns)
+    return np.where(full_rows, np.uint64(0), boards & ~full_columns[:, None]), lines
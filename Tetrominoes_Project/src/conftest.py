@@ -0,0 +1,28 @@
+import os
+import shutil
+import tempfile
+
+_saved_cache_dir = None
+_temp_cache_dir = None
+
+
+def pytest_configure(config):
+    """
+    Point the shape catalog cache at a throwaway directory for the whole run.
+
+    Test modules build catalogs at import time, during collection, so this has to be in
+    place before any of them is imported rather than in a fixture.
+    """
+    global _saved_cache_dir, _temp_cache_dir
+    _saved_cache_dir = os.environ.get('TETROMINOES_CACHE_DIR')
+    _temp_cache_dir = tempfile.mkdtemp(prefix='tetrominoes-cache-')
+    os.environ['TETROMINOES_CACHE_DIR'] = _temp_cache_dir
+
+
+def pytest_unconfigure(config):
+    if _saved_cache_dir is None:
+        os.environ.pop('TETROMINOES_CACHE_DIR', None)
+    else:
+        os.environ['TETROMINOES_CACHE_DIR'] = _saved_cache_dir
+    if _temp_cache_dir is not None:
+        shutil.rmtree(_temp_cache_dir, ignore_errors=True)
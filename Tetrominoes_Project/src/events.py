@@ -0,0 +1,144 @@
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+# Game events emitted by Tetromino
+PLACEMENT = 'placement'          # (tetromino, grid) after a piece was set in place
+LINE_CLEAR = 'line_clear'        # (tetromino, line_clear) after rows or columns were cleared
+GAME_OVER = 'game_over'          # (tetromino, grid) when a piece cannot be set and nothing fits
+EVENTS = (PLACEMENT, LINE_CLEAR, GAME_OVER)
+
+Handler = Callable[..., None]
+
+
+class EventStats:
+    """
+    Instrumentation hook counting every emitted event and summing the time spent in its handlers.
+    """
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+        self.times: Dict[str, float] = {}
+
+    def wrap(self, event: str, dispatch: Optional[Handler]) -> Handler:
+        """
+        Wrap an event's dispatcher so each emit is counted and timed.
+        """
+        counts = self.counts
+        times = self.times
+        counts.setdefault(event, 0)
+        times.setdefault(event, 0.0)
+        clock = time.perf_counter
+
+        def instrumented(*args) -> None:
+            start = clock()
+            if dispatch is not None:
+                dispatch(*args)
+            times[event] += clock() - start
+            counts[event] += 1
+        return instrumented
+
+    def reset(self) -> None:
+        """
+        Zero every count and time, keeping the events known.
+        """
+        for event in self.counts:
+            self.counts[event] = 0
+            self.times[event] = 0.0
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per event: how often it was emitted, total seconds in its handlers and the mean per emit.
+        """
+        return {event: {'count': count, 'seconds': self.times[event],
+                        'mean': self.times[event] / count if count else 0.0}
+                for event, count in self.counts.items()}
+
+
+class EventBus:
+    """
+    Publish/subscribe dispatch of named events.
+
+    Every event maps to one prebuilt dispatcher, rebuilt only when its subscribers
+    change, so emitting is a dict lookup and direct calls of the subscribers. Events
+    nobody subscribed to are ignored. Instrumentation wraps the dispatchers while an
+    EventStats hook is installed; without one nothing is timed or counted.
+    """
+
+    def __init__(self, stats: Optional[EventStats] = None):
+        """
+        Args:
+            stats: Instrumentation hook to install right away.
+        """
+        self.handlers: Dict[str, Tuple[Handler, ...]] = {}
+        self.dispatchers: Dict[str, Handler] = {}
+        self.stats: Optional[EventStats] = None
+        if stats is not None:
+            self.instrument(stats)
+
+    def subscribe(self, event: str, handler: Handler) -> Handler:
+        """
+        Call handler with the event's arguments every time it is emitted, after earlier subscribers.
+
+        Returns:
+            The handler, so subscribe can be used through on() as a decorator.
+        """
+        self.handlers[event] = self.handlers.get(event, ()) + (handler,)
+        self._resolve(event)
+        return handler
+
+    def unsubscribe(self, event: str, handler: Handler) -> None:
+        """
+        Remove one subscription of a handler.
+
+        Raises:
+            ValueError: If the handler is not subscribed to the event.
+        """
+        handlers = list(self.handlers.get(event, ()))
+        handlers.remove(handler)
+        self.handlers[event] = tuple(handlers)
+        self._resolve(event)
+
+    def on(self, event: str) -> Callable[[Handler], Handler]:
+        """
+        Decorator subscribing a function to an event.
+        """
+        return lambda handler: self.subscribe(event, handler)
+
+    def emit(self, event: str, *args) -> None:
+        """
+        Call the subscribers of an event.
+        """
+        dispatch = self.dispatchers.get(event)
+        if dispatch is not None:
+            dispatch(*args)
+
+    def instrument(self, stats: Optional[EventStats]) -> None:
+        """
+        Install an instrumentation hook, or remove it with None.
+
+        The game events are always instrumented, other events once they have a subscriber.
+        """
+        self.stats = stats
+        for event in set(EVENTS) | set(self.handlers) | set(self.dispatchers):
+            self._resolve(event)
+
+    def _resolve(self, event: str) -> None:
+        """
+        Build the dispatcher of one event from its current subscribers.
+        """
+        handlers = self.handlers.get(event, ())
+        if not handlers:
+            dispatch = None
+        elif len(handlers) == 1:
+            dispatch = handlers[0]
+        else:
+            def dispatch(*args) -> None:
+                for handler in handlers:
+                    handler(*args)
+
+        if self.stats is not None and (dispatch is not None or event in EVENTS):
+            dispatch = self.stats.wrap(event, dispatch)
+        if dispatch is None:
+            self.dispatchers.pop(event, None)
+        else:
+            self.dispatchers[event] = dispatch
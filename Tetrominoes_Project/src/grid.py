@@ -1,46 +1,503 @@
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Iterator, List, NamedTuple, Tuple, Optional, TYPE_CHECKING
+
+from shapes import Shape
+
+if TYPE_CHECKING:
+    import numpy as np
+    from tetromino_functionality import Tetromino
+
+
+@lru_cache(maxsize=None)
+def board_masks(rows: int, columns: int) -> Tuple[int, Tuple[int, ...], Tuple[int, ...]]:
+    """
+    Precompute the full-board, row and column masks for a board size.
+
+    Args:
+        rows: Number of rows on the board.
+        columns: Number of columns on the board.
+
+    Returns:
+        A tuple (full_mask, row_masks, column_masks).
+    """
+    full_mask = (1 << (rows * columns)) - 1
+    row_masks = tuple(((1 << columns) - 1) << (r * columns) for r in range(rows))
+    first_column = sum(1 << (r * columns) for r in range(rows))
+    column_masks = tuple(first_column << c for c in range(columns))
+    return full_mask, row_masks, column_masks
+
+
+def shape_key(shape: List[List[int]]) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Hashable rows of a shape; an interned Shape already carries them.
+    """
+    if isinstance(shape, Shape):
+        return shape.rows
+    return tuple(map(tuple, shape))
+
+
+@lru_cache(maxsize=4096)
+def shape_layout(shape: Tuple[Tuple[int, ...], ...], columns: int) -> Optional[Tuple[int, int, int, int, int]]:
+    """
+    Normalize a shape to its bounding box and pack it with the board's row stride.
+
+    Returns:
+        (local_mask, min_row, min_col, height, width), or None for an empty shape.
+    """
+    cells = [(i, j) for i, row in enumerate(shape) for j, cell in enumerate(row) if cell]
+    if not cells:
+        return None
+
+    min_row = min(i for i, _ in cells)
+    min_col = min(j for _, j in cells)
+    height = max(i for i, _ in cells) - min_row + 1
+    width = max(j for _, j in cells) - min_col + 1
+
+    local_mask = 0
+    for i, j in cells:
+        local_mask |= 1 << ((i - min_row) * columns + (j - min_col))
+    return local_mask, min_row, min_col, height, width
+
+
+@lru_cache(maxsize=None)
+def _anchor_mask(rows: int, columns: int, height: int, width: int) -> int:
+    """
+    Bits of every board cell where a height x width bounding box can have its top-left corner.
+    """
+    row_anchors = (1 << (columns - width + 1)) - 1
+    return sum(row_anchors << (r * columns) for r in range(rows - height + 1))
+
+
+@lru_cache(maxsize=4096)
+def _cell_offsets(local_mask: int) -> Tuple[int, ...]:
+    """
+    Bit offsets of the filled cells of a packed shape mask.
+    """
+    return tuple(bit for bit in range(local_mask.bit_length()) if (local_mask >> bit) & 1)
+
+
+@lru_cache(maxsize=4096)
+def fit_layout(shape: Tuple[Tuple[int, ...], ...], rows: int, columns: int) -> Optional[Tuple[int, Tuple[int, ...]]]:
+    """
+    What Grid.fit_map needs to place a shape on a board of the given size.
+
+    Args:
+        shape: Hashable rows of the shape.
+        rows: Number of rows on the board.
+        columns: Number of columns on the board.
+
+    Returns:
+        (anchor mask, cell offsets): the bits of every top-left corner its bounding box can
+        take and the bit offset of each of its cells from that corner, or None if the shape
+        is empty or larger than the board.
+    """
+    layout = shape_layout(shape, columns)
+    if layout is None:
+        return None
+    local_mask, _, _, height, width = layout
+    if height > rows or width > columns:
+        return None
+    return _anchor_mask(rows, columns, height, width), _cell_offsets(local_mask)
+
+
+class LineClear(NamedTuple):
+    """
+    Result of clearing a board: the rows and columns removed together and the combo size.
+    """
+    rows: Tuple[int, ...]
+    columns: Tuple[int, ...]
+    combo: int
+
+
+class Move(NamedTuple):
+    """
+    One placement in a solution: which hotbar slot, where (Tetromino's x, y convention) and its board mask.
+    """
+    hotbar_index: int
+    position: Tuple[int, int]
+    mask: int
+
+
+class MoveArrays(NamedTuple):
+    """
+    Legal moves as parallel NumPy arrays, one entry per move.
+
+    mask is uint64 when the board fits in 64 bits and an object array of Python ints otherwise.
+    """
+    hotbar_index: 'np.ndarray'
+    x: 'np.ndarray'
+    y: 'np.ndarray'
+    mask: 'np.ndarray'
+
 
 class Grid:
     """
-    Class to represent an 8x8 grid.
+    Class to represent the game board as a single occupancy bitboard.
+
+    Cell (row, col) is stored at bit ``row * columns + col`` of ``self.board``, so an 8x8
+    board fits in one 64-bit integer; larger boards are Python's arbitrary-precision
+    integers, which pack the cells into as many machine words as needed behind the same
+    API. Pieces are converted to masks shifted into place,
+    which turns placement checks into one AND and placement commits into one OR.
+
+    Per-row and per-column fill counters are updated with only the cells of each
+    placed piece, so finding the lines to clear after a move costs work proportional
+    to the piece, not to the board.
     """
 
-    def __init__(self, size: Tuple[int, int]):
+    def __init__(self, size: Tuple[int, int] = (8, 8)):
         """
         Initialize an empty grid with a given size.
-        
+
         Parameters:
             size (Tuple[int, int]): Dimensions of the grid (rows, columns).
         """
-        self.grid = [[0 for _ in range(size[1])] for _ in range(size[0])]
+        self.rows, self.columns = size
+        self.size = (self.rows, self.columns)
+        self.full_mask, self.row_masks, self.column_masks = board_masks(self.rows, self.columns)
+        self._board = 0
+        self.row_counts = [0] * self.rows
+        self.column_counts = [0] * self.columns
+        # Lines touched since the last clear, the only ones that can have become full
+        self.dirty_rows = set()
+        self.dirty_columns = set()
+
+    @property
+    def board(self) -> int:
+        """
+        The occupancy bitboard.
+        """
+        return self._board
+
+    @board.setter
+    def board(self, board: int) -> None:
+        # Wholesale assignment: recount every line and recheck all of them on the next clear
+        self._board = board
+        self.row_counts = [(board & mask).bit_count() for mask in self.row_masks]
+        self.column_counts = [(board & mask).bit_count() for mask in self.column_masks]
+        self.dirty_rows = set(range(self.rows))
+        self.dirty_columns = set(range(self.columns))
+
+    @classmethod
+    def from_rows(cls, grid: List[List[int]]) -> 'Grid':
+        """
+        Build a Grid from a list-of-lists board.
+
+        Parameters:
+            grid (List[List[int]]): Board with 1 for filled and 0 for empty cells.
+
+        Returns:
+            Grid: A grid with the same occupancy.
+        """
+        new_grid = cls((len(grid), len(grid[0])))
+        board = 0
+        for i, row in enumerate(grid):
+            for j, cell in enumerate(row):
+                if cell:
+                    board |= 1 << (i * new_grid.columns + j)
+        new_grid.board = board
+        return new_grid
+
+    def to_rows(self) -> List[List[int]]:
+        """
+        Convert the bitboard back to a list-of-lists board.
+        """
+        return [[(self.board >> (i * self.columns + j)) & 1 for j in range(self.columns)]
+                for i in range(self.rows)]
+
+    def mask_for(self, shape: List[List[int]], x: int, y: int) -> Optional[int]:
+        """
+        Compute the board mask of a shape whose top-left corner is at (x, y).
+
+        Parameters:
+            shape (List[List[int]]): 2D array representing the shape.
+            x (int): Column of the shape's top-left corner.
+            y (int): Row of the shape's top-left corner.
+
+        Returns:
+            Optional[int]: The placement mask, or None if a filled cell falls outside the board.
+        """
+        layout = shape_layout(shape_key(shape), self.columns)
+        if layout is None:
+            return None
 
-    def place_tetromino(self, tetromino: Tetromino, position: Tuple[int, int]):
+        local_mask, min_row, min_col, height, width = layout
+        row, col = y + min_row, x + min_col
+        if row < 0 or col < 0 or row + height > self.rows or col + width > self.columns:
+            return None
+        return local_mask << (row * self.columns + col)
+
+    def can_place(self, mask: int) -> bool:
+        """
+        Check whether a placement mask overlaps any filled cell.
+        """
+        return not self._board & mask
+
+    def place_mask(self, mask: int) -> None:
+        """
+        Commit a placement mask to the board and update the counters of the lines it touches.
+
+        Raises:
+            ValueError: If the mask overlaps filled cells, which would corrupt the line counters.
+        """
+        if self._board & mask:
+            raise ValueError("Placement mask overlaps filled cells")
+        self._board |= mask
+        columns = self.columns
+        row_counts, column_counts = self.row_counts, self.column_counts
+        dirty_rows, dirty_columns = self.dirty_rows, self.dirty_columns
+        while mask:
+            low_bit = mask & -mask
+            row, column = divmod(low_bit.bit_length() - 1, columns)
+            row_counts[row] += 1
+            column_counts[column] += 1
+            dirty_rows.add(row)
+            dirty_columns.add(column)
+            mask ^= low_bit
+
+    def place_tetromino(self, tetromino: 'Tetromino', position: Tuple[int, int]) -> bool:
         """
         Places a Tetromino on the grid at the specified position.
-        
+
         Parameters:
             tetromino (Tetromino): The Tetromino to place.
-            position (Tuple[int, int]): The top-left corner position to start placing the Tetromino.
+            position (Tuple[int, int]): The (x, y) top-left corner position to start placing the Tetromino.
+
+        Returns:
+            bool: True if the Tetromino was placed, False if the placement was invalid.
         """
-        # Placement logic here
+        mask = self.mask_for(tetromino.shape, *position)
+        if mask is None or self._board & mask:
+            return False
+        self.place_mask(mask)
+        return True
 
-    def is_valid_placement(self, tetromino: Tetromino, position: Tuple[int, int]) -> bool:
+    def is_valid_placement(self, tetromino: 'Tetromino', position: Tuple[int, int]) -> bool:
         """
         Checks if a Tetromino can be placed at the specified position without overlapping.
-        
+
         Parameters:
             tetromino (Tetromino): The Tetromino to check.
-            position (Tuple[int, int]): The top-left corner position to start placing the Tetromino.
-        
+            position (Tuple[int, int]): The (x, y) top-left corner position to start placing the Tetromino.
+
         Returns:
             bool: True if valid placement, False otherwise.
         """
-        # Validation logic here
+        mask = self.mask_for(tetromino.shape, *position)
+        return mask is not None and not self._board & mask
+
+    def fit_map(self, shape: List[List[int]], board: Optional[int] = None) -> int:
+        """
+        Find every position where a shape fits, all at once.
+
+        Starting from all in-bounds anchors, the empty-cell bitboard is shifted by the
+        offset of each filled cell of the shape and ANDed in, so an anchor survives only
+        if every cell of the shape lands on an empty cell.
+
+        Parameters:
+            shape (List[List[int]]): 2D array representing the shape.
+            board (Optional[int]): Bitboard to check against, defaults to this grid's board.
+
+        Returns:
+            int: Bitboard with a bit set at the top-left cell of the shape's bounding box for
+            every valid placement.
+        """
+        layout = fit_layout(shape_key(shape), self.rows, self.columns)
+        if layout is None:
+            return 0
+        if board is None:
+            board = self.board
+
+        fits, offsets = layout
+        empty = self.full_mask & ~board
+        for offset in offsets:
+            fits &= empty >> offset
+        return fits
+
+    def hotbar_fits(self, hotbar: List[List[List[int]]], board: Optional[int] = None) -> Tuple[bool, List[int]]:
+        """
+        Count the valid placements of every hotbar shape and decide whether the game is over.
+
+        Parameters:
+            hotbar (List[List[List[int]]]): The available shapes.
+            board (Optional[int]): Bitboard to check against, defaults to this grid's board.
+
+        Returns:
+            Tuple[bool, List[int]]: True if no shape fits anywhere, and the number of valid
+            placements of each hotbar shape.
+        """
+        if board is None:
+            board = self.board
+        counts = []
+        seen = {}
+        for shape in hotbar:
+            key = shape_key(shape)
+            count = seen.get(key)
+            if count is None:
+                count = seen[key] = self.fit_map(shape, board).bit_count()
+            counts.append(count)
+        return not any(counts), counts
+
+    def _hotbar_fit_maps(self, hotbar: List[List[List[int]]], board: int) -> Iterator[Tuple[int, int, int, int, int]]:
+        """
+        Fit map and layout of every distinct hotbar shape, as (hotbar index, fits, local mask, min row, min col).
+        Later copies of an identical shape are skipped.
+        """
+        seen = set()
+        for index, shape in enumerate(hotbar):
+            key = shape_key(shape)
+            if key in seen:
+                continue
+            seen.add(key)
+            layout = shape_layout(key, self.columns)
+            if layout is None:
+                continue
+            local_mask, min_row, min_col, _, _ = layout
+            yield index, self.fit_map(shape, board), local_mask, min_row, min_col
 
-    def row_column_clear(self):
+    def legal_moves(self, hotbar: List[List[List[int]]], board: Optional[int] = None) -> Iterator[Move]:
+        """
+        Lazily generate every legal move of a hotbar.
+
+        Moves come shape by shape in hotbar order and, per shape, in row-major order of
+        the placement. A shape identical to an earlier hotbar shape yields nothing, since
+        its moves would be the same.
+
+        Parameters:
+            hotbar (List[List[List[int]]]): The available shapes.
+            board (Optional[int]): Bitboard to check against, defaults to this grid's board.
+
+        Yields:
+            Move: The hotbar slot, the (x, y) position as Tetromino uses it and the placement mask.
+        """
+        if board is None:
+            board = self.board
+        columns = self.columns
+        for index, fits, local_mask, min_row, min_col in self._hotbar_fit_maps(hotbar, board):
+            while fits:
+                low_bit = fits & -fits
+                fits ^= low_bit
+                anchor = low_bit.bit_length() - 1
+                row, col = divmod(anchor, columns)
+                yield Move(index, (col - min_col, row - min_row), local_mask << anchor)
+
+    def legal_move_arrays(self, hotbar: List[List[List[int]]], board: Optional[int] = None) -> MoveArrays:
+        """
+        Every legal move of a hotbar at once, as compact arrays in legal_moves order.
+
+        Parameters:
+            hotbar (List[List[List[int]]]): The available shapes.
+            board (Optional[int]): Bitboard to check against, defaults to this grid's board.
+
+        Returns:
+            MoveArrays: Hotbar slots, x and y positions and placement masks of the moves.
+        """
+        import numpy as np
+
+        if board is None:
+            board = self.board
+        wide = self.rows * self.columns > 64
+        parts = []
+        for index, fits, local_mask, min_row, min_col in self._hotbar_fit_maps(hotbar, board):
+            anchors = []
+            while fits:
+                low_bit = fits & -fits
+                fits ^= low_bit
+                anchors.append(low_bit.bit_length() - 1)
+            anchors = np.array(anchors, dtype=np.int64)
+            if wide:
+                masks = np.array([local_mask << int(anchor) for anchor in anchors], dtype=object)
+            else:
+                masks = np.uint64(local_mask) << anchors.astype(np.uint64)
+            parts.append((np.full(len(anchors), index, dtype=np.int64),
+                          anchors % self.columns - min_col, anchors // self.columns - min_row, masks))
+
+        if not parts:
+            empty = np.zeros(0, dtype=np.int64)
+            return MoveArrays(empty, empty, empty, np.zeros(0, dtype=object if wide else np.uint64))
+        return MoveArrays(*(np.concatenate(column) for column in zip(*parts)))
+
+    def full_lines(self, board: Optional[int] = None) -> Tuple[List[int], List[int]]:
+        """
+        Find the full rows and columns of a board.
+
+        Parameters:
+            board (Optional[int]): Bitboard to inspect, defaults to this grid's board.
+
+        Returns:
+            Tuple[List[int], List[int]]: Indices of the full rows and full columns.
+        """
+        if board is None:
+            board = self.board
+        rows = [i for i, mask in enumerate(self.row_masks) if board & mask == mask]
+        columns = [j for j, mask in enumerate(self.column_masks) if board & mask == mask]
+        return rows, columns
+
+    def clear_lines(self, board: int) -> Tuple[int, int]:
+        """
+        Clear every full row and column of a board at once.
+
+        Rows and columns are detected before anything is removed, so lines that fill
+        together clear together.
+
+        Parameters:
+            board (int): Bitboard to clear.
+
+        Returns:
+            Tuple[int, int]: The cleared bitboard and the number of lines removed.
+        """
+        cleared = 0
+        lines = 0
+        for mask in self.row_masks:
+            if board & mask == mask:
+                cleared |= mask
+                lines += 1
+        for mask in self.column_masks:
+            if board & mask == mask:
+                cleared |= mask
+                lines += 1
+        return board & ~cleared, lines
+
+    def row_column_clear(self) -> LineClear:
         """
         Clears rows or columns that were filled.
+
+        Only the lines touched since the last clear are checked, using the fill counters.
+        Full rows and columns are removed together.
+
+        Returns:
+            LineClear: The cleared rows and columns and the number of lines cleared at once.
+        """
+        rows = tuple(sorted(r for r in self.dirty_rows if self.row_counts[r] == self.columns))
+        columns = tuple(sorted(c for c in self.dirty_columns if self.column_counts[c] == self.rows))
+        self.dirty_rows.clear()
+        self.dirty_columns.clear()
+        if not rows and not columns:
+            return LineClear(rows, columns, 0)
+
+        cleared = 0
+        for r in rows:
+            cleared |= self.row_masks[r]
+        for c in columns:
+            cleared |= self.column_masks[c]
+        removed = self._board & cleared
+        self._board &= ~cleared
+
+        width = self.columns
+        row_counts, column_counts = self.row_counts, self.column_counts
+        while removed:
+            low_bit = removed & -removed
+            row, column = divmod(low_bit.bit_length() - 1, width)
+            row_counts[row] -= 1
+            column_counts[column] -= 1
+            removed ^= low_bit
+        return LineClear(rows, columns, len(rows) + len(columns))
+
+    def is_filled(self, x: int, y: int) -> bool:
+        """
+        Check whether the cell in column x and row y is filled.
         """
-        # Clear filled rows
+        return bool((self.board >> (y * self.columns + x)) & 1)
 
-        # Clear filled columns
\ No newline at end of file
+    def __str__(self) -> str:
+        return "\n".join(" ".join(str(cell) for cell in row) for row in self.to_rows())
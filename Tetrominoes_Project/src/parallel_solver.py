@@ -0,0 +1,210 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from grid import Grid, shape_key
+from placements import placement_table
+from shape_generation import ShapeGenerator
+from solver import Move, Solver, SolverResult, default_evaluation
+
+# Solvers built inside a worker process, reused across tasks with the same configuration
+_worker_solvers: Dict[tuple, Solver] = {}
+
+# (hotbar index, first placement mask, first placement position) for every root move of a chunk
+_RootMove = Tuple[int, int, Tuple[int, int]]
+
+
+def _search_roots(config: tuple, rows: int, columns: int, board: int, hotbar: Tuple[Tuple[Tuple[int, ...], ...], ...],
+                  roots: List[_RootMove], deadline: Optional[float]) -> Tuple[List[tuple], int, bool]:
+    """
+    Worker task: finish the search below each root move of a chunk.
+
+    The board arrives as a single integer and the hotbar as tuples of rows, so the
+    task pickles to a few hundred bytes. deadline is the time.time() at which
+    the whole call must stop, shared by every task; perf_counter values cannot be
+    compared across processes, so it is converted to this process's clock on arrival.
+
+    Returns:
+        The best (score, board, moves, lines) under every root, the nodes generated
+        and whether the time budget ran out.
+    """
+    solver = _worker_solvers.get(config)
+    if solver is None:
+        evaluate, beam_width, depth, line_reward = config
+        solver = _worker_solvers[config] = Solver(evaluate, beam_width, depth, None, line_reward)
+
+    grid = Grid((rows, columns))
+    shapes = [[list(row) for row in rows] for rows in hotbar]
+    if deadline is not None:
+        deadline = time.perf_counter() + (deadline - time.time())
+
+    results = []
+    nodes = 0
+    timed_out = False
+    for index, mask, position in roots:
+        child_board, lines = grid.clear_lines(board | mask)
+        remaining = tuple(i for i in range(len(shapes)) if i != index)
+        beam, root_nodes, root_timed_out = solver.search(grid, shapes, child_board, remaining, deadline,
+                                                         (Move(index, position, mask),), lines)
+        value, best_board, _, moves, best_lines = beam[0]
+        results.append((value, best_board, moves, best_lines))
+        nodes += root_nodes
+        timed_out = timed_out or root_timed_out
+    return results, nodes, timed_out
+
+
+class ParallelSolver:
+    """
+    Solver that splits the root moves (first piece x first placement) across a process pool.
+
+    Every root move gets its own beam search below it, so with the same beam width
+    the parallel search explores at least as much as Solver does. Results are merged
+    in root-move order, so the chosen sequence does not depend on which worker
+    finishes first. The pool is created on first use and reused by later calls.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, evaluate: Callable[[int, Grid], float] = default_evaluation,
+                 beam_width: int = 64, depth: Optional[int] = None, time_budget: Optional[float] = None,
+                 line_reward: float = 10.0, chunks_per_worker: int = 4):
+        """
+        Args:
+            max_workers: Number of worker processes, os.cpu_count() if None.
+            evaluate: Module-level (picklable) function scoring a board, higher is better.
+            beam_width: Number of states kept after each level below every root move.
+            depth: Maximum number of pieces to place; the whole hotbar if None.
+            time_budget: Seconds after which a call stops and returns its best sequence so far,
+                measured from the start of the call across all workers.
+            line_reward: Score added for every cleared row or column.
+            chunks_per_worker: Root moves are grouped into this many tasks per worker.
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.evaluate = evaluate
+        self.beam_width = beam_width
+        self.depth = depth
+        self.time_budget = time_budget
+        self.line_reward = line_reward
+        self.chunks_per_worker = chunks_per_worker
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> 'ParallelSolver':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Shut the worker pool down.
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def solve(self, grid: Grid, hotbar: List[List[List[int]]]) -> SolverResult:
+        """
+        Find the best sequence of placements for the hotbar pieces.
+
+        Parameters:
+            grid (Grid): The current board, a list-of-lists board is converted.
+            hotbar (List[List[List[int]]]): Shapes available to place.
+
+        Returns:
+            SolverResult: The best sequence found, as for Solver.solve.
+        """
+        if not isinstance(grid, Grid):
+            grid = Grid.from_rows(grid)
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.max_workers)
+        start = time.perf_counter()
+        deadline = None if self.time_budget is None else time.time() + self.time_budget
+
+        table = placement_table(grid.rows, grid.columns)
+        roots: List[_RootMove] = []
+        tried = set()
+        for index, shape in enumerate(hotbar):
+            key = shape_key(shape)
+            if key in tried:
+                continue
+            tried.add(key)
+            for mask, position in zip(table.masks_for(shape), table.positions_for(shape)):
+                if not mask & grid.board:
+                    roots.append((index, mask, position))
+
+        if not roots or self.depth == 0:
+            value = self.evaluate(grid.board, grid)
+            return SolverResult((), value, grid.board, 0, 0, time.perf_counter() - start, False)
+
+        compact_hotbar = tuple(shape_key(shape) for shape in hotbar)
+        depth = None if self.depth is None else self.depth - 1
+        config = (self.evaluate, self.beam_width, depth, self.line_reward)
+        chunk_count = min(len(roots), self.max_workers * self.chunks_per_worker)
+        chunks = [roots[i::chunk_count] for i in range(chunk_count)]
+
+        futures = [self.executor.submit(_search_roots, config, grid.rows, grid.columns, grid.board, compact_hotbar,
+                                        chunk, deadline)
+                   for chunk in chunks]
+
+        best = None
+        best_key = None
+        nodes = len(roots)
+        timed_out = False
+        for chunk_index, future in enumerate(futures):
+            results, chunk_nodes, chunk_timed_out = future.result()
+            nodes += chunk_nodes
+            timed_out = timed_out or chunk_timed_out
+            for offset, result in enumerate(results):
+                # Root moves were dealt round-robin, so this recovers their original order
+                order = offset * chunk_count + chunk_index
+                # Deepest sequence first, then the highest score, then the earliest root move
+                key = (len(result[2]), result[0], -order)
+                if best_key is None or key > best_key:
+                    best, best_key = result, key
+
+        value, board, moves, lines = best
+        return SolverResult(moves, value, board, lines, nodes, time.perf_counter() - start, timed_out)
+
+
+def measure_speedup(grid: Grid, hotbar: List[List[List[int]]], max_workers: Optional[int] = None,
+                    repeats: int = 3, **solver_options) -> List[Dict[str, float]]:
+    """
+    Time ParallelSolver with 1 to max_workers workers on the same position.
+
+    Each pool is warmed up with one untimed call so process start-up is excluded.
+
+    Returns:
+        One dict per worker count with the best wall time, nodes/sec and the speedup
+        relative to a single worker.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    report = []
+    baseline = None
+    for workers in range(1, max_workers + 1):
+        with ParallelSolver(workers, **solver_options) as solver:
+            solver.solve(grid, hotbar)
+            timings = []
+            for _ in range(repeats):
+                result = solver.solve(grid, hotbar)
+                timings.append(result.elapsed)
+        seconds = min(timings)
+        baseline = baseline or seconds
+        report.append({
+            'workers': workers,
+            'seconds': seconds,
+            'nodes_per_second': result.nodes / seconds if seconds > 0 else 0.0,
+            'speedup': baseline / seconds if seconds > 0 else 0.0,
+        })
+    return report
+
+
+if __name__ == "__main__":
+    import random
+
+    random.seed(0)
+    shape_gen = ShapeGenerator()
+    board = Grid((8, 8))
+    board.board = random.getrandbits(64) & random.getrandbits(64)
+    pieces = [shape_gen.get_random_shape() for _ in range(3)]
+    for row in measure_speedup(board, pieces, beam_width=256):
+        print(f"{row['workers']:>2} workers: {row['seconds'] * 1000:8.2f} ms  "
+              f"{row['nodes_per_second']:>12,.0f} nodes/s  speedup x{row['speedup']:.2f}")
@@ -0,0 +1,158 @@
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from grid import Grid, shape_key, shape_layout
+from shape_generation import ShapeGenerator
+from shapes import Shape
+
+
+def shape_bitmask(shape: List[List[int]]) -> int:
+    """
+    Convert a square 2D shape back to the bitmask layout used by ShapeGenerator.
+
+    Args:
+        shape: 2D array representing the shape.
+
+    Returns:
+        The bitmask with cell (i, j) stored at bit ``len(shape) * i + j``.
+    """
+    if isinstance(shape, Shape):
+        return shape.bitmask
+    size = len(shape)
+    bitmask = 0
+    for i, row in enumerate(shape):
+        for j, cell in enumerate(row):
+            if cell:
+                bitmask |= 1 << (size * i + j)
+    return bitmask
+
+
+class PlacementTable:
+    """
+    All in-bounds placement masks of every catalog shape on one board size.
+
+    Positions follow Tetromino's convention: (x, y) is the top-left corner of the
+    shape's 3x3 frame, so it can be negative when the frame has empty leading rows
+    or columns.
+    """
+
+    def __init__(self, rows: int, columns: int):
+        self.rows = rows
+        self.columns = columns
+        # Catalog shapes by their 3x3 frame bitmask
+        self.masks: Dict[int, Tuple[int, ...]] = {}
+        self.positions: Dict[int, Tuple[Tuple[int, int], ...]] = {}
+        # Any shape by its rows, which also fix its box size: (masks, positions)
+        self.shape_tables: Dict[Tuple[Tuple[int, ...], ...], Tuple[Tuple[int, ...], Tuple[Tuple[int, int], ...]]] = {}
+        # Interned Shape -> {(x, y): mask}, filled on first use
+        self.shape_placements: Dict[Shape, Dict[Tuple[int, int], int]] = {}
+
+        shape_gen = ShapeGenerator()
+        for bitmask in sorted(shape_gen.generated_shapes | shape_gen.unique_shapes):
+            self.add_shape(bitmask, ShapeGenerator.bitmask_to_2D(bitmask))
+
+    def _enumerate(self, shape: List[List[int]]) -> Tuple[Tuple[int, ...], Tuple[Tuple[int, int], ...]]:
+        """
+        Every in-bounds placement mask of a shape and its (x, y) position.
+        """
+        layout = shape_layout(shape_key(shape), self.columns)
+        masks: List[int] = []
+        positions: List[Tuple[int, int]] = []
+        if layout is not None:
+            local_mask, min_row, min_col, height, width = layout
+            for row in range(self.rows - height + 1):
+                for col in range(self.columns - width + 1):
+                    masks.append(local_mask << (row * self.columns + col))
+                    positions.append((col - min_col, row - min_row))
+        return tuple(masks), tuple(positions)
+
+    def add_shape(self, bitmask: int, shape: List[List[int]]) -> Tuple[int, ...]:
+        """
+        Enumerate and store every in-bounds placement of a catalog shape.
+
+        Args:
+            bitmask: 3x3 frame bitmask the placements are stored under in masks and positions.
+            shape: 2D array representing the shape.
+
+        Returns:
+            The placement masks of the shape.
+        """
+        entry = self.shape_tables[shape_key(shape)] = self._enumerate(shape)
+        self.masks[bitmask], self.positions[bitmask] = entry
+        return self.masks[bitmask]
+
+    def mask_at(self, shape: Shape, x: int, y: int) -> Optional[int]:
+        """
+        Look up the precomputed placement mask of an interned Shape at a Tetromino (x, y) position.
+
+        Returns:
+            The mask, or None if the shape does not fit inside the board there.
+        """
+        placements = self.shape_placements.get(shape)
+        if placements is None:
+            masks, positions = self._enumerate(shape)
+            placements = self.shape_placements[shape] = dict(zip(positions, masks))
+        return placements.get((x, y))
+
+    def _shape_table(self, shape: List[List[int]]) -> Tuple[Tuple[int, ...], Tuple[Tuple[int, int], ...]]:
+        """
+        Placement masks and positions of a 2D shape, enumerated on first use.
+
+        Keyed by the shape's rows rather than its bitmask, since the bit layout depends
+        on the box size and shapes drawn in different boxes can share a bitmask.
+        """
+        key = shape_key(shape)
+        entry = self.shape_tables.get(key)
+        if entry is None:
+            entry = self.shape_tables[key] = self._enumerate(shape)
+        return entry
+
+    def masks_for(self, shape: List[List[int]]) -> Tuple[int, ...]:
+        """
+        Look up the placement masks of a 2D shape, adding it if it is not in the catalog
+        (e.g. a rotated hotbar piece).
+        """
+        return self._shape_table(shape)[0]
+
+    def positions_for(self, shape: List[List[int]]) -> Tuple[Tuple[int, int], ...]:
+        """
+        Look up the (x, y) positions matching masks_for, in the same order.
+        """
+        return self._shape_table(shape)[1]
+
+    def legal_masks(self, bitmask: int, board: int) -> List[int]:
+        """
+        Filter the placements of a catalog shape down to those that fit on a board.
+
+        Args:
+            bitmask: Catalog bitmask of the shape.
+            board: Occupancy bitboard.
+
+        Returns:
+            The placement masks that do not overlap any filled cell.
+        """
+        return [mask for mask in self.masks[bitmask] if not mask & board]
+
+    def has_placement(self, shape: List[List[int]], board: int) -> bool:
+        """
+        Check whether a 2D shape fits anywhere on a board.
+        """
+        for mask in self.masks_for(shape):
+            if not mask & board:
+                return True
+        return False
+
+
+@lru_cache(maxsize=None)
+def placement_table(rows: int, columns: int) -> PlacementTable:
+    """
+    Build the placement table for a board size on first use and reuse it afterwards.
+    """
+    return PlacementTable(rows, columns)
+
+
+def table_for(grid: Grid) -> PlacementTable:
+    """
+    Get the shared placement table matching a grid's dimensions.
+    """
+    return placement_table(grid.rows, grid.columns)
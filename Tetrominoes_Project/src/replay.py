@@ -0,0 +1,278 @@
+import mmap
+import struct
+import sys
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from grid import Grid
+from shape_generation import GENERATOR_VERSION
+from shapes import Shape, as_shape, catalog_shapes
+from tetromino_functionality import Tetromino
+
+# magic, format version, generator version, board rows, board columns, shape box size
+_FILE_HEADER = struct.Struct('<8sIIBBBx')
+# seed, record count, final score
+_GAME_HEADER = struct.Struct('<QII')
+# flags | hotbar slot, shape key (catalog id * 4 + rotation), x, y
+_RECORD = struct.Struct('<BHbb')
+# game count, magic; follows the uint64 game offsets at the end of a closed file
+_TRAILER = struct.Struct('<Q8s')
+_MAGIC = b'TETREPLY'
+_INDEX_MAGIC = b'TETINDEX'
+_FORMAT_VERSION = 1
+
+# Set in a record's first byte when the record deals a shape into a hotbar slot instead of placing it
+DEAL_FLAG = 0x80
+# Positions are stored as signed bytes, so every row and column index must stay below 128
+MAX_BOARD_SIZE = 128
+
+
+class ReplayRecord(NamedTuple):
+    """
+    One step of a recorded game: a shape dealt into a hotbar slot, or placed from it at (x, y).
+    """
+    deal: bool
+    slot: int
+    shape: Shape
+    position: Tuple[int, int]
+
+
+class ReplayState(NamedTuple):
+    """
+    A game rebuilt up to some move: the board, the hotbar (None for used slots), the score and the moves made.
+    """
+    grid: Grid
+    hotbar: List[Optional[Shape]]
+    score: int
+    moves: int
+
+
+def shape_key(shape: Shape) -> int:
+    """
+    Encode a catalog shape and rotation in 16 bits.
+
+    Raises:
+        ValueError: If the shape is not a rotation of a catalog shape.
+    """
+    if shape.id >= len(catalog_shapes(shape.box_size)):
+        raise ValueError(f"{shape!r} is not a rotation of a catalog shape and cannot be recorded")
+    return shape.id << 2 | shape.rotation
+
+
+class ReplayWriter:
+    """
+    Streams games to a replay file.
+
+    A game is buffered while it is recorded and written in one go by end_game, so the
+    file only ever holds whole games. close() appends an index of game offsets; a file
+    left without one (e.g. after a crash) is still readable by scanning.
+    """
+
+    def __init__(self, path: str, rows: int = 8, columns: int = 8, box_size: int = 3):
+        """
+        Args:
+            path: File to create (an existing file is overwritten).
+            rows: Board rows of the recorded games.
+            columns: Board columns of the recorded games.
+            box_size: Frame size of the recorded shapes, which fixes the meaning of the shape ids.
+
+        Raises:
+            ValueError: If the board is larger than MAX_BOARD_SIZE in either direction.
+        """
+        if not (0 < rows <= MAX_BOARD_SIZE and 0 < columns <= MAX_BOARD_SIZE):
+            raise ValueError(f"Replays record boards of at most {MAX_BOARD_SIZE}x{MAX_BOARD_SIZE} cells, "
+                             f"not {rows}x{columns}")
+        self.path = path
+        self.box_size = box_size
+        self.file: BinaryIO = open(path, 'wb')
+        self.file.write(_FILE_HEADER.pack(_MAGIC, _FORMAT_VERSION, GENERATOR_VERSION, rows, columns, box_size))
+        self.offsets: List[int] = []
+        self.seed: Optional[int] = None
+        self.records = bytearray()
+        self.count = 0
+
+    def __enter__(self) -> 'ReplayWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def begin_game(self, seed: int) -> None:
+        """
+        Start recording a game played from a seed.
+        """
+        if self.seed is not None:
+            raise ValueError("end_game must be called before the next game begins")
+        self.seed = seed
+        self.records.clear()
+        self.count = 0
+
+    def deal(self, hotbar: Sequence[Shape], slots: Optional[Sequence[int]] = None) -> None:
+        """
+        Record shapes dealt into the hotbar, into slots 0, 1, ... unless slots are given.
+        """
+        for slot, shape in zip(range(len(hotbar)) if slots is None else slots, hotbar):
+            self.records += _RECORD.pack(DEAL_FLAG | slot, shape_key(as_shape(shape)), 0, 0)
+            self.count += 1
+
+    def place(self, slot: int, shape: Shape, position: Tuple[int, int]) -> None:
+        """
+        Record a shape placed from a hotbar slot at a Tetromino (x, y) position.
+        """
+        self.records += _RECORD.pack(slot, shape_key(as_shape(shape)), *position)
+        self.count += 1
+
+    def end_game(self, score: int) -> int:
+        """
+        Write the recorded game to the file.
+
+        Returns:
+            The index of the game in the file.
+        """
+        if self.seed is None:
+            raise ValueError("begin_game was not called")
+        self.offsets.append(self.file.tell())
+        self.file.write(_GAME_HEADER.pack(self.seed, self.count, score))
+        self.file.write(self.records)
+        self.seed = None
+        return len(self.offsets) - 1
+
+    def close(self) -> None:
+        """
+        Append the game index and close the file.
+        """
+        if self.file.closed:
+            return
+        self.file.write(struct.pack(f'<{len(self.offsets)}Q', *self.offsets))
+        self.file.write(_TRAILER.pack(len(self.offsets), _INDEX_MAGIC))
+        self.file.close()
+
+
+class ReplayReader:
+    """
+    Random access to the games of a replay file through a memory map.
+
+    Opening a file reads only its header and index; a game's records are decoded from
+    the mapped bytes when they are asked for.
+    """
+
+    def __init__(self, path: str):
+        """
+        Raises:
+            ValueError: If the file is not a replay file of this format and generator version.
+        """
+        with open(path, 'rb') as file:
+            self.mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.offsets: Sequence[int] = ()
+        self.view = memoryview(self.mapped)
+        if len(self.view) < _FILE_HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is not a replay file")
+        magic, format_version, generator_version, self.rows, self.columns, self.box_size = _FILE_HEADER.unpack_from(self.view)
+        if magic != _MAGIC or format_version != _FORMAT_VERSION or generator_version != GENERATOR_VERSION:
+            self.close()
+            raise ValueError(f"{path} was written by another replay format or shape generator version")
+
+        self.shapes = catalog_shapes(self.box_size)
+        self.offsets = self._read_index()
+
+    def _read_index(self) -> Sequence[int]:
+        """
+        Game offsets from the trailing index, or by hopping from game header to game header.
+        """
+        end = len(self.view)
+        if end >= _FILE_HEADER.size + _TRAILER.size:
+            count, magic = _TRAILER.unpack_from(self.view, end - _TRAILER.size)
+            start = end - _TRAILER.size - 8 * count
+            if magic == _INDEX_MAGIC and start >= _FILE_HEADER.size:
+                if sys.byteorder == 'little':
+                    return self.view[start:end - _TRAILER.size].cast('Q')
+                return struct.unpack_from(f'<{count}Q', self.view, start)
+
+        offsets = []
+        offset = _FILE_HEADER.size
+        while offset + _GAME_HEADER.size <= end:
+            _, count, _ = _GAME_HEADER.unpack_from(self.view, offset)
+            next_offset = offset + _GAME_HEADER.size + count * _RECORD.size
+            if next_offset > end:
+                break  # Truncated last game
+            offsets.append(offset)
+            offset = next_offset
+        return offsets
+
+    def __enter__(self) -> 'ReplayReader':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def close(self) -> None:
+        if isinstance(self.offsets, memoryview):
+            self.offsets.release()
+        self.view.release()
+        self.mapped.close()
+
+    def header(self, index: int) -> Tuple[int, int, int]:
+        """
+        The (seed, record count, final score) of a game.
+        """
+        return _GAME_HEADER.unpack_from(self.view, self.offsets[index])
+
+    def records(self, index: int) -> Iterator[ReplayRecord]:
+        """
+        Decode the records of a game in order.
+        """
+        offset = self.offsets[index]
+        _, count, _ = _GAME_HEADER.unpack_from(self.view, offset)
+        start = offset + _GAME_HEADER.size
+        shapes = self.shapes
+        for flags, key, x, y in _RECORD.iter_unpack(self.view[start:start + count * _RECORD.size]):
+            yield ReplayRecord(bool(flags & DEAL_FLAG), flags & ~DEAL_FLAG, shapes[key >> 2].rotate(key & 3), (x, y))
+
+
+def replay(reader: ReplayReader, index: int, moves: Optional[int] = None) -> ReplayState:
+    """
+    Re-run a recorded game through Grid placement and Tetromino line clearing and scoring.
+
+    Parameters:
+        reader (ReplayReader): The replay file.
+        index (int): The game to replay.
+        moves (Optional[int]): Stop after this many placements; the whole game if None.
+
+    Returns:
+        ReplayState: The board, hotbar, score and number of placements at that point.
+
+    Raises:
+        ValueError: If a recorded placement uses a shape that was not dealt into its slot,
+            is out of bounds or overlaps the board.
+    """
+    grid = Grid((reader.rows, reader.columns))
+    hotbar: List[Optional[Shape]] = []
+    tetromino = Tetromino(None, 0, 0, hotbar)
+    placed = 0
+    for deal, slot, shape, position in reader.records(index):
+        if deal:
+            hotbar.extend([None] * (slot + 1 - len(hotbar)))
+            hotbar[slot] = shape
+            continue
+        if moves is not None and placed >= moves:
+            break
+        if slot >= len(hotbar) or hotbar[slot] != shape:
+            raise ValueError(f"Game {index} move {placed}: {shape!r} was not dealt into hotbar slot {slot}")
+        mask = grid.mask_for(shape, *position)
+        if mask is None or not grid.can_place(mask):
+            raise ValueError(f"Game {index} move {placed}: {shape!r} does not fit at {position}")
+        grid.place_mask(mask)
+        tetromino.handle_line_clears(grid)
+        hotbar[slot] = None
+        placed += 1
+    return ReplayState(grid, hotbar, tetromino.score, placed)
+
+
+def verify(reader: ReplayReader, index: int) -> bool:
+    """
+    Replay a whole game and check that it reaches its recorded score.
+    """
+    return replay(reader, index).score == reader.header(index)[2]
@@ -0,0 +1,147 @@
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Optional, Sequence, TYPE_CHECKING
+
+from shapes import Shape, catalog_shapes
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_MASK64 = (1 << 64) - 1
+# splitmix64 increment (the 64-bit golden ratio) and finalizer constants
+_GAMMA = 0x9E3779B97F4A7C15
+_MIX1 = 0xBF58476D1CE4E5B9
+_MIX2 = 0x94D049BB133111EB
+
+
+def _mix(value: int) -> int:
+    """
+    splitmix64 finalizer of a 64-bit integer.
+    """
+    value = (value ^ (value >> 30)) * _MIX1 & _MASK64
+    value = (value ^ (value >> 27)) * _MIX2 & _MASK64
+    return value ^ (value >> 31)
+
+
+def _mix_array(values: 'np.ndarray') -> 'np.ndarray':
+    """
+    splitmix64 finalizer of every element of a uint64 array (multiplication wraps modulo 2**64).
+    """
+    import numpy as np
+
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(_MIX1)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(_MIX2)
+    return values ^ (values >> np.uint64(31))
+
+
+class PieceSampler:
+    """
+    Seeded, reproducible source of hotbar pieces.
+
+    Draw n of a stream is the splitmix64 output for counter n under a key derived from
+    (seed, stream), so any draw can be computed directly: skipping ahead is setting the
+    counter, and a batch of draws is a handful of vectorized NumPy operations. The
+    scalar and batch paths produce the same pieces, so a game dealt one hotbar at a
+    time matches the same game dealt as part of a batch.
+
+    Pieces are catalog shapes by id (the index in catalog_shapes, as in BatchSimulator),
+    drawn uniformly or in proportion to per-shape weights. Only the batch methods need
+    NumPy; drawing single shapes and hotbars does not import it.
+    """
+
+    def __init__(self, seed: int = 0, weights: Optional[Sequence[float]] = None, stream: int = 0,
+                 shapes: Optional[Sequence[Shape]] = None, hotbar_size: int = 3):
+        """
+        Args:
+            seed: Seed of the draws; the same seed, stream and weights always deal the same pieces.
+            weights: Relative frequency of every shape, in shapes order; uniform if None.
+            stream: Independent sequence of draws under the same seed, e.g. one per worker.
+            shapes: Shapes dealt, by id; the 3x3 catalog if None.
+            hotbar_size: Number of pieces in a hotbar.
+
+        Raises:
+            ValueError: If the weights do not match the shapes, are negative or are all zero.
+        """
+        self.shapes = tuple(catalog_shapes() if shapes is None else shapes)
+        self.hotbar_size = hotbar_size
+        self.seed = seed
+        self.stream = stream
+        self.key = _mix((_mix(seed & _MASK64) + stream * _GAMMA) & _MASK64)
+        self.counter = 0
+        self.set_weights(weights)
+
+    def set_weights(self, weights: Optional[Sequence[float]]) -> None:
+        """
+        Change the piece distribution; None restores the uniform distribution.
+
+        Raises:
+            ValueError: If the weights do not match the shapes, are negative or are all zero.
+        """
+        weights = [1.0] * len(self.shapes) if weights is None else [float(weight) for weight in weights]
+        if len(weights) != len(self.shapes):
+            raise ValueError(f"Expected {len(self.shapes)} weights, got {len(weights)}")
+        if min(weights) < 0 or sum(weights) <= 0:
+            raise ValueError("Weights must be non-negative and not all zero")
+
+        cumulative = list(accumulate(weights))
+        # Upper bounds of every shape's slice of [0, 1); the last is exactly 1
+        self.bounds: List[float] = [total / cumulative[-1] for total in cumulative]
+        self.bounds[-1] = 1.0
+        self.weights = weights
+
+    def seek(self, position: int) -> None:
+        """
+        Jump to a draw of the stream; the next draw is number position.
+        """
+        self.counter = position
+
+    def skip(self, count: int) -> None:
+        """
+        Skip ahead over count draws without computing them.
+        """
+        self.counter += count
+
+    def next_id(self) -> int:
+        """
+        Draw one shape id.
+        """
+        self.counter += 1
+        value = _mix((self.key + self.counter * _GAMMA) & _MASK64)
+        return bisect_right(self.bounds, (value >> 11) * 2.0 ** -53)
+
+    def next_shape(self) -> Shape:
+        """
+        Draw one shape.
+        """
+        return self.shapes[self.next_id()]
+
+    def hotbar(self) -> List[Shape]:
+        """
+        Draw a hotbar of shapes.
+        """
+        return [self.shapes[self.next_id()] for _ in range(self.hotbar_size)]
+
+    def ids(self, count: int) -> 'np.ndarray':
+        """
+        Draw count shape ids at once.
+
+        Returns:
+            (count,) int64 array, the same ids count calls of next_id would return.
+        """
+        import numpy as np
+
+        counters = np.arange(self.counter + 1, self.counter + count + 1, dtype=np.uint64)
+        self.counter += count
+        values = _mix_array(np.uint64(self.key) + counters * np.uint64(_GAMMA))
+        uniform = (values >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+        return np.searchsorted(self.bounds, uniform, side='right').astype(np.int64)
+
+    def hotbars(self, count: int, hotbar_size: Optional[int] = None) -> 'np.ndarray':
+        """
+        Draw count hotbars of shape ids at once.
+
+        Returns:
+            (count, hotbar_size) int64 array, hotbars in the order hotbar would deal them.
+        """
+        hotbar_size = self.hotbar_size if hotbar_size is None else hotbar_size
+        return self.ids(count * hotbar_size).reshape(count, hotbar_size)
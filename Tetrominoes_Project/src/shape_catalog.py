@@ -0,0 +1,211 @@
+from array import array
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# magic, format version, generator version, byte order, box size, reflections, cell count,
+# unique shape count, generated shape count, symmetry class member count
+_HEADER = struct.Struct('<8sII1sBBBIII')
+_MAGIC = b'TETSHAPE'
+_FORMAT_VERSION = 1
+
+
+def cache_dir() -> str:
+    """
+    Directory holding the shape catalog files, overridable with TETROMINOES_CACHE_DIR.
+    """
+    return os.environ.get('TETROMINOES_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'tetrominoes')
+
+
+def cache_path(box_size: int, reflections: bool, cell_count: Optional[int]) -> str:
+    """
+    Path of the catalog file for one box size, symmetry mode and cell count.
+    """
+    symmetry = 'd4' if reflections else 'c4'
+    cells = 'all' if cell_count is None else str(cell_count)
+    return os.path.join(cache_dir(), f'shapes_{box_size}x{box_size}_{symmetry}_{cells}.bin')
+
+
+def _uint32_section(values: Sequence[int]) -> bytes:
+    return array('I', values).tobytes()
+
+
+def _uint8_section(values: Sequence[int]) -> bytes:
+    data = bytes(values)
+    return data + bytes(-len(data) % 4)  # Keep the following uint32 sections aligned
+
+
+class ShapeCatalog:
+    """
+    Flat, serializable form of a ShapeGenerator catalog.
+
+    Every field is a flat sequence so the catalog can be written as a handful of
+    binary sections and read back through a memory map without parsing. On a
+    loaded catalog the sequences are memoryviews into the mapped file.
+    """
+
+    def __init__(self, box_size: int, reflections: bool, cell_count: Optional[int],
+                 unique_shapes: Sequence[int], generated_shapes: Sequence[int],
+                 bounding_boxes: Sequence[int], cells_2D: Sequence[int],
+                 class_offsets: Sequence[int], class_members: Sequence[int]):
+        """
+        Args:
+            box_size: Side length of the shape box.
+            reflections: Whether mirror images were treated as the same shape.
+            cell_count: Cell count the catalog was restricted to, or None.
+            unique_shapes: Sorted canonical bitmasks, one per isomorphism class.
+            generated_shapes: Sorted bitmasks produced by generate_shapes.
+            bounding_boxes: (height, width) of every unique shape, flattened.
+            cells_2D: box_size * box_size cells of every unique shape, flattened row-major.
+            class_offsets: Start of every unique shape's members in class_members, plus the end.
+            class_members: Generated shapes in the class of every unique shape, concatenated.
+        """
+        self.box_size = box_size
+        self.reflections = reflections
+        self.cell_count = cell_count
+        self.unique_shapes = unique_shapes
+        self.generated_shapes = generated_shapes
+        self.bounding_boxes = bounding_boxes
+        self.cells_2D = cells_2D
+        self.class_offsets = class_offsets
+        self.class_members = class_members
+
+    @classmethod
+    def from_shapes(cls, box_size: int, reflections: bool, cell_count: Optional[int],
+                    generated_shapes: Sequence[int], symmetry_classes: Dict[int, List[int]],
+                    bounding_boxes: Dict[int, Tuple[int, int]]) -> 'ShapeCatalog':
+        """
+        Flatten the catalog containers of a ShapeGenerator.
+        """
+        unique_shapes = sorted(symmetry_classes)
+        offsets = [0]
+        members: List[int] = []
+        cells_2D: List[int] = []
+        boxes: List[int] = []
+        for shape in unique_shapes:
+            members.extend(symmetry_classes[shape])
+            offsets.append(len(members))
+            boxes.extend(bounding_boxes[shape])
+            cells_2D.extend((shape >> bit) & 1 for bit in range(box_size * box_size))
+
+        return cls(box_size, reflections, cell_count, unique_shapes, sorted(generated_shapes),
+                   boxes, cells_2D, offsets, members)
+
+    def shape_2D(self, index: int) -> List[List[int]]:
+        """
+        2D form of the index-th unique shape.
+        """
+        n = self.box_size
+        start = index * n * n
+        return [list(self.cells_2D[start + row * n:start + (row + 1) * n]) for row in range(n)]
+
+    def bounding_box(self, index: int) -> Tuple[int, int]:
+        """
+        (height, width) of the index-th unique shape.
+        """
+        return self.bounding_boxes[2 * index], self.bounding_boxes[2 * index + 1]
+
+    def members(self, index: int) -> List[int]:
+        """
+        Generated shapes in the class of the index-th unique shape.
+        """
+        return list(self.class_members[self.class_offsets[index]:self.class_offsets[index + 1]])
+
+    def save(self, path: str, generator_version: int) -> bool:
+        """
+        Write the catalog atomically to path.
+
+        Returns:
+            bool: True if the file was written, False if the cache location is not writable.
+        """
+        header = _HEADER.pack(_MAGIC, _FORMAT_VERSION, generator_version, sys.byteorder[0].encode(),
+                              self.box_size, int(self.reflections),
+                              0 if self.cell_count is None else self.cell_count,
+                              len(self.unique_shapes), len(self.generated_shapes), len(self.class_members))
+        sections = [header + bytes(-_HEADER.size % 4),
+                    _uint32_section(self.unique_shapes),
+                    _uint32_section(self.generated_shapes),
+                    _uint32_section(self.class_offsets),
+                    _uint32_section(self.class_members),
+                    _uint8_section(self.bounding_boxes),
+                    _uint8_section(self.cells_2D)]
+
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_path, 'wb') as file:
+                for section in sections:
+                    file.write(section)
+            os.replace(temp_path, path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return False
+        return True
+
+    @classmethod
+    def load(cls, path: str, generator_version: int, box_size: int, reflections: bool,
+             cell_count: Optional[int]) -> Optional['ShapeCatalog']:
+        """
+        Memory-map a catalog file.
+
+        Returns:
+            The catalog, or None if the file is missing, truncated or was written by a
+            different generator version, byte order or configuration.
+        """
+        try:
+            with open(path, 'rb') as file:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        view = memoryview(mapped)
+        catalog = None
+        try:
+            if len(view) < _HEADER.size:
+                return None
+            (magic, format_version, version, byte_order, stored_box, stored_reflections, stored_cells,
+             unique_count, generated_count, member_count) = _HEADER.unpack_from(view)
+            expected_cells = 0 if cell_count is None else cell_count
+            if (magic != _MAGIC or format_version != _FORMAT_VERSION or version != generator_version
+                    or byte_order != sys.byteorder[0].encode() or stored_box != box_size
+                    or stored_reflections != int(reflections) or stored_cells != expected_cells):
+                return None
+
+            offset = _HEADER.size + (-_HEADER.size % 4)
+            sections: List[memoryview] = []
+
+            def take(count: int, item_size: int) -> memoryview:
+                nonlocal offset
+                size = count * item_size
+                if offset + size > len(view):
+                    raise ValueError('truncated shape catalog')
+                section = view[offset:offset + size]
+                offset += size + (-size % 4)
+                sections.append(section.cast('I') if item_size == 4 else section)
+                return sections[-1]
+
+            try:
+                catalog = cls(box_size, reflections, cell_count,
+                              unique_shapes=take(unique_count, 4),
+                              generated_shapes=take(generated_count, 4),
+                              class_offsets=take(unique_count + 1, 4),
+                              class_members=take(member_count, 4),
+                              bounding_boxes=take(2 * unique_count, 1),
+                              cells_2D=take(unique_count * box_size * box_size, 1))
+            except (struct.error, ValueError):
+                # Section views export the mapping too, so they must go before it can close
+                for section in sections:
+                    section.release()
+                return None
+        finally:
+            if catalog is None:
+                view.release()
+                mapped.close()
+
+        catalog._mapped = mapped  # Keep the mapping alive as long as the views are
+        return catalog
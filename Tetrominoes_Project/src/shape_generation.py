@@ -1,18 +1,330 @@
-from typing import Set, List, Tuple
+from functools import lru_cache
+from typing import Dict, Iterator, Optional, Set, List, Tuple, TYPE_CHECKING
 import random
-import numpy as np
+
+from shape_catalog import ShapeCatalog, cache_path
+
+if TYPE_CHECKING:
+    import numpy as np
+    from sampler import PieceSampler
+    from shapes import Shape
+
+# Bump whenever generation or canonicalization changes so cached catalogs are rebuilt
+GENERATOR_VERSION = 2
+
+
+@lru_cache(maxsize=None)
+def _neighbour_masks(box_size: int) -> Tuple[int, ...]:
+    """
+    For every cell of a box_size x box_size box, the bitmask of its 4-neighbours.
+    """
+    neighbours = []
+    for i in range(box_size):
+        for j in range(box_size):
+            mask = 0
+            if i > 0:
+                mask |= 1 << (box_size * (i - 1) + j)
+            if i < box_size - 1:
+                mask |= 1 << (box_size * (i + 1) + j)
+            if j > 0:
+                mask |= 1 << (box_size * i + j - 1)
+            if j < box_size - 1:
+                mask |= 1 << (box_size * i + j + 1)
+            neighbours.append(mask)
+    return tuple(neighbours)
+
+
+@lru_cache(maxsize=None)
+def _box_masks(box_size: int) -> Tuple[int, int, int, int]:
+    """
+    Masks used for bit-parallel flood fills: (full box, border, not first column, not last column).
+    """
+    full = (1 << (box_size * box_size)) - 1
+    first_column = sum(1 << (box_size * i) for i in range(box_size))
+    last_column = first_column << (box_size - 1)
+    border = first_column | last_column | ((1 << box_size) - 1) | (((1 << box_size) - 1) << (box_size * (box_size - 1)))
+    return full, border, full & ~first_column, full & ~last_column
+
+
+def _flood(seed: int, region: int, box_size: int) -> int:
+    """
+    Grow seed through 4-connected cells of region and return everything reached.
+    """
+    full, _, not_first, not_last = _box_masks(box_size)
+    reached = seed & region
+    while True:
+        grown = (reached | ((reached << 1) & not_first) | ((reached >> 1) & not_last)
+                 | (reached << box_size) | (reached >> box_size)) & region
+        if grown == reached:
+            return reached
+        reached = grown
+
+
+def has_holes(bitmask: int, box_size: int = 3) -> bool:
+    """
+    Check whether a shape encloses empty cells that cannot reach the edge of its box.
+    """
+    full, border, _, _ = _box_masks(box_size)
+    empty = full & ~bitmask
+    return _flood(empty & border, empty, box_size) != empty
+
+
+@lru_cache(maxsize=None)
+def symmetry_permutations(box_size: int) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Bit permutations of the 8 dihedral symmetries of a box_size x box_size box.
+
+    Index 0-3 are the clockwise rotations by 0, 90, 180 and 270 degrees, index 4-7
+    are the same rotations applied after a left-right reflection. Entry ``perm[b]``
+    is the bit that bit ``b`` moves to.
+    """
+    n = box_size
+    rotate = [n * j + (n - 1 - i) for i in range(n) for j in range(n)]
+    reflect = [n * i + (n - 1 - j) for i in range(n) for j in range(n)]
+
+    permutations = []
+    for start in (list(range(n * n)), reflect):
+        perm = start
+        for _ in range(4):
+            permutations.append(tuple(perm))
+            perm = [rotate[b] for b in perm]
+    return tuple(permutations)
+
+
+@lru_cache(maxsize=None)
+def symmetry_tables(box_size: int, reflections: bool = False) -> Tuple[Tuple[Tuple[int, ...], ...], ...]:
+    """
+    Byte-wise lookup tables for applying the box symmetries to bitmasks.
+
+    For every symmetry there is one 256-entry table per byte of the bitmask, so a
+    transformed mask is the OR of one lookup per byte (at most 4 for a 5x5 box).
+
+    Args:
+        box_size: Side length of the box.
+        reflections: Include the 4 reflected symmetries as well as the rotations.
+
+    Returns:
+        One tuple of byte tables per symmetry, in symmetry_permutations order.
+    """
+    permutations = symmetry_permutations(box_size)[:8 if reflections else 4]
+    chunks = (box_size * box_size + 7) // 8
+
+    tables = []
+    for perm in permutations:
+        chunk_tables = []
+        for chunk in range(chunks):
+            table = []
+            for value in range(256):
+                image = 0
+                for bit in range(8):
+                    source = chunk * 8 + bit
+                    if value >> bit & 1 and source < len(perm):
+                        image |= 1 << perm[source]
+                table.append(image)
+            chunk_tables.append(tuple(table))
+        tables.append(tuple(chunk_tables))
+    return tuple(tables)
+
+
+def _apply_symmetry(chunk_tables: Tuple[Tuple[int, ...], ...], bitmask: int) -> int:
+    image = 0
+    for table in chunk_tables:
+        image |= table[bitmask & 0xFF]
+        bitmask >>= 8
+    return image
+
+
+# Below this many shapes the per-shape table lookup is fast enough that importing NumPy is not worth it
+_BULK_CANONICAL_THRESHOLD = 50000
+
+
+def canonical_forms_array(bitmasks, box_size: int = 3, reflections: bool = False) -> 'np.ndarray':
+    """
+    Canonicalize many shapes at once with vectorized symmetry table lookups.
+
+    Args:
+        bitmasks: Sequence or array of shape bitmasks.
+        box_size: Side length of the box.
+        reflections: Include reflections in the symmetry group.
+
+    Returns:
+        A uint32 array with the canonical form of every input shape.
+    """
+    import numpy as np
+
+    bitmasks = np.asarray(bitmasks, dtype=np.uint32)
+    canonical = None
+    for chunk_tables in symmetry_tables(box_size, reflections):
+        image = np.zeros_like(bitmasks)
+        for chunk, table in enumerate(chunk_tables):
+            image |= np.asarray(table, dtype=np.uint32)[(bitmasks >> np.uint32(8 * chunk)) & np.uint32(0xFF)]
+        canonical = image if canonical is None else np.minimum(canonical, image)
+    return canonical
+
+
+def iter_polyominoes(box_size: int = 3, cell_count: Optional[int] = None) -> Iterator[int]:
+    """
+    Stream every connected shape that fits in a box_size x box_size box.
+
+    Shapes are grown one cell at a time from their lowest cell (Redelmeier's
+    algorithm), so disconnected candidates are never produced and each placement
+    in the box is yielded exactly once.
+
+    Args:
+        box_size: Side length of the bounding box.
+        cell_count: Only yield shapes with exactly this many cells; all sizes if None.
+
+    Yields:
+        Bitmasks with cell (i, j) stored at bit ``box_size * i + j``.
+    """
+    cells = box_size * box_size
+    max_cells = cells if cell_count is None else cell_count
+    if max_cells < 1:
+        return
+
+    neighbours = _neighbour_masks(box_size)
+
+    def grow(shape: int, untried: int, seen: int, size: int) -> Iterator[int]:
+        while untried:
+            bit = untried & -untried
+            untried ^= bit
+            child = shape | bit
+            if cell_count is None or size == cell_count:
+                yield child
+            if size < max_cells:
+                new_cells = neighbours[bit.bit_length() - 1] & ~seen
+                yield from grow(child, untried | new_cells, seen | new_cells, size + 1)
+
+    for root in range(cells):
+        # Cells before the root are forbidden so every shape is grown from its lowest cell only
+        yield from grow(0, 1 << root, (1 << (root + 1)) - 1, 1)
+
+
+class _CatalogAttribute:
+    """
+    Catalog attribute of ShapeGenerator that is computed on first access.
+
+    The value comes from the catalog memoized per class and configuration, and is
+    then stored on the instance, so later reads are plain attribute lookups and the
+    build methods can still assign the attribute while constructing a catalog.
+    """
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Optional['ShapeGenerator'], owner: type):
+        if instance is None:
+            return self
+        value = getattr(instance.catalog(), self.name)
+        instance.__dict__[self.name] = value
+        return value
+
+
+class _Catalog:
+    """
+    The containers making up one shape catalog, shared by every generator with the same configuration.
+    """
+    __slots__ = ('generated_shapes', 'unique_shapes', 'unique_shapes_2D', 'bounding_boxes', 'symmetry_classes')
+
+    def __init__(self, generated_shapes: Set[int], unique_shapes: Set[int], unique_shapes_2D: List[List[List[int]]],
+                 bounding_boxes: Dict[int, Tuple[int, int]], symmetry_classes: Dict[int, List[int]]):
+        self.generated_shapes = generated_shapes
+        self.unique_shapes = unique_shapes
+        self.unique_shapes_2D = unique_shapes_2D
+        self.bounding_boxes = bounding_boxes
+        self.symmetry_classes = symmetry_classes
+
 
 class ShapeGenerator:
     """
     This class is responsible for Tetromino shape generation and checking the uniqueness
+
+    Constructing a generator does no work. The catalog attributes below are built, or
+    loaded from the on-disk cache, the first time any of them is read, and are shared
+    by all generators with the same configuration, so treat them as read-only.
     """
 
-    def __init__(self):
+    generated_shapes = _CatalogAttribute()
+    unique_shapes = _CatalogAttribute()
+    unique_shapes_2D = _CatalogAttribute()
+    bounding_boxes = _CatalogAttribute()
+    symmetry_classes = _CatalogAttribute()
+
+    _catalogs: Dict[tuple, _Catalog] = {}
+
+    def __init__(self, box_size: int = 3, cell_count: Optional[int] = None, mode: str = "redelmeier",
+                 reflections: bool = False, use_cache: bool = True):
+        """
+        Args:
+            box_size: Side length of the square box the shapes are drawn in (up to 5).
+            cell_count: Restrict the catalog to shapes with this many cells; all sizes if None.
+            mode: "redelmeier" to grow connected shapes cell by cell, or "brute_force"
+                to test every bitmask of the box.
+            reflections: Treat mirror images as the same shape, not only rotations.
+            use_cache: Reuse the in-process and on-disk catalogs; if False every generator
+                builds its own catalog from scratch.
+        """
+        self.box_size = box_size
+        self.cell_count = cell_count
+        self.mode = mode
+        self.reflections = reflections
+        self.use_cache = use_cache
+        self._own_catalog: Optional[_Catalog] = None
+        self._sampler: Optional['PieceSampler'] = None
+
+    @classmethod
+    def clear_catalog_cache(cls) -> None:
+        """
+        Forget the in-process catalogs (the on-disk cache is left alone).
+        """
+        cls._catalogs.clear()
+
+    def catalog(self) -> _Catalog:
+        """
+        Get the catalog for this configuration, building or loading it on first use.
+        """
+        if not self.use_cache:
+            if self._own_catalog is None:
+                self._own_catalog = self.build_catalog()
+            return self._own_catalog
+
+        key = (type(self), self.box_size, self.cell_count, self.reflections, self.mode)
+        catalog = ShapeGenerator._catalogs.get(key)
+        if catalog is None:
+            path = cache_path(self.box_size, self.reflections, self.cell_count)
+            stored = ShapeCatalog.load(path, GENERATOR_VERSION, self.box_size, self.reflections, self.cell_count)
+            if stored is not None:
+                catalog = self.load_catalog(stored)
+            else:
+                catalog = self.build_catalog()
+                ShapeCatalog.from_shapes(self.box_size, self.reflections, self.cell_count, catalog.generated_shapes,
+                                         catalog.symmetry_classes, catalog.bounding_boxes).save(path, GENERATOR_VERSION)
+            ShapeGenerator._catalogs[key] = catalog
+        return catalog
+
+    def build_catalog(self) -> _Catalog:
+        """
+        Run the full generation pipeline: enumeration, isomorphism filtering, 2D conversion and bounding boxes.
+        """
         self.generate_shapes()
         self.unique_shapes = self.filter_isomorphic_shapes(self.generated_shapes)
-        
-        self.unique_shapes_2D = [self.bitmask_to_2D(shape) for shape in self.unique_shapes]
+
+        self.unique_shapes_2D = [self.bitmask_to_2D(shape, self.box_size) for shape in sorted(self.unique_shapes)]
         self.bounding_boxes = self.calculate_bounding_boxes()
+        return _Catalog(self.generated_shapes, self.unique_shapes, self.unique_shapes_2D,
+                        self.bounding_boxes, self.symmetry_classes)
+
+    @staticmethod
+    def load_catalog(catalog: ShapeCatalog) -> _Catalog:
+        """
+        Build the catalog containers from a (memory-mapped) shape catalog file.
+        """
+        unique_shapes = list(catalog.unique_shapes)
+        return _Catalog(set(catalog.generated_shapes),
+                        set(unique_shapes),
+                        [catalog.shape_2D(index) for index in range(len(unique_shapes))],
+                        {shape: catalog.bounding_box(index) for index, shape in enumerate(unique_shapes)},
+                        {shape: catalog.members(index) for index, shape in enumerate(unique_shapes)})
 
 
     def generate_shapes(self) -> None:
@@ -21,47 +333,62 @@ class ShapeGenerator:
         """
         self.generated_shapes = set()
 
-        for bitmask in range(1, 2 ** 9):  # Loop through all possible 3x3 grids
-            canonical_form = self.get_canonical_form(bitmask) # Find the canonical form of the shape
-            if self.is_connected(canonical_form):  # Check if the shape is a valid connected shape
-                self.generated_shapes.add(canonical_form)
+        if self.mode == "brute_force":
+            for bitmask in range(1, 2 ** (self.box_size ** 2)):  # Loop through all possible grids of the box
+                if self.cell_count is not None and bin(bitmask).count('1') != self.cell_count:
+                    continue
+                canonical_form = self.get_canonical_form(bitmask, self.box_size, self.reflections) # Find the canonical form of the shape
+                if self.is_connected(canonical_form):  # Check if the shape is a valid connected shape
+                    self.generated_shapes.add(canonical_form)
+        elif self.mode == "redelmeier":
+            candidates = iter_polyominoes(self.box_size, self.cell_count)
+            if self.box_size >= 5:  # Millions of candidates, canonicalize them as one array
+                import numpy as np
+                candidates = np.fromiter(candidates, dtype=np.uint32)
+                canonical_forms = np.unique(canonical_forms_array(candidates, self.box_size, self.reflections)).tolist()
+            else:
+                canonical_forms = {self.get_canonical_form(bitmask, self.box_size, self.reflections) for bitmask in candidates}
+
+            for canonical_form in canonical_forms:
+                # Candidates are connected by construction, only holes remain to be checked
+                if not has_holes(canonical_form, self.box_size):
+                    self.generated_shapes.add(canonical_form)
+        else:
+            raise ValueError(f"Unknown generation mode: {self.mode}")
 
 
     @staticmethod
-    def get_canonical_form(bitmask: int) -> int:
+    def get_canonical_form(bitmask: int, box_size: int = 3, reflections: bool = False) -> int:
         """
-        Generates all the rotations of a shape and returns the canonical (smallest) form.
+        Generates all the rotations (and optionally reflections) of a shape and returns
+        the canonical (smallest) form.
         """
-        rotations = [bitmask]
-        for _ in range(3):  # Three more rotations to consider
-            bitmask = ShapeGenerator.rotate_bitmask(bitmask)
-            rotations.append(bitmask)
+        return min(_apply_symmetry(chunk_tables, bitmask)
+                   for chunk_tables in symmetry_tables(box_size, reflections))
 
-        return min(rotations)
+    @staticmethod
+    def symmetric_forms(bitmask: int, box_size: int = 3, reflections: bool = False) -> List[int]:
+        """
+        Returns the images of a shape under every rotation (and optionally reflection),
+        in symmetry_permutations order.
+        """
+        return [_apply_symmetry(chunk_tables, bitmask)
+                for chunk_tables in symmetry_tables(box_size, reflections)]
 
 
     @staticmethod
-    def rotate_bitmask(bitmask: int) -> int:
+    def rotate_bitmask(bitmask: int, box_size: int = 3) -> int:
         """
         Rotates the shape represented by a bitmask 90 degrees clockwise.
         """
-        grid = [[0, 0, 0] for _ in range(3)]
-        for i in range(3):
-            for j in range(3):
-                cell_value = (bitmask >> (3 * i + j)) & 1
-                grid[i][j] = cell_value
-        
-        rotated_grid = [[0, 0, 0] for _ in range(3)]
-        for i in range(3):
-            for j in range(3):
-                rotated_grid[j][2 - i] = grid[i][j]
-
-        rotated_bitmask = 0
-        for i in range(3):
-            for j in range(3):
-                rotated_bitmask |= rotated_grid[i][j] << (3 * i + j)
+        return _apply_symmetry(symmetry_tables(box_size)[1], bitmask)
 
-        return rotated_bitmask
+    @staticmethod
+    def reflect_bitmask(bitmask: int, box_size: int = 3) -> int:
+        """
+        Mirrors the shape represented by a bitmask left to right.
+        """
+        return _apply_symmetry(symmetry_tables(box_size, True)[4], bitmask)
 
     def is_connected(self, bitmask: int) -> bool:
         """
@@ -73,88 +400,65 @@ class ShapeGenerator:
         Returns:
             True if the shape is connected and has no holes, False otherwise.
         """
-        num_ones = bin(bitmask).count('1')
-        grid = self.bitmask_to_grid(bitmask)
-        first_filled_cell = self.find_first_filled_cell(grid)
-
-        if first_filled_cell is not None:
-            visited = set()
-            to_visit = [first_filled_cell]
-
-            while to_visit:
-                current = to_visit.pop()
-                if current in visited:
-                    continue
-
-                visited.add(current)
-                x, y = current
-
-                if len(visited) == num_ones:
-                    break
-
-                for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                    new_x, new_y = x + dx, y + dy
-
-                    if (0 <= new_x < 3 and 0 <= new_y < 3) and (new_x, new_y) not in visited:
-                        if grid[new_x][new_y] == 1:
-                            to_visit.append((new_x, new_y))
-                        else:
-                            # Check if this empty cell is reachable from an edge; if not, it's a hole
-                            for edge_dx, edge_dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                                edge_x, edge_y = new_x + edge_dx, new_y + edge_dy
-                                if not (0 <= edge_x < 3 and 0 <= edge_y < 3):
-                                    break  # This empty cell is reachable from an edge, so it's not a hole
-                            else:
-                                return False  # This empty cell is not reachable from an edge; it's a hole
-
-            return len(visited) == num_ones
-        return False
+        if not bitmask:
+            return False
+        if _flood(bitmask & -bitmask, bitmask, self.box_size) != bitmask:
+            return False
+        return not has_holes(bitmask, self.box_size)
     
     def bitmask_to_grid(self, bitmask: int) -> List[List[int]]:
         """
-        Convert a bitmask to a 3x3 grid.
+        Convert a bitmask to a grid the size of the generator's box.
         
         Args:
             bitmask: The bitmask representing the shape.
             
         Returns:
-            The 3x3 grid representing the shape.
-        """
-        grid = [[0, 0, 0] for _ in range(3)]
-        for i in range(3):
-            for j in range(3):
-                cell_value = (bitmask >> (3 * i + j)) & 1
-                grid[i][j] = cell_value
-        return grid
+            The box_size x box_size grid representing the shape.
+        """
+        return self.bitmask_to_2D(bitmask, self.box_size)
     
     def find_first_filled_cell(self, grid: List[List[int]]) -> [Tuple[int, int]]:
         """
-        Find the first filled cell in a 3x3 grid.
+        Find the first filled cell in a square grid.
         
         Args:
-            grid: The 3x3 grid representing the shape.
+            grid: The grid representing the shape.
             
         Returns:
             The coordinates (i, j) of the first filled cell, or None if no cell is filled.
         """
-        for i in range(3):
-            for j in range(3):
-                if grid[i][j] == 1:
+        for i, row in enumerate(grid):
+            for j, cell in enumerate(row):
+                if cell == 1:
                     return i, j
         return None
 
-    def get_random_shape(self) -> List[List[int]]:
-        shape_bitmask = random.choice(list(self.generated_shapes))
-        shape_2D = self.bitmask_to_2D(shape_bitmask)
-        return shape_2D
+    def get_random_shape(self, sampler: Optional['PieceSampler'] = None) -> 'Shape':
+        """
+        Draw a random catalog shape as its interned, immutable Shape (indexable like the 2D lists).
+
+        Args:
+            sampler: Seeded sampler to draw from; if None, the generator's own sampler,
+                seeded once from the random module so random.seed still makes it repeatable.
+        """
+        if sampler is None:
+            sampler = self._sampler
+            if sampler is None:
+                from sampler import PieceSampler
+                from shapes import shape_of
+
+                shapes = [shape_of(bitmask, self.box_size) for bitmask in sorted(self.generated_shapes)]
+                sampler = self._sampler = PieceSampler(random.getrandbits(64), shapes=shapes)
+        return sampler.next_shape()
 
     @staticmethod
-    def bitmask_to_2D(bitmask: int) -> List[List[int]]:
+    def bitmask_to_2D(bitmask: int, box_size: int = 3) -> List[List[int]]:
         shape_2D = []
-        for row in range(3):
+        for row in range(box_size):
             shape_row = []
-            for col in range(3):
-                bit_position = 3 * row + col
+            for col in range(box_size):
+                bit_position = box_size * row + col
                 cell_value = (bitmask >> bit_position) & 1
                 shape_row.append(cell_value)
             shape_2D.append(shape_row)
@@ -173,9 +477,9 @@ class ShapeGenerator:
         for shape_2D in self.unique_shapes_2D:
                 # Convert the 2D shape back to its bitmask representation
                 shape_bitmask = 0
-                for row in range(3):
-                    for col in range(3):
-                        bit_position = 3 * row + col
+                for row in range(self.box_size):
+                    for col in range(self.box_size):
+                        bit_position = self.box_size * row + col
                         cell_value = shape_2D[row][col]
                         shape_bitmask |= cell_value << bit_position
                 
@@ -198,17 +502,19 @@ class ShapeGenerator:
         return bounding_boxes
     
     @staticmethod
-    def is_isomorphic(shape1: np.ndarray, shape2:np.ndarray) -> bool:
+    def is_isomorphic(shape1: 'np.ndarray', shape2: 'np.ndarray') -> bool:
         """
-        Check if two 3x3 shapes are isomorphic.
+        Check if two square shapes are isomorphic.
         
         Args:
-        - shape1: A 3x3 NumPy array representing the first shape.
-        - shape2: A 3x3 NumPy array representing the second shape.
+        - shape1: A square NumPy array representing the first shape.
+        - shape2: A square NumPy array representing the second shape.
         
         Returns:
         True if the shapes are isomorphic, False otherwise.
         """    
+        import numpy as np
+
         for _ in range(4):  # Rotate 0, 90, 180, and 270 degrees
             if np.array_equal(shape1, shape2):
                 return True
@@ -218,17 +524,29 @@ class ShapeGenerator:
         return False 
 
     def filter_isomorphic_shapes(self, unique_shapes: Set[int]) -> Set[int]:
-        non_isomorphic_shapes = set()
-        shape_list = list(unique_shapes)
-        
-        while shape_list:
-            shape = shape_list.pop()
-            non_isomorphic_shapes.add(shape)
-            
-            shape_2D = np.array(self.bitmask_to_2D(shape))
-            shape_list = [s for s in shape_list if not self.is_isomorphic(shape_2D, np.array(self.bitmask_to_2D(s)))]
-        
-        return non_isomorphic_shapes       
+        """
+        Group shapes into isomorphism classes in one pass, keyed by canonical form.
+
+        The classes are stored in self.symmetry_classes, mapping each representative
+        (the canonical form) to the sorted input shapes that belong to its class.
+
+        Args:
+            unique_shapes: Bitmasks of the shapes to filter.
+
+        Returns:
+            One representative per isomorphism class.
+        """
+        shapes = sorted(unique_shapes)
+        if len(shapes) >= _BULK_CANONICAL_THRESHOLD:
+            canonical_forms = canonical_forms_array(shapes, self.box_size, self.reflections).tolist()
+        else:
+            canonical_forms = [self.get_canonical_form(shape, self.box_size, self.reflections) for shape in shapes]
+
+        classes: Dict[int, List[int]] = {}
+        for shape, representative in zip(shapes, canonical_forms):
+            classes.setdefault(representative, []).append(shape)
+        self.symmetry_classes = {representative: classes[representative] for representative in sorted(classes)}
+        return set(classes)
 
 if __name__ == "__main__":
     shape_gen = ShapeGenerator()
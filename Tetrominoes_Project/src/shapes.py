@@ -0,0 +1,153 @@
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple, Union
+
+from shape_generation import ShapeGenerator
+
+
+class Shape:
+    """
+    Immutable, interned shape drawn in a box_size x box_size frame.
+
+    There is exactly one instance per (box size, frame bitmask), so shapes compare and
+    hash by identity and can key caches directly. Every catalog shape gets the id of
+    its position in sorted(ShapeGenerator(box_size).unique_shapes), as in BatchSimulator,
+    and its clockwise rotations share that id with rotation 1 to 3. A frame that is not
+    a rotation of a catalog shape gets the next free id the first time it is looked up.
+    cw and ccw link every shape to its rotation successor and predecessor, so rotating
+    is an attribute lookup.
+
+    A Shape reads like the nested lists it replaces: len(shape), iteration over rows and
+    shape[i][j] all work, with the rows as tuples.
+    """
+
+    __slots__ = ('id', 'rotation', 'bitmask', 'box_size', 'rows', 'cells', 'cell_offsets', 'bounding_box',
+                 'cw', 'ccw', '_orbit')
+
+    def __init__(self, shape_id: int, rotation: int, bitmask: int, box_size: int):
+        """
+        Args:
+            shape_id: Catalog id shared by every rotation of the shape.
+            rotation: Number of clockwise quarter turns from the catalog orientation.
+            bitmask: Frame bitmask, cell (i, j) at bit box_size * i + j.
+            box_size: Side of the frame.
+        """
+        rows = tuple(tuple((bitmask >> (box_size * i + j)) & 1 for j in range(box_size)) for i in range(box_size))
+        cells = tuple((i, j) for i in range(box_size) for j in range(box_size) if rows[i][j])
+        if cells:
+            min_row = min(i for i, _ in cells)
+            min_col = min(j for _, j in cells)
+            bounding_box = (min_row, min_col, max(i for i, _ in cells) - min_row + 1, max(j for _, j in cells) - min_col + 1)
+        else:
+            bounding_box = (0, 0, 0, 0)
+
+        set_attribute = object.__setattr__
+        set_attribute(self, 'id', shape_id)
+        set_attribute(self, 'rotation', rotation)
+        set_attribute(self, 'bitmask', bitmask)
+        set_attribute(self, 'box_size', box_size)
+        set_attribute(self, 'rows', rows)
+        set_attribute(self, 'cells', cells)
+        set_attribute(self, 'cell_offsets', tuple(box_size * i + j for i, j in cells))
+        set_attribute(self, 'bounding_box', bounding_box)
+        set_attribute(self, 'cw', None)
+        set_attribute(self, 'ccw', None)
+        set_attribute(self, '_orbit', ())
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError("Shape is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Shape is immutable")
+
+    def __reduce__(self):
+        # Unpickle to the interned instance
+        return shape_of, (self.bitmask, self.box_size)
+
+    def __len__(self) -> int:
+        return self.box_size
+
+    def __iter__(self) -> Iterator[Tuple[int, ...]]:
+        return iter(self.rows)
+
+    def __getitem__(self, index: int) -> Tuple[int, ...]:
+        return self.rows[index]
+
+    def __repr__(self) -> str:
+        return f"Shape(id={self.id}, rotation={self.rotation}, bitmask={self.bitmask:#x})"
+
+    def rotate(self, turns: int = 1) -> 'Shape':
+        """
+        The shape turned clockwise by a number of quarter turns (counterclockwise if negative).
+        """
+        return self._orbit[(self.rotation + turns) % 4]
+
+    def to_lists(self) -> List[List[int]]:
+        """
+        A fresh mutable copy as nested lists.
+        """
+        return [list(row) for row in self.rows]
+
+
+_interned: Dict[Tuple[int, int], Shape] = {}
+_next_ids: Dict[int, int] = {}
+
+
+def _intern_orbit(bitmask: int, box_size: int) -> Shape:
+    """
+    Create the instances of a shape's four rotations under a new id.
+    """
+    shape_id = _next_ids.get(box_size, 0)
+    _next_ids[box_size] = shape_id + 1
+    orbit = []
+    # The first four symmetries are the clockwise quarter turns
+    for rotation, form in enumerate(ShapeGenerator.symmetric_forms(bitmask, box_size)[:4]):
+        shape = _interned.get((box_size, form))
+        if shape is None:
+            shape = _interned[(box_size, form)] = Shape(shape_id, rotation, form, box_size)
+        orbit.append(shape)
+    orbit = tuple(orbit)
+    for rotation, shape in enumerate(orbit):
+        if not shape._orbit:
+            object.__setattr__(shape, '_orbit', orbit)
+            object.__setattr__(shape, 'cw', orbit[(rotation + 1) % 4])
+            object.__setattr__(shape, 'ccw', orbit[(rotation + 3) % 4])
+    return orbit[0]
+
+
+@lru_cache(maxsize=None)
+def catalog_shapes(box_size: int = 3) -> Tuple[Shape, ...]:
+    """
+    The interned catalog shapes of a box size, indexed by id.
+    """
+    return tuple(_intern_orbit(bitmask, box_size) for bitmask in sorted(ShapeGenerator(box_size).unique_shapes))
+
+
+def shape_of(bitmask: int, box_size: int = 3) -> Shape:
+    """
+    Look up the interned Shape of a frame bitmask.
+    """
+    catalog_shapes(box_size)
+    shape = _interned.get((box_size, bitmask))
+    if shape is None:
+        shape = _intern_orbit(bitmask, box_size)
+    return shape
+
+
+def as_shape(shape: Union[Shape, List[List[int]]]) -> Shape:
+    """
+    Convert a square 2D shape to its interned Shape; Shapes are returned unchanged.
+
+    Raises:
+        ValueError: If the shape is not square.
+    """
+    if isinstance(shape, Shape):
+        return shape
+    size = len(shape)
+    if any(len(row) != size for row in shape):
+        raise ValueError("Only square shapes can be interned")
+    bitmask = 0
+    for i, row in enumerate(shape):
+        for j, cell in enumerate(row):
+            if cell:
+                bitmask |= 1 << (size * i + j)
+    return shape_of(bitmask, size)
@@ -0,0 +1,230 @@
+import time
+from typing import Callable, NamedTuple, Optional
+
+import numpy as np
+
+from bitsets import MAX_COLUMNS, clear_full_lines, row_fit_maps, row_layouts, row_mask, unpack_bits
+from grid import board_masks
+from placements import placement_table
+from sampler import PieceSampler
+from shape_generation import ShapeGenerator
+
+
+class SimulationStats(NamedTuple):
+    """
+    Throughput and outcome of a batch of simulated games.
+    """
+    games: int
+    moves: int
+    elapsed: float
+    mean_score: float
+    finished: int
+
+    @property
+    def games_per_second(self) -> float:
+        return self.games / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def moves_per_second(self) -> float:
+        return self.moves / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def random_policy(simulator: 'BatchSimulator', legal: np.ndarray) -> np.ndarray:
+    """
+    Pick a uniformly random legal candidate for every game.
+
+    Args:
+        simulator: The simulator asking for moves (its rng is used).
+        legal: (games, candidates) boolean matrix of legal candidates.
+
+    Returns:
+        The chosen candidate index of every game (meaningless for games without a legal move).
+    """
+    keys = simulator.rng.random(legal.shape)
+    keys[~legal] = -1.0
+    return keys.argmax(axis=1)
+
+
+class BatchSimulator:
+    """
+    Headless Block Puzzle self-play for a whole batch of games in lockstep.
+
+    Boards that fit in 64 bits are a uint64 vector of bitboards (cell (row, col) at bit
+    row * columns + col, as in Grid); larger boards switch to packed row bitsets, a
+    (games, rows) uint64 array with column col of a row at bit col of its word (see
+    bitsets). Hotbars are arrays of catalog shape ids, and every step places one piece
+    in every running game with vectorized placement, line-clear and game-over checks.
+    """
+
+    def __init__(self, games: int, size: int = 8, hotbar_size: int = 3, seed: Optional[int] = None,
+                 policy: Callable[['BatchSimulator', np.ndarray], np.ndarray] = random_policy,
+                 line_reward: int = 10, sampler: Optional[PieceSampler] = None, packed: Optional[bool] = None):
+        """
+        Args:
+            games: Number of games simulated together.
+            size: Side length of the square board (at most 64).
+            hotbar_size: Number of pieces dealt at a time.
+            seed: Seed of the deals and of the random generator used by the default policy.
+            policy: Function choosing one candidate per game from the legal-candidate matrix.
+            line_reward: Score for every cleared row or column.
+            sampler: Source of the dealt pieces, e.g. with the real game's piece weights;
+                a uniform sampler with the same seed if None.
+            packed: Use packed row bitsets; automatic (only above 64 cells) if None.
+        """
+        if size > MAX_COLUMNS:
+            raise ValueError(f"BatchSimulator boards can have at most {MAX_COLUMNS} columns")
+        self.packed = size * size > 64 if packed is None else packed
+        if size * size > 64 and not self.packed:
+            raise ValueError("Boards above 64 cells must be packed")
+        self.games = games
+        self.size = size
+        self.hotbar_size = hotbar_size
+        self.rng = np.random.default_rng(seed)
+        if sampler is None:
+            sampler = PieceSampler(int(self.rng.integers(2 ** 63)) if seed is None else seed, hotbar_size=hotbar_size)
+        self.sampler = sampler
+        self.policy = policy
+        self.line_reward = line_reward
+
+        shape_gen = ShapeGenerator()
+        self.shape_ids = sorted(shape_gen.unique_shapes)
+        if self.packed:
+            # Candidates are anchor cells of the shape's bounding box, row * size + col
+            self.placements = size * size
+            self.row_mask = row_mask(size)
+            self.row_layouts = row_layouts()
+            height = max(layout.height for layout in self.row_layouts)
+            self.shape_words = np.zeros((len(self.row_layouts), height), dtype=np.uint64)
+            for shape_id, layout in enumerate(self.row_layouts):
+                self.shape_words[shape_id, :layout.height] = layout.words
+        else:
+            table = placement_table(size, size)
+            placements = [table.masks[bitmask] for bitmask in self.shape_ids]
+            width = max(len(masks) for masks in placements)
+            # Placement masks of every shape, padded with 0 and flagged by valid
+            self.masks = np.zeros((len(placements), width), dtype=np.uint64)
+            self.valid = np.zeros((len(placements), width), dtype=bool)
+            for shape_id, masks in enumerate(placements):
+                self.masks[shape_id, :len(masks)] = masks
+                self.valid[shape_id, :len(masks)] = True
+            self.placements = width
+
+            _, row_masks, column_masks = board_masks(size, size)
+            self.line_masks = np.array(row_masks + column_masks, dtype=np.uint64)
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Start every game over with an empty board and a fresh hotbar.
+        """
+        self.boards = np.zeros((self.games, self.size) if self.packed else self.games, dtype=np.uint64)
+        self.hotbars = self.deal(self.games)
+        self.used = np.zeros((self.games, self.hotbar_size), dtype=bool)
+        self.alive = np.ones(self.games, dtype=bool)
+        self.scores = np.zeros(self.games, dtype=np.int64)
+        self.move_counts = np.zeros(self.games, dtype=np.int64)
+
+    def deal(self, count: int) -> np.ndarray:
+        """
+        Draw count hotbars of catalog shape ids.
+        """
+        return self.sampler.hotbars(count, self.hotbar_size)
+
+    def legal_candidates(self) -> np.ndarray:
+        """
+        Legal (hotbar slot, placement) candidates of every game.
+
+        Returns:
+            (games, hotbar_size * placements) boolean matrix; candidate c is slot
+            c // placements at placement c % placements of that slot's shape, an index
+            into its placement table, or the anchor cell row * size + col of the shape's
+            bounding box when the boards are packed.
+        """
+        if self.packed:
+            return self._packed_legal_candidates()
+        masks = self.masks[self.hotbars]  # (games, slots, placements)
+        legal = (masks & self.boards[:, None, None]) == 0
+        legal &= self.valid[self.hotbars]
+        legal &= ~self.used[:, :, None]
+        legal &= self.alive[:, None, None]
+        return legal.reshape(self.games, -1)
+
+    def _packed_legal_candidates(self) -> np.ndarray:
+        """
+        legal_candidates for packed boards, from the fit map of every distinct hotbar shape.
+        """
+        empty = ~self.boards & self.row_mask
+        fits = np.zeros((self.games, self.hotbar_size, self.size), dtype=np.uint64)
+        for shape_id in np.unique(self.hotbars).tolist():
+            games, slots = np.nonzero(self.hotbars == shape_id)
+            fits[games, slots] = row_fit_maps(np.ascontiguousarray(empty[games].T), self.row_layouts[shape_id], self.size).T
+        fits[self.used] = 0
+        fits[~self.alive] = 0
+        return unpack_bits(fits, self.size).reshape(self.games, -1)
+
+    def step(self) -> np.ndarray:
+        """
+        Place one piece in every running game, clear full lines and detect game over.
+
+        Returns:
+            The placement mask applied to every game (0 where no move was made), as
+            (games, rows) row words when the boards are packed.
+        """
+        legal = self.legal_candidates()
+        can_move = legal.any(axis=1)
+        self.alive &= can_move
+
+        choice = self.policy(self, legal)
+        slots = choice // self.placements
+        rows = np.arange(self.games)
+        shapes = self.hotbars[rows, slots]
+        if self.packed:
+            anchor_rows, anchor_columns = np.divmod(choice % self.placements, self.size)
+            placed = np.zeros_like(self.boards)
+            for offset in range(self.shape_words.shape[1]):
+                # Rows past the board only ever receive the zero padding of shorter shapes
+                target = np.minimum(anchor_rows + offset, self.size - 1)
+                words = self.shape_words[shapes, offset] << anchor_columns.astype(np.uint64)
+                placed[rows, target] |= np.where(can_move, words, np.uint64(0))
+            self.boards, lines = clear_full_lines(self.boards | placed, self.size)
+        else:
+            placed = np.where(can_move, self.masks[shapes, choice % self.placements], np.uint64(0))
+            boards = self.boards | placed
+            full = (boards[:, None] & self.line_masks) == self.line_masks
+            cleared = np.bitwise_or.reduce(np.where(full, self.line_masks, np.uint64(0)), axis=1)
+            self.boards = boards & ~cleared
+            lines = full.sum(axis=1)
+        self.scores += lines * self.line_reward
+        self.move_counts += can_move
+
+        self.used[rows[can_move], slots[can_move]] = True
+        refill = self.used.all(axis=1)
+        if refill.any():
+            self.hotbars[refill] = self.deal(int(refill.sum()))
+            self.used[refill] = False
+        return placed
+
+    def run(self, max_moves: int = 1000) -> SimulationStats:
+        """
+        Step every game until all are over or max_moves steps were taken.
+
+        Returns:
+            SimulationStats: Games and moves simulated, wall time, mean score and how many games ended.
+        """
+        start = time.perf_counter()
+        moves_before = int(self.move_counts.sum())
+        for _ in range(max_moves):
+            if not self.alive.any():
+                break
+            self.step()
+        elapsed = time.perf_counter() - start
+        return SimulationStats(self.games, int(self.move_counts.sum()) - moves_before, elapsed,
+                               float(self.scores.mean()), int((~self.alive).sum()))
+
+
+if __name__ == "__main__":
+    simulator = BatchSimulator(10000, seed=0)
+    stats = simulator.run()
+    print(f"{stats.games} games, {stats.moves} moves in {stats.elapsed:.2f}s: "
+          f"{stats.games_per_second:,.0f} games/s, {stats.moves_per_second:,.0f} moves/s, "
+          f"mean score {stats.mean_score:.1f}")
@@ -0,0 +1,182 @@
+import heapq
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from grid import Grid, Move, shape_key
+from placements import placement_table
+from transposition import TranspositionTable, ZobristHasher
+
+
+class SolverResult(NamedTuple):
+    """
+    Best placement sequence found by a search, with its statistics.
+    """
+    moves: Tuple[Move, ...]
+    score: float
+    board: int
+    lines_cleared: int
+    nodes: int
+    elapsed: float
+    timed_out: bool
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+
+# (value, board, remaining hotbar slots, moves so far, lines cleared so far)
+_State = Tuple[float, int, Tuple[int, ...], Tuple[Move, ...], int]
+
+
+def default_evaluation(board: int, grid: Grid) -> float:
+    """
+    Score a board by its free space, penalizing empty cells with no empty neighbour.
+
+    Args:
+        board: Occupancy bitboard.
+        grid: Grid providing the board geometry.
+
+    Returns:
+        Higher is better.
+    """
+    empty = grid.full_mask & ~board
+    first_column = grid.column_masks[0]
+    last_column = grid.column_masks[-1]
+    neighbours = ((empty >> 1) & ~last_column) | ((empty << 1) & ~first_column) | (empty >> grid.columns) | (empty << grid.columns)
+    isolated = empty & ~neighbours
+    return empty.bit_count() - 2 * isolated.bit_count()
+
+
+class Solver:
+    """
+    Beam search over every placement order and position of the hotbar pieces.
+
+    Each level of the search places one more piece: every state in the beam is
+    expanded with every remaining hotbar piece at every valid position, full rows
+    and columns are cleared, and the best beam_width children are kept.
+    """
+
+    def __init__(self, evaluate: Callable[[int, Grid], float] = default_evaluation, beam_width: int = 64,
+                 depth: Optional[int] = None, time_budget: Optional[float] = None, line_reward: float = 10.0,
+                 transposition_table: Optional[TranspositionTable] = None):
+        """
+        Args:
+            evaluate: Function scoring a board, higher is better.
+            beam_width: Number of states kept after each level.
+            depth: Maximum number of pieces to place; the whole hotbar if None.
+            time_budget: Seconds after which the search stops and returns its best sequence so far.
+            line_reward: Score added for every cleared row or column.
+            transposition_table: Table used to skip states reached again through another
+                placement order and to reuse evaluations across searches.
+        """
+        self.evaluate = evaluate
+        self.beam_width = beam_width
+        self.depth = depth
+        self.time_budget = time_budget
+        self.line_reward = line_reward
+        self.transposition_table = transposition_table
+        self.hashers: Dict[int, ZobristHasher] = {}
+        self.total_nodes = 0
+        self.total_time = 0.0
+
+    @property
+    def nodes_per_second(self) -> float:
+        """
+        Search throughput over every call to solve so far.
+        """
+        return self.total_nodes / self.total_time if self.total_time > 0 else 0.0
+
+    def solve(self, grid: Grid, hotbar: List[List[List[int]]]) -> SolverResult:
+        """
+        Find the best sequence of placements for the hotbar pieces.
+
+        Parameters:
+            grid (Grid): The current board, a list-of-lists board is converted.
+            hotbar (List[List[List[int]]]): Shapes available to place, e.g. from ShapeGenerator.get_random_shape.
+
+        Returns:
+            SolverResult: The best sequence found. Its moves are empty if no piece fits.
+        """
+        if not isinstance(grid, Grid):
+            grid = Grid.from_rows(grid)
+        start = time.perf_counter()
+        deadline = None if self.time_budget is None else start + self.time_budget
+        if self.transposition_table is not None:
+            self.transposition_table.new_search()
+
+        beam, nodes, timed_out = self.search(grid, hotbar, grid.board, tuple(range(len(hotbar))), deadline)
+
+        elapsed = time.perf_counter() - start
+        self.total_nodes += nodes
+        self.total_time += elapsed
+        value, board, _, moves, lines = beam[0]
+        return SolverResult(moves, value, board, lines, nodes, elapsed, timed_out)
+
+    def search(self, grid: Grid, hotbar: List[List[List[int]]], board: int, remaining: Tuple[int, ...],
+               deadline: Optional[float], moves: Tuple[Move, ...] = (), lines: int = 0) -> Tuple[List[_State], int, bool]:
+        """
+        Run the beam search from one state.
+
+        Returns:
+            The deepest non-empty beam (best state first), the number of nodes
+            generated and whether the deadline was hit.
+        """
+        table = placement_table(grid.rows, grid.columns)
+        shape_masks = [table.masks_for(shape) for shape in hotbar]
+        shape_positions = [table.positions_for(shape) for shape in hotbar]
+        shape_keys = [shape_key(shape) for shape in hotbar]
+        depth = len(remaining) if self.depth is None else min(self.depth, len(remaining))
+
+        table_entries = self.transposition_table
+        if table_entries is not None:
+            hasher = self.hashers.get(grid.rows * grid.columns)
+            if hasher is None:
+                hasher = self.hashers[grid.rows * grid.columns] = ZobristHasher(grid.rows * grid.columns)
+            piece_hashes: Dict[Tuple[int, ...], int] = {}
+
+        beam: List[_State] = [(self.evaluate(board, grid) + lines * self.line_reward, board, remaining, moves, lines)]
+        nodes = 0
+        timed_out = False
+        for _ in range(depth):
+            children: List[_State] = []
+            for _, state_board, state_remaining, state_moves, state_lines in beam:
+                if deadline is not None and time.perf_counter() > deadline:
+                    timed_out = True
+                    break
+                tried = set()
+                for slot, index in enumerate(state_remaining):
+                    # Identical pieces lead to identical subtrees, expand only the first one
+                    if shape_keys[index] in tried:
+                        continue
+                    tried.add(shape_keys[index])
+                    rest = state_remaining[:slot] + state_remaining[slot + 1:]
+                    if table_entries is not None:
+                        rest_hash = piece_hashes.get(rest)
+                        if rest_hash is None:
+                            rest_hash = piece_hashes[rest] = hasher.hash_pieces(shape_keys[i] for i in rest)
+                    for mask, position in zip(shape_masks[index], shape_positions[index]):
+                        if mask & state_board:
+                            continue
+                        child_board, cleared = grid.clear_lines(state_board | mask)
+                        child_lines = state_lines + cleared
+                        if table_entries is None:
+                            evaluation = self.evaluate(child_board, grid)
+                        else:
+                            key = hasher.hash_board(child_board) ^ rest_hash
+                            entry = table_entries.probe(key)
+                            if entry is None:
+                                evaluation = self.evaluate(child_board, grid)
+                            elif entry.age == table_entries.generation and entry.lines >= child_lines:
+                                continue  # Already reached this search through another placement order
+                            else:
+                                evaluation = entry.value
+                            table_entries.store(key, evaluation, len(rest), child_lines)
+                        value = evaluation + child_lines * self.line_reward
+                        children.append((value, child_board, rest, state_moves + (Move(index, position, mask),), child_lines))
+            nodes += len(children)
+            if not children:
+                break
+            beam = heapq.nlargest(self.beam_width, children, key=lambda state: state[0])
+            if timed_out:
+                break
+        return beam, nodes, timed_out
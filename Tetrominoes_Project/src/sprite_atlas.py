@@ -0,0 +1,124 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+import pygame
+
+from shapes import Shape, as_shape, catalog_shapes, shape_of
+
+
+class Theme(NamedTuple):
+    """
+    Colors of a rendered piece.
+    """
+    fill: Tuple[int, int, int] = (255, 255, 255)
+    border: Tuple[int, int, int] = (128, 128, 128)
+    hotbar_fill: Tuple[int, int, int] = (255, 255, 255)
+
+
+DEFAULT_THEME = Theme()
+
+# (shape id, number of clockwise quarter turns from the catalog orientation)
+SpriteKey = Tuple[int, int]
+
+
+class SpriteAtlas:
+    """
+    Pre-rendered piece surfaces at board scale and hotbar scale.
+
+    Sprites are keyed by the (id, rotation) of the interned Shape, so catalog shapes
+    keep the ids BatchSimulator uses. A sprite covers the shape's whole box frame, so
+    blitting it at the frame's top-left corner lines up with Tetromino's (x, y)
+    convention and drawing a piece is a single blit. Shapes that are not a rotation
+    of a catalog shape are rendered the first time they are drawn.
+    """
+
+    def __init__(self, cell_size: int, hotbar_cell_size: int = 10, theme: Theme = DEFAULT_THEME,
+                 box_size: int = 3):
+        """
+        Args:
+            cell_size: Side of a board cell in pixels.
+            hotbar_cell_size: Side of a hotbar cell in pixels.
+            theme: Colors of the pieces.
+            box_size: Side of the shape frames, matching the ShapeGenerator catalog.
+        """
+        self.cell_size = cell_size
+        self.hotbar_cell_size = hotbar_cell_size
+        self.theme = theme
+        self.box_size = box_size
+
+        self.shapes: Dict[int, Shape] = {shape.id: shape for shape in catalog_shapes(box_size)}
+        self.board_sprites: Dict[SpriteKey, pygame.Surface] = {}
+        self.hotbar_sprites: Dict[SpriteKey, pygame.Surface] = {}
+        self.rebuilds = 0
+        self.build()
+
+    def render(self, shape: Shape, cell_size: int, fill: Tuple[int, int, int],
+               border: Optional[Tuple[int, int, int]]) -> pygame.Surface:
+        """
+        Draw one frame of a shape onto a transparent surface.
+        """
+        size = shape.box_size * cell_size
+        sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+        for i, j in shape.cells:
+            rect = pygame.Rect(j * cell_size, i * cell_size, cell_size, cell_size)
+            sprite.fill(fill, rect)
+            if border is not None:
+                pygame.draw.rect(sprite, border, rect, 1)
+        return sprite
+
+    def build(self) -> None:
+        """
+        Render every known shape at both scales.
+        """
+        for shape in self.shapes.values():
+            self.build_shape(shape)
+        self.rebuilds += 1
+
+    def build_shape(self, shape: Shape) -> None:
+        """
+        Render the four rotations of one shape at both scales. Rotations that look the
+        same (e.g. every rotation of the plus) are one interned Shape and share one surface.
+        """
+        for rotation in range(4):
+            form = shape.rotate(rotation)
+            key = (shape.id, rotation)
+            if form.rotation != rotation:
+                sprites = self.board_sprites[(form.id, form.rotation)], self.hotbar_sprites[(form.id, form.rotation)]
+            else:
+                sprites = (self.render(form, self.cell_size, self.theme.fill, self.theme.border),
+                           self.render(form, self.hotbar_cell_size, self.theme.hotbar_fill, None))
+            self.board_sprites[key], self.hotbar_sprites[key] = sprites
+
+    def configure(self, cell_size: Optional[int] = None, hotbar_cell_size: Optional[int] = None,
+                  theme: Optional[Theme] = None) -> bool:
+        """
+        Change the scale or theme, rebuilding the sprites only if something actually changed.
+
+        Returns:
+            True if the sprites were rebuilt.
+        """
+        settings = (cell_size or self.cell_size, hotbar_cell_size or self.hotbar_cell_size, theme or self.theme)
+        if settings == (self.cell_size, self.hotbar_cell_size, self.theme):
+            return False
+        self.cell_size, self.hotbar_cell_size, self.theme = settings
+        self.board_sprites.clear()
+        self.hotbar_sprites.clear()
+        self.build()
+        return True
+
+    def key_for(self, shape: Union[Shape, int, List[List[int]]]) -> SpriteKey:
+        """
+        Look up the (shape id, rotation) of a shape or frame bitmask, rendering it if it is new.
+        """
+        shape = shape_of(shape, self.box_size) if isinstance(shape, int) else as_shape(shape)
+        key = (shape.id, shape.rotation)
+        if key not in self.board_sprites:
+            base = self.shapes[shape.id] = shape.rotate(-shape.rotation)
+            self.build_shape(base)
+        return key
+
+    def sprite(self, shape: Union[Shape, int, List[List[int]]], hotbar: bool = False) -> pygame.Surface:
+        """
+        The pre-rendered surface of a shape at board scale, or at hotbar scale.
+        """
+        sprites = self.hotbar_sprites if hotbar else self.board_sprites
+        return sprites[self.key_for(shape)]
@@ -0,0 +1,45 @@
+import json
+import os
+import tempfile
+import unittest
+from benchmark import board_fixtures, board_scaling, compare, evaluation_fixtures, hotbar_fixtures, main
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_fixtures_are_stable(self):
+        self.assertEqual(board_fixtures(), board_fixtures())
+        self.assertEqual(hotbar_fixtures(), hotbar_fixtures())
+        self.assertTrue(any(all(row) for row in board_fixtures()[0]))
+        self.assertEqual(evaluation_fixtures().tolist(), evaluation_fixtures().tolist())
+        self.assertEqual(evaluation_fixtures(16, 10).shape, (16, 10))
+
+    def test_board_scaling(self):
+        results = board_scaling(sizes=(8, 12), games=8, moves=3, boards=16)
+        self.assertEqual([results[size]['cells'] for size in (8, 12)], [64, 144])
+        self.assertEqual([results[size]['packed'] for size in (8, 12)], [False, True])
+        for row in results.values():
+            self.assertGreater(row['simulator_seconds_per_move'], 0)
+            self.assertGreater(row['grid_seconds_per_move'], 0)
+            self.assertGreater(row['evaluate_seconds_per_board'], 0)
+
+    def test_compare_flags_regressions(self):
+        baseline = {'a': {'seconds_per_call': 1.0}, 'b': {'seconds_per_call': 1.0}}
+        results = {'a': {'seconds_per_call': 1.05}, 'b': {'seconds_per_call': 1.5}, 'c': {'seconds_per_call': 1.0}}
+        rows = {row['name']: row for row in compare(results, baseline, threshold=0.1)}
+        self.assertEqual(set(rows), {'a', 'b'})
+        self.assertFalse(rows['a']['regression'])
+        self.assertTrue(rows['b']['regression'])
+
+    def test_json_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'bench.json')
+            self.assertEqual(main(['--repeat', '1', '--only', 'handle_line_clears', '--output', output]), 0)
+            with open(output) as file:
+                report = json.load(file)
+            self.assertIn('handle_line_clears_grid', report['results'])
+            self.assertEqual(main(['--repeat', '1', '--only', 'handle_line_clears', '--compare', output,
+                                   '--threshold', '100']), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import random
+import unittest
+import numpy as np
+from bitsets import clear_full_lines, pack_rows, popcount, row_fit_maps, row_layouts, unpack_bits, unpack_rows
+from grid import Grid
+from shapes import catalog_shapes
+
+
+class TestBitsets(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(5)
+        self.size = 12
+        self.boards = [0, (1 << 144) - 1] + [rng.getrandbits(144) | rng.getrandbits(144) for _ in range(10)]
+
+    def test_pack_round_trip(self):
+        packed = pack_rows(self.boards, self.size, self.size)
+        self.assertEqual(packed.shape, (len(self.boards), self.size))
+        self.assertEqual(unpack_rows(packed, self.size), self.boards)
+        self.assertEqual(popcount(packed).sum(axis=1).tolist(), [board.bit_count() for board in self.boards])
+        cells = unpack_bits(packed, self.size)
+        self.assertEqual(cells.shape, (len(self.boards), self.size, self.size))
+        self.assertEqual(cells[3].tolist(), [[bool(self.boards[3] >> (r * self.size + c) & 1) for c in range(self.size)]
+                                             for r in range(self.size)])
+
+    def test_fit_maps_match_grid(self):
+        grid = Grid((self.size, self.size))
+        empty = np.ascontiguousarray((~pack_rows(self.boards, self.size, self.size) & np.uint64((1 << self.size) - 1)).T)
+        for shape, layout in zip(catalog_shapes(), row_layouts()):
+            fits = unpack_rows(row_fit_maps(empty, layout, self.size).T, self.size)
+            self.assertEqual(fits, [grid.fit_map(shape, board) for board in self.boards])
+
+    def test_clear_full_lines_matches_grid(self):
+        grid = Grid((self.size, self.size))
+        boards = self.boards + [(1 << self.size) - 1 | sum(1 << (r * self.size + 3) for r in range(self.size))]
+        cleared, lines = clear_full_lines(pack_rows(boards, self.size, self.size), self.size)
+        expected = [grid.clear_lines(board) for board in boards]
+        self.assertEqual(unpack_rows(cleared, self.size), [board for board, _ in expected])
+        self.assertEqual(lines.tolist(), [count for _, count in expected])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import random
+import unittest
+from collections import deque
+import numpy as np
+from bitsets import pack_rows
+from evaluation import DEFAULT_WEIGHTS, FEATURES, BoardEvaluator, measure_throughput, popcount
+from grid import Grid
+from placements import placement_table
+from shape_generation import ShapeGenerator
+from solver import Solver
+
+
+def open_cells(filled, size):
+    """
+    Breadth-first search of the empty cells reachable from an empty cell on the edge of the board.
+    """
+    edge = [(r, c) for r in range(size) for c in range(size) if r in (0, size - 1) or c in (0, size - 1)]
+    seen = {cell for cell in edge if not filled(*cell)}
+    queue = deque(seen)
+    while queue:
+        r, c = queue.popleft()
+        for cell in ((r + 1, c), (r - 1, c), (r, c + 1), (r, c - 1)):
+            if cell not in seen and not filled(*cell):
+                seen.add(cell)
+                queue.append(cell)
+    return seen
+
+
+def reference_features(board, size, missing_limit):
+    """
+    Straightforward per-cell computation of every feature.
+    """
+    filled = lambda r, c: r < 0 or c < 0 or r >= size or c >= size or (board >> (r * size + c)) & 1
+    empty = sum(not filled(r, c) for r in range(size) for c in range(size))
+    holes = empty - len(open_cells(filled, size))
+    row_transitions = sum(bool(filled(r, c)) != bool(filled(r, c + 1)) for r in range(size) for c in range(-1, size))
+    column_transitions = sum(bool(filled(r, c)) != bool(filled(r + 1, c)) for c in range(size) for r in range(-1, size))
+    lines = [sum(filled(r, c) for c in range(size)) for r in range(size)] + \
+            [sum(filled(r, c) for r in range(size)) for c in range(size)]
+    near_full = sum(0 < size - count <= missing_limit for count in lines)
+    table = placement_table(size, size)
+    counts = [len(table.legal_masks(bitmask, board)) for bitmask in sorted(ShapeGenerator().unique_shapes)]
+    return [empty, holes, row_transitions, column_transitions, near_full, sum(counts), counts.count(0)]
+
+
+class TestBoardEvaluator(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        self.boards = [0, (1 << 64) - 1] + [rng.getrandbits(64) & rng.getrandbits(64) for _ in range(20)] + \
+                      [rng.getrandbits(64) | rng.getrandbits(64) for _ in range(20)]
+
+    def test_features_match_reference(self):
+        evaluator = BoardEvaluator()
+        features = evaluator.features(np.array(self.boards, dtype=np.uint64))
+        for board, row in zip(self.boards, features):
+            self.assertEqual(row.tolist(), reference_features(board, 8, evaluator.near_full_missing))
+
+    def test_packed_boards_match_reference(self):
+        rng = random.Random(4)
+        boards = [0, (1 << 100) - 1] + [rng.getrandbits(100) & rng.getrandbits(100) for _ in range(8)]
+        evaluator = BoardEvaluator(10)
+        self.assertTrue(evaluator.packed)
+        features = evaluator.features(pack_rows(boards, 10, 10))
+        for board, row in zip(boards, features):
+            self.assertEqual(row.tolist(), reference_features(board, 10, evaluator.near_full_missing))
+        self.assertEqual(evaluator.evaluate(boards).tolist(), (features @ evaluator.weights).tolist())
+        self.assertEqual(evaluator(boards[2], Grid((10, 10))), evaluator.evaluate(boards[2:3])[0])
+
+        # Small boards give the same features either way
+        packed = BoardEvaluator(packed=True)
+        np.testing.assert_array_equal(packed.features(pack_rows(self.boards, 8, 8)),
+                                      BoardEvaluator().features(np.array(self.boards, dtype=np.uint64)))
+
+    def test_enclosed_holes(self):
+        def board_with_gaps(size, gaps):
+            board = (1 << (size * size)) - 1
+            for r, c in gaps:
+                board &= ~(1 << (r * size + c))
+            return board
+
+        # A 2x2 cavity and a single cell are cut off; the corner gap and the notch reach the edge
+        gaps = [(2, 2), (2, 3), (3, 2), (3, 3), (5, 5), (0, 0), (7, 4), (6, 4)]
+        holes = FEATURES.index('enclosed_holes')
+        self.assertEqual(BoardEvaluator().features(np.array([board_with_gaps(8, gaps)], dtype=np.uint64))[0, holes], 5)
+        self.assertEqual(BoardEvaluator(packed=True).features(pack_rows([board_with_gaps(8, gaps)], 8, 8))[0, holes], 5)
+
+        # A winding cavity takes many fill steps to rule out, and opening one end frees all of it
+        spiral = [(1, c) for c in range(1, 9)] + [(r, 8) for r in range(2, 9)] + [(8, c) for c in range(2, 8)] + \
+                 [(r, 2) for r in range(3, 8)] + [(3, c) for c in range(3, 7)]
+        evaluator = BoardEvaluator(10)
+        features = evaluator.features(pack_rows([board_with_gaps(10, spiral), board_with_gaps(10, spiral + [(1, 0)])], 10, 10))
+        self.assertEqual(features[:, holes].tolist(), [len(spiral), 0])
+
+    def test_placement_counts_match_table(self):
+        evaluator = BoardEvaluator(6)
+        table = placement_table(6, 6)
+        boards = [board & ((1 << 36) - 1) for board in self.boards]
+        counts = evaluator.placement_counts(np.array(boards, dtype=np.uint64))
+        for board, row in zip(boards, counts):
+            self.assertEqual(row.tolist(), [len(table.legal_masks(bitmask, board)) for bitmask in evaluator.shape_ids])
+
+    def test_weights(self):
+        evaluator = BoardEvaluator(weights={'empty_cells': 2.0})
+        self.assertEqual(evaluator.weights[FEATURES.index('empty_cells')], 2.0)
+        self.assertEqual(evaluator.weights[FEATURES.index('enclosed_holes')], DEFAULT_WEIGHTS['enclosed_holes'])
+        boards = np.array(self.boards, dtype=np.uint64)
+        np.testing.assert_allclose(evaluator.evaluate(boards), evaluator.features(boards) @ evaluator.weights)
+        evaluator.set_weights({'empty_cells': 0.0})
+        self.assertEqual(evaluator.weights[FEATURES.index('empty_cells')], 0.0)
+        with self.assertRaises(ValueError):
+            evaluator.set_weights({'height': 1.0})
+        with self.assertRaises(ValueError):
+            BoardEvaluator(65)
+        with self.assertRaises(ValueError):
+            BoardEvaluator(9, packed=False)
+
+    def test_popcount(self):
+        values = np.array(self.boards, dtype=np.uint64)
+        self.assertEqual(popcount(values).tolist(), [board.bit_count() for board in self.boards])
+
+    def test_solver_evaluate_function(self):
+        evaluator = BoardEvaluator()
+        grid = Grid((8, 8))
+        self.assertEqual(evaluator(self.boards[2], grid), evaluator.evaluate([self.boards[2]])[0])
+        result = Solver(evaluate=evaluator, beam_width=4).solve(grid, [[[1, 1, 0], [0, 0, 0], [0, 0, 0]]])
+        self.assertEqual(len(result.moves), 1)
+
+    def test_throughput(self):
+        self.assertGreater(measure_throughput(BoardEvaluator(), self.boards, repeats=1), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
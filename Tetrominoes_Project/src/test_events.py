@@ -0,0 +1,96 @@
+import contextlib
+import io
+import unittest
+from events import GAME_OVER, LINE_CLEAR, PLACEMENT, EventBus, EventStats
+from grid import Grid, LineClear
+from tetromino_functionality import Tetromino
+
+DOMINO = [[1, 1, 0], [0, 0, 0], [0, 0, 0]]
+
+
+class TestEventBus(unittest.TestCase):
+    def test_subscribers_in_order(self):
+        bus = EventBus()
+        calls = []
+        bus.subscribe('tick', lambda value: calls.append(('a', value)))
+
+        @bus.on('tick')
+        def second(value):
+            calls.append(('b', value))
+
+        bus.emit('tick', 1)
+        bus.unsubscribe('tick', second)
+        bus.emit('tick', 2)
+        self.assertEqual(calls, [('a', 1), ('b', 1), ('a', 2)])
+        with self.assertRaises(ValueError):
+            bus.unsubscribe('tick', second)
+
+    def test_unknown_events_are_silent(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            EventBus().emit('nobody_listens', 1)
+        self.assertEqual(output.getvalue(), '')
+
+    def test_dispatch_is_resolved_at_registration(self):
+        bus = EventBus()
+        handler = lambda *args: None
+        bus.subscribe(PLACEMENT, handler)
+        # A single subscriber is called directly, with no wrapper in between
+        self.assertIs(bus.dispatchers[PLACEMENT], handler)
+        bus.unsubscribe(PLACEMENT, handler)
+        self.assertNotIn(PLACEMENT, bus.dispatchers)
+
+    def test_instrumentation(self):
+        stats = EventStats()
+        bus = EventBus(stats)
+        calls = []
+        record = calls.append
+        bus.subscribe('tick', record)
+        for value in range(3):
+            bus.emit('tick', value)
+        bus.emit(GAME_OVER, None, None)
+        report = stats.report()
+        self.assertEqual(report['tick']['count'], 3)
+        self.assertEqual(report[GAME_OVER]['count'], 1)
+        self.assertGreaterEqual(report['tick']['seconds'], 0.0)
+        self.assertEqual(calls, [0, 1, 2])
+
+        bus.instrument(None)
+        self.assertIs(bus.dispatchers['tick'], record)
+        bus.emit('tick', 3)
+        self.assertEqual(stats.counts['tick'], 3)
+        stats.reset()
+        self.assertEqual(stats.counts['tick'], 0)
+
+
+class TestTetrominoEvents(unittest.TestCase):
+    def test_placement_line_clear_and_game_over(self):
+        bus = EventBus()
+        seen = []
+        for event in (PLACEMENT, LINE_CLEAR, GAME_OVER):
+            bus.subscribe(event, lambda tetromino, payload, event=event: seen.append((event, payload)))
+
+        grid = Grid((2, 2))
+        first = Tetromino(DOMINO, 0, 0, [DOMINO], bus)
+        first.set_in_place(grid)
+        second = Tetromino(DOMINO, 0, 1, [DOMINO], bus)
+        second.set_in_place(grid)
+        self.assertEqual(seen, [(PLACEMENT, grid), (LINE_CLEAR, LineClear((0,), (), 1)),
+                                (PLACEMENT, grid), (LINE_CLEAR, LineClear((1,), (), 1))])
+
+        seen.clear()
+        grid.board = 0b0110  # Only diagonal cells left, no domino fits
+        Tetromino(DOMINO, 0, 0, [DOMINO], bus).set_in_place(grid)
+        self.assertEqual(seen, [(GAME_OVER, grid)])
+
+    def test_legacy_decorator_and_failure_signature(self):
+        tetromino = Tetromino(DOMINO, 0, 0, [DOMINO])
+        calls = []
+        tetromino.event_handler(GAME_OVER)(lambda piece, grid: calls.append(grid))
+        rows = [[1, 0], [0, 1]]
+        tetromino.handle_set_in_place_failure(rows)
+        self.assertEqual(calls, [rows])
+
+
+if __name__ == '__main__':
+    unittest.main()
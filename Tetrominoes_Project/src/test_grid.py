@@ -0,0 +1,184 @@
+import random
+import unittest
+from grid import Grid, LineClear
+from shape_generation import ShapeGenerator
+from tetromino_functionality import Tetromino
+
+L_SHAPE = [[1, 0, 0],
+           [1, 0, 0],
+           [1, 1, 0]]
+
+
+class TestGrid(unittest.TestCase):
+    def test_mask_for_bounds(self):
+        grid = Grid((8, 8))
+        self.assertEqual(grid.mask_for(L_SHAPE, 0, 0), 0b1 | 0b1 << 8 | 0b11 << 16)
+        self.assertIsNotNone(grid.mask_for(L_SHAPE, 6, 5))
+        self.assertIsNone(grid.mask_for(L_SHAPE, 7, 0))
+        self.assertIsNone(grid.mask_for(L_SHAPE, 0, 6))
+
+        # Empty leading rows/columns of the 3x3 frame may hang off the board
+        shape = [[0, 0, 0],
+                 [0, 1, 1],
+                 [0, 0, 0]]
+        self.assertEqual(grid.mask_for(shape, -1, -1), 0b11)
+
+    def test_place_and_validate(self):
+        grid = Grid((8, 8))
+        tetromino = Tetromino(L_SHAPE, 0, 0, [])
+        self.assertTrue(grid.is_valid_placement(tetromino, (2, 3)))
+        self.assertTrue(grid.place_tetromino(tetromino, (2, 3)))
+        self.assertFalse(grid.is_valid_placement(tetromino, (2, 3)))
+        self.assertFalse(grid.place_tetromino(tetromino, (3, 3)))
+        self.assertTrue(grid.is_filled(2, 3))
+        self.assertTrue(grid.is_filled(3, 5))
+        self.assertEqual(bin(grid.board).count('1'), 4)
+
+    def test_row_column_clear(self):
+        rows = [[0] * 8 for _ in range(8)]
+        rows[2] = [1] * 8
+        for row in rows:
+            row[5] = 1
+        grid = Grid.from_rows(rows)
+
+        self.assertEqual(grid.full_lines(), ([2], [5]))
+        self.assertEqual(grid.row_column_clear(), LineClear((2,), (5,), 2))
+        self.assertEqual(grid.board, 0)
+        self.assertEqual(grid.row_counts, [0] * 8)
+        self.assertEqual(grid.column_counts, [0] * 8)
+
+    def test_incremental_counters(self):
+        grid = Grid((8, 8))
+        bar = [[1, 1, 1], [0, 0, 0], [0, 0, 0]]
+        grid.place_mask(grid.mask_for(bar, 0, 7))
+        grid.place_mask(grid.mask_for(bar, 3, 7))
+        self.assertEqual(grid.row_column_clear(), LineClear((), (), 0))
+        self.assertEqual(grid.row_counts[7], 6)
+
+        # Fill column 7 except the bottom cell, then complete row 7 and column 7 with one piece
+        for y in range(7):
+            grid.place_mask(grid.mask_for([[1]], 7, y))
+        grid.row_column_clear()
+        grid.place_mask(grid.mask_for([[1, 1]], 6, 7))
+        self.assertEqual(grid.dirty_rows, {7})
+        self.assertEqual(grid.row_column_clear(), LineClear((7,), (7,), 2))
+        self.assertEqual(grid.board, 0)
+        self.assertEqual(grid.row_counts, [0] * 8)
+        self.assertEqual(grid.column_counts, [0] * 8)
+
+    def test_overlapping_or_out_of_bounds_placements_are_rejected(self):
+        grid = Grid((8, 8))
+        grid.place_mask(grid.mask_for([[1, 1]], 0, 0))
+        with self.assertRaises(ValueError):
+            grid.place_mask(grid.mask_for([[1]], 1, 0))
+        self.assertEqual((grid.row_counts[0], grid.column_counts[1]), (2, 1))
+
+        tetromino = Tetromino([[1, 1, 1], [0, 0, 0], [0, 0, 0]], 6, 0, [])
+        with self.assertRaises(ValueError):
+            tetromino.update_grid(grid)
+        self.assertEqual(grid.row_counts[0], 2)
+
+    def test_counters_follow_board_assignment(self):
+        grid = Grid((4, 4))
+        grid.board = 0b1111 | 1 << 4 | 1 << 8 | 1 << 12
+        self.assertEqual(grid.row_counts, [4, 1, 1, 1])
+        self.assertEqual(grid.column_counts, [4, 1, 1, 1])
+        self.assertEqual(grid.row_column_clear(), LineClear((0,), (0,), 2))
+        self.assertEqual(grid.board, 0)
+
+    def test_tetromino_clears_rows_and_columns_in_place(self):
+        rows = [[0] * 8 for _ in range(8)]
+        rows[0] = [1] * 7 + [0]
+        for row in rows[1:]:
+            row[7] = 1
+        rows[3][2] = 1
+        tetromino = Tetromino([[1]], 7, 0, [])
+        tetromino.set_in_place(rows)
+
+        self.assertEqual(tetromino.last_clear, LineClear((0,), (7,), 2))
+        self.assertEqual(tetromino.score, 20)
+        expected = [[0] * 8 for _ in range(8)]
+        expected[3][2] = 1
+        self.assertEqual(rows, expected)
+        # Cleared rows are independent lists, not aliases of one another
+        rows[0][0] = 1
+        self.assertEqual(sum(map(sum, rows)), 2)
+
+    def test_round_trip(self):
+        rows = [[(i * j) % 2 for j in range(6)] for i in range(5)]
+        self.assertEqual(Grid.from_rows(rows).to_rows(), rows)
+
+    def test_tetromino_uses_grid(self):
+        grid = Grid((8, 8))
+        tetromino = Tetromino(L_SHAPE, 0, 0, [])
+        tetromino.set_in_place(grid)
+        self.assertFalse(tetromino.is_valid_move(L_SHAPE, 0, 0, grid))
+        self.assertTrue(tetromino.is_valid_move(L_SHAPE, 2, 0, grid))
+
+
+    def test_fit_map_matches_mask_for(self):
+        rng = random.Random(7)
+        shapes = ShapeGenerator().unique_shapes_2D
+        for _ in range(20):
+            grid = Grid((8, 8))
+            grid.board = rng.getrandbits(64) & rng.getrandbits(64)
+            for shape in shapes:
+                min_row = min(i for i, row in enumerate(shape) if any(row))
+                min_col = min(j for row in shape for j, cell in enumerate(row) if cell)
+                expected = 0
+                for y in range(-2, 8):
+                    for x in range(-2, 8):
+                        mask = grid.mask_for(shape, x, y)
+                        if mask is not None and grid.can_place(mask):
+                            expected |= 1 << ((y + min_row) * 8 + x + min_col)
+                self.assertEqual(grid.fit_map(shape), expected)
+
+    def test_hotbar_fits(self):
+        rows = [[(i + j) % 2 for j in range(8)] for i in range(8)]
+        grid = Grid.from_rows(rows)
+        single = [[1, 0, 0], [0, 0, 0], [0, 0, 0]]
+        domino = [[1, 1, 0], [0, 0, 0], [0, 0, 0]]
+        self.assertEqual(grid.hotbar_fits([domino, domino]), (True, [0, 0]))
+        self.assertEqual(grid.hotbar_fits([domino, single, domino]), (False, [0, 32, 0]))
+
+        tetromino = Tetromino(single, 0, 0, [domino, single])
+        self.assertEqual(tetromino.check_game_over(rows), (False, [0, 32]))
+        self.assertEqual(Grid((8, 8)).hotbar_fits([L_SHAPE]), (False, [42]))
+
+    def test_legal_moves_match_is_valid_move(self):
+        rng = random.Random(11)
+        domino = [[0, 0, 0], [0, 1, 1], [0, 0, 0]]
+        hotbar = [L_SHAPE, domino, L_SHAPE]
+        for _ in range(10):
+            grid = Grid((8, 8))
+            grid.board = rng.getrandbits(64) & rng.getrandbits(64)
+            moves = grid.legal_moves(hotbar)
+            self.assertFalse(isinstance(moves, list))
+            moves = list(moves)
+
+            expected = []
+            for index, shape in enumerate(hotbar[:2]):
+                tetromino = Tetromino(shape, 0, 0, hotbar)
+                for y in range(-2, 8):
+                    for x in range(-2, 8):
+                        if tetromino.is_valid_move(shape, x, y, grid):
+                            expected.append((index, (x, y), grid.mask_for(shape, x, y)))
+            self.assertEqual(sorted(moves), sorted(expected))
+            self.assertEqual(grid.hotbar_fits(hotbar)[1][:2], [sum(move.hotbar_index == i for move in moves) for i in range(2)])
+
+            arrays = grid.legal_move_arrays(hotbar)
+            self.assertEqual(arrays.mask.dtype.name, 'uint64')
+            self.assertEqual(list(zip(arrays.hotbar_index.tolist(), zip(arrays.x.tolist(), arrays.y.tolist()),
+                                      arrays.mask.tolist())), moves)
+
+    def test_legal_move_arrays_large_and_blocked(self):
+        grid = Grid((10, 10))
+        arrays = grid.legal_move_arrays([L_SHAPE])
+        self.assertEqual(arrays.mask.tolist(), [move.mask for move in grid.legal_moves([L_SHAPE])])
+        self.assertEqual(len(arrays.x), 8 * 9)
+        grid.board = grid.full_mask
+        self.assertEqual(list(grid.legal_moves([L_SHAPE])), [])
+        self.assertEqual(len(grid.legal_move_arrays([L_SHAPE]).mask), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import random
+import unittest
+from grid import Grid
+from parallel_solver import ParallelSolver, measure_speedup
+from shape_generation import ShapeGenerator
+from solver import Solver
+
+
+class TestParallelSolver(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.solver = ParallelSolver(max_workers=2, beam_width=10 ** 6)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.solver.close()
+
+    def test_matches_exhaustive_search(self):
+        rng = random.Random(5)
+        shapes = ShapeGenerator().unique_shapes_2D
+        for _ in range(3):
+            grid = Grid((8, 8))
+            grid.board = rng.getrandbits(64) & rng.getrandbits(64)
+            hotbar = [rng.choice(shapes) for _ in range(3)]
+            expected = Solver(beam_width=10 ** 6).solve(grid, hotbar)
+            result = self.solver.solve(grid, hotbar)
+            self.assertEqual(result.score, expected.score)
+            self.assertEqual(len(result.moves), len(expected.moves))
+
+    def test_deterministic(self):
+        grid = Grid((8, 8))
+        grid.board = 0x00FF00000000F00F
+        hotbar = ShapeGenerator().unique_shapes_2D[:3]
+        with ParallelSolver(max_workers=2, beam_width=16) as pooled:
+            results = {pooled.solve(grid, hotbar).moves for _ in range(3)}
+        with ParallelSolver(max_workers=1, beam_width=16, chunks_per_worker=1) as single:
+            results.add(single.solve(grid, hotbar).moves)
+        self.assertEqual(len(results), 1)
+
+    def test_nothing_fits(self):
+        rows = [[(i + j) % 2 for j in range(8)] for i in range(8)]
+        result = self.solver.solve(rows, [[[1, 1, 1], [0, 0, 0], [0, 0, 0]]])
+        self.assertEqual(result.moves, ())
+
+    def test_time_budget_covers_the_whole_call(self):
+        grid = Grid((8, 8))
+        hotbar = ShapeGenerator().unique_shapes_2D[20:23]
+        with ParallelSolver(max_workers=2, beam_width=10 ** 6, time_budget=0.1) as pooled:
+            pooled.solve(grid, hotbar)  # Start the workers outside the timed call
+            result = pooled.solve(grid, hotbar)
+        self.assertTrue(result.timed_out)
+        # Restarting the budget per chunk used to take several budgets
+        self.assertLess(result.elapsed, 0.1 * 2)
+        self.assertTrue(result.moves)
+
+    def test_speedup_report(self):
+        hotbar = ShapeGenerator().unique_shapes_2D[:2]
+        report = measure_speedup(Grid((8, 8)), hotbar, max_workers=2, repeats=1, beam_width=4)
+        self.assertEqual([row['workers'] for row in report], [1, 2])
+        self.assertEqual(report[0]['speedup'], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
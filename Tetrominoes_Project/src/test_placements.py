@@ -0,0 +1,65 @@
+import unittest
+from grid import Grid
+from placements import placement_table, shape_bitmask
+from shape_generation import ShapeGenerator
+from shapes import catalog_shapes, shape_of
+from tetromino_functionality import Tetromino
+
+
+class TestPlacementTable(unittest.TestCase):
+    def test_table_is_cached_per_board_size(self):
+        self.assertIs(placement_table(8, 8), placement_table(8, 8))
+        self.assertIsNot(placement_table(8, 8), placement_table(10, 10))
+
+    def test_masks_match_grid(self):
+        grid = Grid((8, 8))
+        table = placement_table(8, 8)
+        for bitmask in ShapeGenerator().unique_shapes:
+            shape = ShapeGenerator.bitmask_to_2D(bitmask)
+            expected = {grid.mask_for(shape, x, y) for y in range(-2, 8) for x in range(-2, 8)} - {None}
+            self.assertEqual(set(table.masks[bitmask]), expected)
+            for mask, (x, y) in zip(table.masks[bitmask], table.positions[bitmask]):
+                self.assertEqual(grid.mask_for(shape, x, y), mask)
+
+    def test_mask_at_matches_grid(self):
+        grid = Grid((8, 8))
+        table = placement_table(8, 8)
+        for base in catalog_shapes():
+            for shape in (base, base.cw, base.ccw):
+                for y in range(-3, 9):
+                    for x in range(-3, 9):
+                        self.assertEqual(table.mask_at(shape, x, y), grid.mask_for(shape, x, y))
+
+    def test_shapes_of_mixed_box_sizes_do_not_share_entries(self):
+        grid = Grid((8, 8))
+        table = placement_table(8, 8)
+        vertical = [[1], [1]]
+        split = [[1, 0, 1], [0, 0, 0], [0, 0, 0]]
+        large = shape_of(0b101, 4)
+        self.assertEqual(shape_bitmask(vertical), shape_bitmask(split))
+        self.assertEqual(shape_bitmask(large), shape_bitmask(split))
+        for shape in (vertical, split, large):
+            expected = [grid.mask_for(shape, x, y) for x, y in table.positions_for(shape)]
+            self.assertEqual(list(table.masks_for(shape)), expected)
+        self.assertEqual(table.masks_for(split)[0], 0b101)
+        self.assertEqual(table.masks_for(vertical)[:2], (257, 514))
+
+    def test_legal_masks(self):
+        table = placement_table(8, 8)
+        single = shape_bitmask([[1, 0, 0], [0, 0, 0], [0, 0, 0]])
+        self.assertEqual(len(table.legal_masks(single, 0)), 64)
+        self.assertEqual(table.legal_masks(single, (1 << 64) - 2), [1])
+
+    def test_game_over(self):
+        square = [[1, 1, 0], [1, 1, 0], [0, 0, 0]]
+        rows = [[(i + j) % 2 for j in range(8)] for i in range(8)]
+        tetromino = Tetromino(square, 0, 0, [square])
+        self.assertTrue(tetromino.is_game_over(rows))
+
+        rows[6][6] = rows[6][7] = rows[7][6] = rows[7][7] = 0
+        self.assertFalse(tetromino.is_game_over(rows))
+        self.assertFalse(tetromino.is_game_over(Grid.from_rows(rows)))
+
+
+if __name__ == '__main__':
+    unittest.main()
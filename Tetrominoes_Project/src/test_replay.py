@@ -0,0 +1,120 @@
+import os
+import random
+import tempfile
+import unittest
+from grid import Grid
+from replay import ReplayReader, ReplayWriter, replay, verify
+from shape_generation import ShapeGenerator
+from shapes import as_shape
+from tetromino_functionality import Tetromino
+
+
+def play_random_game(writer, seed, max_moves=60):
+    """
+    Play a random game with Grid and Tetromino, recording it, and return the boards after every move.
+    """
+    rng = random.Random(seed)
+    shape_gen = ShapeGenerator()
+    shapes = sorted(shape_gen.unique_shapes)
+    grid = Grid((8, 8))
+    tetromino = Tetromino(None, 0, 0, [])
+    boards = []
+    writer.begin_game(seed)
+    hotbar = []
+    for _ in range(max_moves):
+        if not any(hotbar):
+            hotbar = [as_shape(ShapeGenerator.bitmask_to_2D(rng.choice(shapes))).rotate(rng.randrange(4)) for _ in range(3)]
+            writer.deal(hotbar)
+        moves = list(grid.legal_moves([shape or [[0]] for shape in hotbar]))
+        if not moves:
+            break
+        slot, position, mask = rng.choice(moves)
+        writer.place(slot, hotbar[slot], position)
+        tetromino.shape, (tetromino.x, tetromino.y) = hotbar[slot], position
+        tetromino.set_in_place(grid)
+        hotbar[slot] = None
+        boards.append(grid.board)
+    writer.end_game(tetromino.score)
+    return boards, tetromino.score
+
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'games.bin')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def record(self, games=5, close=True):
+        writer = ReplayWriter(self.path)
+        played = [play_random_game(writer, seed) for seed in range(games)]
+        if close:
+            writer.close()
+        else:
+            writer.file.close()  # Simulate a crash: no index written
+        return played
+
+    def test_round_trip_and_random_access(self):
+        played = self.record()
+        with ReplayReader(self.path) as reader:
+            self.assertEqual(len(reader), len(played))
+            for index in reversed(range(len(played))):
+                boards, score = played[index]
+                seed, _, recorded_score = reader.header(index)
+                self.assertEqual((seed, recorded_score), (index, score))
+                state = replay(reader, index)
+                self.assertEqual((state.grid.board, state.score, state.moves), (boards[-1], score, len(boards)))
+                self.assertTrue(verify(reader, index))
+                for moves in (1, len(boards) // 2):
+                    self.assertEqual(replay(reader, index, moves).grid.board, boards[moves - 1])
+
+    def test_records_are_compact(self):
+        played = self.record(games=1)
+        records = sum(1 for _ in ReplayReader(self.path).records(0))
+        self.assertLessEqual(records, 2 * len(played[0][0]) + 3)
+        self.assertLess(os.path.getsize(self.path), 64 + records * 5 + 16)
+
+    def test_file_without_index_is_scanned(self):
+        played = self.record(close=False)
+        with open(self.path, 'ab') as file:
+            file.write(b'\x01\x02')  # Partial trailing game header
+        with ReplayReader(self.path) as reader:
+            self.assertIsInstance(reader.offsets, list)
+            self.assertEqual(len(reader), len(played))
+            self.assertEqual(replay(reader, 3).score, played[3][1])
+
+    def test_rejects_foreign_files_and_shapes(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'not a replay file at all')
+        with self.assertRaises(ValueError):
+            ReplayReader(self.path)
+        with ReplayWriter(self.path) as writer:
+            writer.begin_game(0)
+            with self.assertRaises(ValueError):
+                writer.place(0, [[1, 0, 1], [0, 0, 0], [0, 0, 0]], (0, 0))  # Disconnected, not a catalog frame
+            with self.assertRaises(ValueError):
+                writer.begin_game(1)
+        with self.assertRaises(ValueError):
+            ReplayWriter(self.path, 300, 8)
+
+    def test_rejects_shapes_that_were_not_dealt(self):
+        dealt, other = (as_shape(ShapeGenerator.bitmask_to_2D(bitmask)) for bitmask in sorted(ShapeGenerator().unique_shapes)[:2])
+        for records in ([('place', 0, dealt)],                               # Placed before any deal
+                        [('deal', 0, dealt), ('place', 1, dealt)],           # From a slot never dealt
+                        [('deal', 0, dealt), ('place', 0, other)],           # Not the shape in the slot
+                        [('deal', 0, dealt), ('place', 0, dealt), ('place', 0, dealt)]):  # Slot already used
+            with ReplayWriter(self.path) as writer:
+                writer.begin_game(0)
+                for kind, slot, shape in records:
+                    if kind == 'deal':
+                        writer.deal([shape], [slot])
+                    else:
+                        writer.place(slot, shape, (0, 0))
+                writer.end_game(0)
+            with ReplayReader(self.path) as reader, self.assertRaisesRegex(ValueError, 'was not dealt'):
+                replay(reader, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
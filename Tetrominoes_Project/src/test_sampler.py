@@ -0,0 +1,74 @@
+import random
+import unittest
+import numpy as np
+from sampler import PieceSampler
+from shape_generation import ShapeGenerator
+from shapes import catalog_shapes
+from simulator import BatchSimulator
+
+
+class TestPieceSampler(unittest.TestCase):
+    def test_seeded_draws_repeat(self):
+        first, second = PieceSampler(7), PieceSampler(7)
+        self.assertEqual([first.next_id() for _ in range(100)], [second.next_id() for _ in range(100)])
+        self.assertNotEqual(PieceSampler(7).ids(100).tolist(), PieceSampler(8).ids(100).tolist())
+        self.assertNotEqual(PieceSampler(7).ids(100).tolist(), PieceSampler(7, stream=1).ids(100).tolist())
+
+    def test_batch_matches_scalar_draws(self):
+        scalar, batch = PieceSampler(3), PieceSampler(3)
+        hotbars = batch.hotbars(50)
+        self.assertEqual(hotbars.shape, (50, 3))
+        self.assertEqual(hotbars.dtype, np.int64)
+        expected = [[shape.id for shape in scalar.hotbar()] for _ in range(50)]
+        self.assertEqual(hotbars.tolist(), expected)
+        self.assertEqual(scalar.counter, batch.counter)
+
+    def test_skip_ahead(self):
+        reference = PieceSampler(11).ids(1000)
+        sampler = PieceSampler(11)
+        sampler.skip(600)
+        self.assertEqual(sampler.ids(400).tolist(), reference[600:].tolist())
+        sampler.seek(250)
+        self.assertEqual(sampler.next_id(), reference[250])
+
+    def test_weights(self):
+        shapes = catalog_shapes()
+        weights = [0.0] * len(shapes)
+        weights[4], weights[9] = 1.0, 3.0
+        ids = PieceSampler(5, weights).ids(20000)
+        self.assertEqual(set(ids.tolist()), {4, 9})
+        self.assertAlmostEqual((ids == 9).mean(), 0.75, delta=0.02)
+
+        uniform = np.bincount(PieceSampler(5).ids(58000), minlength=len(shapes))
+        self.assertEqual(len(uniform), len(shapes))
+        self.assertGreater(uniform.min(), 800)
+
+        for bad in ([1.0], [-1.0] + [1.0] * (len(shapes) - 1), [0.0] * len(shapes)):
+            with self.assertRaises(ValueError):
+                PieceSampler(weights=bad)
+
+    def test_get_random_shape(self):
+        sampler = PieceSampler(2)
+        shape_gen = ShapeGenerator()
+        self.assertIs(shape_gen.get_random_shape(sampler), catalog_shapes()[PieceSampler(2).next_id()])
+
+        # Without a sampler, random.seed still makes a new generator's draws repeatable
+        draws = []
+        for _ in range(2):
+            random.seed(9)
+            shape_gen = ShapeGenerator()
+            draws.append([shape_gen.get_random_shape() for _ in range(20)])
+        self.assertEqual(draws[0], draws[1])
+
+    def test_simulator_deals_from_sampler(self):
+        simulator = BatchSimulator(8, seed=4)
+        self.assertEqual(simulator.hotbars.tolist(), PieceSampler(4).hotbars(8).tolist())
+
+        weights = [0.0] * len(simulator.shape_ids)
+        weights[0] = 1.0
+        simulator = BatchSimulator(8, seed=4, sampler=PieceSampler(4, weights))
+        self.assertTrue((simulator.hotbars == 0).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
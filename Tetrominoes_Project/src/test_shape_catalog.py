@@ -0,0 +1,117 @@
+import mmap
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import shape_generation
+from shape_catalog import ShapeCatalog, cache_path
+from shape_generation import ShapeGenerator, GENERATOR_VERSION
+
+
+class TestShapeCatalogCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env = mock.patch.dict(os.environ, {'TETROMINOES_CACHE_DIR': self.temp_dir.name})
+        self.env.start()
+        ShapeGenerator.clear_catalog_cache()
+
+    def tearDown(self):
+        ShapeGenerator.clear_catalog_cache()
+        self.env.stop()
+        self.temp_dir.cleanup()
+
+    def assertSameCatalog(self, loaded, built):
+        self.assertEqual(loaded.generated_shapes, built.generated_shapes)
+        self.assertEqual(loaded.unique_shapes, built.unique_shapes)
+        self.assertEqual(loaded.unique_shapes_2D, built.unique_shapes_2D)
+        self.assertEqual(loaded.bounding_boxes, built.bounding_boxes)
+        self.assertEqual(loaded.symmetry_classes, built.symmetry_classes)
+
+    def test_round_trip(self):
+        for reflections in (False, True):
+            built = ShapeGenerator(reflections=reflections)
+            built.catalog()
+            path = cache_path(3, reflections, None)
+            self.assertTrue(os.path.exists(path))
+
+            ShapeGenerator.clear_catalog_cache()
+            with mock.patch.object(ShapeGenerator, 'generate_shapes', side_effect=AssertionError('cache miss')):
+                loaded = ShapeGenerator(reflections=reflections)
+                loaded.catalog()
+            self.assertSameCatalog(loaded, built)
+
+    def test_keyed_by_configuration(self):
+        ShapeGenerator().catalog()
+        ShapeGenerator(4, cell_count=4).catalog()
+        self.assertNotEqual(cache_path(3, False, None), cache_path(4, False, 4))
+        self.assertTrue(os.path.exists(cache_path(4, False, 4)))
+        self.assertIsNone(ShapeCatalog.load(cache_path(3, False, None), GENERATOR_VERSION, 3, True, None))
+
+    def test_rebuilt_on_version_change(self):
+        ShapeGenerator().catalog()
+        path = cache_path(3, False, None)
+        self.assertIsNotNone(ShapeCatalog.load(path, GENERATOR_VERSION, 3, False, None))
+
+        ShapeGenerator.clear_catalog_cache()
+        with mock.patch.object(shape_generation, 'GENERATOR_VERSION', GENERATOR_VERSION + 1):
+            ShapeGenerator().catalog()
+            self.assertIsNotNone(ShapeCatalog.load(path, GENERATOR_VERSION + 1, 3, False, None))
+        self.assertIsNone(ShapeCatalog.load(path, GENERATOR_VERSION, 3, False, None))
+
+    def test_corrupt_file_is_ignored(self):
+        path = cache_path(3, False, None)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(b'TETSHAPE')
+        self.assertIsNone(ShapeCatalog.load(path, GENERATOR_VERSION, 3, False, None))
+        self.assertSameCatalog(ShapeGenerator(), ShapeGenerator(use_cache=False))
+
+    def test_failed_load_closes_mapping(self):
+        ShapeGenerator().catalog()
+        path = cache_path(3, False, None)
+        with open(path, 'rb') as file:
+            data = file.read()
+        truncated = os.path.join(self.temp_dir.name, 'truncated.bin')
+        with open(truncated, 'wb') as file:
+            file.write(data[:len(data) // 2])
+
+        real_mmap = mmap.mmap
+        mapped = []
+
+        def recording_mmap(*args, **kwargs):
+            mapped.append(real_mmap(*args, **kwargs))
+            return mapped[-1]
+
+        with mock.patch.object(mmap, 'mmap', side_effect=recording_mmap):
+            self.assertIsNone(ShapeCatalog.load(path, GENERATOR_VERSION + 1, 3, False, None))
+            self.assertIsNone(ShapeCatalog.load(truncated, GENERATOR_VERSION, 3, False, None))
+            catalog = ShapeCatalog.load(path, GENERATOR_VERSION, 3, False, None)
+        self.assertEqual([mapping.closed for mapping in mapped], [True, True, False])
+        self.assertEqual(len(catalog.unique_shapes), len(ShapeGenerator(use_cache=False).unique_shapes))
+
+
+class TestLazyShapeGenerator(unittest.TestCase):
+    def test_construction_is_lazy_and_shared(self):
+        ShapeGenerator.clear_catalog_cache()
+        with mock.patch.object(ShapeGenerator, 'build_catalog', side_effect=AssertionError('eager build')):
+            ShapeGenerator()
+
+        first, second = ShapeGenerator(), ShapeGenerator()
+        self.assertIs(first.unique_shapes, second.unique_shapes)
+        self.assertIsNot(ShapeGenerator(reflections=True).unique_shapes, first.unique_shapes)
+
+    def test_numpy_not_imported(self):
+        script = ('import sys; from shape_generation import ShapeGenerator; '
+                  'g = ShapeGenerator(); g.unique_shapes; g.get_random_shape(); '
+                  'ShapeGenerator(4, use_cache=False).unique_shapes; '
+                  'sys.exit("numpy" in sys.modules)')
+        directory = os.path.dirname(os.path.abspath(shape_generation.__file__))
+        result = subprocess.run([sys.executable, '-c', script], cwd=directory)
+        self.assertEqual(result.returncode, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
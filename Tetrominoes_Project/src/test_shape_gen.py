@@ -1,5 +1,5 @@
 import unittest
-from shape_generation import ShapeGenerator
+from shape_generation import ShapeGenerator, iter_polyominoes, has_holes, symmetry_permutations, canonical_forms_array
 import numpy as np
 
 class TestShapeGeneration(unittest.TestCase):
@@ -79,5 +79,106 @@ class TestShapeGeneration(unittest.TestCase):
             bounding_box_dimensions = (max_row - min_row + 1, max_col - min_col + 1)
             self.assertEqual(dimensions, bounding_box_dimensions)
 
+class TestPolyominoEnumeration(unittest.TestCase):
+    @staticmethod
+    def flood_connected(bitmask, box_size):
+        cells = {(i, j) for i in range(box_size) for j in range(box_size) if bitmask >> (box_size * i + j) & 1}
+        start = next(iter(cells))
+        seen, stack = {start}, [start]
+        while stack:
+            i, j = stack.pop()
+            for cell in ((i + 1, j), (i - 1, j), (i, j + 1), (i, j - 1)):
+                if cell in cells and cell not in seen:
+                    seen.add(cell)
+                    stack.append(cell)
+        return len(seen) == len(cells)
+
+    def test_enumeration_matches_brute_force(self):
+        shapes = list(iter_polyominoes(3))
+        self.assertEqual(len(shapes), len(set(shapes)))
+        expected = {m for m in range(1, 2 ** 9) if self.flood_connected(m, 3)}
+        self.assertEqual(set(shapes), expected)
+
+    def test_enumeration_by_cell_count(self):
+        shapes = list(iter_polyominoes(4, cell_count=4))
+        self.assertEqual(len(shapes), len(set(shapes)))
+        expected = {m for m in range(1, 2 ** 16) if bin(m).count('1') == 4 and self.flood_connected(m, 4)}
+        self.assertEqual(set(shapes), expected)
+
+    def test_modes_agree(self):
+        self.assertEqual(ShapeGenerator(use_cache=False).generated_shapes,
+                         ShapeGenerator(mode="brute_force", use_cache=False).generated_shapes)
+        self.assertIn(0b000000111, ShapeGenerator().generated_shapes)
+
+    def test_holes_are_rejected(self):
+        shape_gen = ShapeGenerator()
+        self.assertFalse(shape_gen.is_connected(0b111101111))
+        self.assertFalse(shape_gen.is_connected(0b011101111))
+        self.assertNotIn(0b111101111, shape_gen.generated_shapes)
+        self.assertFalse(has_holes(0b111101111, 4))
+
+
+class TestSymmetryTables(unittest.TestCase):
+    def test_tables_match_permutations(self):
+        for box_size in range(1, 6):
+            permutations = symmetry_permutations(box_size)
+            self.assertEqual(len(set(permutations)), 8 if box_size > 1 else 1)
+            for bitmask in (1, 0b1011, (1 << (box_size * box_size)) - 1 >> 1):
+                forms = ShapeGenerator.symmetric_forms(bitmask, box_size, reflections=True)
+                for perm, form in zip(permutations, forms):
+                    expected = sum(1 << perm[b] for b in range(box_size * box_size) if bitmask >> b & 1)
+                    self.assertEqual(form, expected)
+
+    def test_rotation_cycle(self):
+        bitmask = 0b0000000000111001
+        rotated = bitmask
+        for _ in range(4):
+            rotated = ShapeGenerator.rotate_bitmask(rotated, 4)
+        self.assertEqual(rotated, bitmask)
+        self.assertEqual(ShapeGenerator.reflect_bitmask(0b000000011), 0b000000110)
+
+    def test_canonical_with_reflections(self):
+        # S and Z tetrominoes are only equivalent once reflections are allowed
+        s_shape = 0b000011110
+        z_shape = 0b000110011
+        self.assertNotEqual(ShapeGenerator.get_canonical_form(s_shape), ShapeGenerator.get_canonical_form(z_shape))
+        self.assertEqual(ShapeGenerator.get_canonical_form(s_shape, reflections=True),
+                         ShapeGenerator.get_canonical_form(z_shape, reflections=True))
+        self.assertLess(len(ShapeGenerator(reflections=True).unique_shapes), len(ShapeGenerator().unique_shapes))
+
+
+class TestIsomorphismClasses(unittest.TestCase):
+    def test_classes_group_orientations(self):
+        shape_gen = ShapeGenerator()
+        raw = {m for m in iter_polyominoes(3) if not has_holes(m)}
+        representatives = shape_gen.filter_isomorphic_shapes(raw)
+        self.assertEqual(representatives, shape_gen.generated_shapes)
+
+        members = [m for group in shape_gen.symmetry_classes.values() for m in group]
+        self.assertEqual(len(members), len(set(members)))
+        self.assertEqual(set(members), raw)
+        for representative, group in shape_gen.symmetry_classes.items():
+            self.assertEqual(representative, min(group))
+
+        # Classes list only the shapes that were given, not every orientation of them
+        corner, turned_corner, bar = ShapeGenerator.symmetric_forms(0b000001011)[1:3] + [0b000000111]
+        shape_gen.filter_isomorphic_shapes({corner, turned_corner, bar})
+        self.assertEqual(shape_gen.symmetry_classes, {0b000001011: [corner, turned_corner], bar: [bar]})
+
+    def test_matches_pairwise_isomorphism(self):
+        shape_gen = ShapeGenerator()
+        shapes = sorted(set(ShapeGenerator.symmetric_forms(0b000011011)) | set(ShapeGenerator.symmetric_forms(0b000000111)))
+        self.assertEqual(len(shape_gen.filter_isomorphic_shapes(shapes)), 2)
+        for a in shapes:
+            for b in shapes:
+                same_class = ShapeGenerator.get_canonical_form(a) == ShapeGenerator.get_canonical_form(b)
+                self.assertEqual(same_class, ShapeGenerator.is_isomorphic(np.array(ShapeGenerator.bitmask_to_2D(a)),
+                                                                            np.array(ShapeGenerator.bitmask_to_2D(b))))
+
+    def test_bulk_canonical_forms(self):
+        bitmasks = list(range(1, 2 ** 9))
+        expected = [ShapeGenerator.get_canonical_form(m, reflections=True) for m in bitmasks]
+        self.assertEqual(canonical_forms_array(bitmasks, 3, reflections=True).tolist(), expected)
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,101 @@
+import pickle
+import unittest
+from grid import Grid
+from shape_generation import ShapeGenerator
+from shapes import Shape, as_shape, catalog_shapes, shape_of
+from tetromino_functionality import Tetromino
+
+
+class TestShape(unittest.TestCase):
+    def test_catalog_ids_and_interning(self):
+        catalog = catalog_shapes()
+        self.assertEqual([shape.bitmask for shape in catalog], sorted(ShapeGenerator().unique_shapes))
+        for shape_id, shape in enumerate(catalog):
+            self.assertEqual((shape.id, shape.rotation), (shape_id, 0))
+            self.assertIs(shape_of(shape.bitmask), shape)
+            self.assertIs(as_shape(ShapeGenerator.bitmask_to_2D(shape.bitmask)), shape)
+            self.assertIs(as_shape(shape), shape)
+            self.assertIs(pickle.loads(pickle.dumps(shape)), shape)
+
+    def test_rotations_match_list_rotation(self):
+        for shape in catalog_shapes():
+            tetromino = Tetromino(shape.to_lists(), 0, 0, [])
+            form = shape
+            for _ in range(4):
+                rotated = tetromino.rotate_shape('cw')
+                form = form.rotate()
+                self.assertEqual([list(row) for row in form], rotated)
+                self.assertEqual(form.id, shape.id)
+                tetromino.shape = rotated
+            self.assertIs(form, shape)
+            self.assertIs(shape.rotate(-1).rotate(), shape)
+
+    def test_layout_attributes(self):
+        shape = as_shape([[0, 0, 0], [0, 1, 1], [0, 1, 0]])
+        self.assertEqual(len(shape), 3)
+        self.assertEqual(shape[1], (0, 1, 1))
+        self.assertEqual(shape[2][1], 1)
+        self.assertEqual(shape.cells, ((1, 1), (1, 2), (2, 1)))
+        self.assertEqual(shape.cell_offsets, (4, 5, 7))
+        self.assertEqual(shape.bounding_box, (1, 1, 2, 2))
+        self.assertEqual(hash(shape), hash(as_shape(shape.to_lists())))
+
+    def test_immutable_and_slotted(self):
+        shape = catalog_shapes()[0]
+        with self.assertRaises(AttributeError):
+            shape.bitmask = 0
+        with self.assertRaises(AttributeError):
+            del shape.id
+        self.assertFalse(hasattr(shape, '__dict__'))
+        self.assertFalse(hasattr(Tetromino(shape, 0, 0, []), '__dict__'))
+
+    def test_rotation_links(self):
+        for shape in catalog_shapes():
+            for form in (shape, shape.cw, shape.cw.cw, shape.ccw):
+                self.assertIs(form.cw.ccw, form)
+                self.assertIs(form.cw, form.rotate(1))
+                self.assertIs(form.ccw, form.rotate(-1))
+                self.assertEqual(form.cw.id, shape.id)
+        with self.assertRaises(ValueError):
+            as_shape([[1, 1, 0], [1, 0, 0]])
+
+    def test_tetromino_rotation_is_a_lookup(self):
+        grid = Grid((8, 8))
+        l_shape = as_shape([[1, 0, 0], [1, 0, 0], [1, 1, 0]])
+        tetromino = Tetromino(l_shape.to_lists(), 2, 2, [])
+        tetromino.rotate_cw(grid)
+        self.assertIs(tetromino.shape, l_shape.cw)
+        tetromino.rotate_ccw(grid)
+        tetromino.rotate_ccw(grid)
+        self.assertIs(tetromino.shape, l_shape.ccw)
+
+        # A rotation into an occupied cell is rejected and keeps the shape
+        blocked = Tetromino(l_shape, 2, 2, [])
+        grid.place_mask(grid.mask_for([[0, 0, 1], [0, 0, 0], [0, 0, 0]], 2, 2))
+        blocked.rotate_cw(grid)
+        self.assertIs(blocked.shape, l_shape)
+
+        # Rotations on list grids keep working
+        rows = [[0] * 8 for _ in range(8)]
+        tetromino = Tetromino(l_shape, 2, 2, [])
+        tetromino.rotate_cw(rows)
+        self.assertIs(tetromino.shape, l_shape.cw)
+
+    def test_shapes_flow_through_game_code(self):
+        shape = ShapeGenerator().get_random_shape()
+        self.assertIsInstance(shape, Shape)
+        tetromino = Tetromino(shape, 2, 2, [shape])
+        tetromino.rotate_cw(Grid((8, 8)))
+        self.assertIs(tetromino.shape, shape.rotate())
+        grid = Grid((8, 8))
+        self.assertEqual(grid.mask_for(tetromino.shape, 2, 2), grid.mask_for(tetromino.shape.to_lists(), 2, 2))
+        self.assertEqual(grid.fit_map(tetromino.shape), grid.fit_map(tetromino.shape.to_lists()))
+
+        calls = []
+        tetromino.event_handler('custom')(calls.append)
+        tetromino.trigger_event('custom', grid)
+        self.assertEqual(calls, [grid])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+import unittest
+import numpy as np
+from bitsets import unpack_rows
+from grid import Grid
+from simulator import BatchSimulator
+
+
+class TestBatchSimulator(unittest.TestCase):
+    def test_matches_grid_rules(self):
+        simulator = BatchSimulator(64, seed=1)
+        grids = [Grid((8, 8)) for _ in range(simulator.games)]
+        scores = [0] * simulator.games
+        for _ in range(40):
+            boards_before = simulator.boards.copy()
+            alive_before = simulator.alive.copy()
+            placed = simulator.step()
+            for game, grid in enumerate(grids):
+                mask = int(placed[game])
+                if not mask:
+                    continue
+                self.assertTrue(alive_before[game])
+                self.assertEqual(grid.board, int(boards_before[game]))
+                self.assertTrue(grid.can_place(mask))
+                grid.board, lines = grid.clear_lines(grid.board | mask)
+                scores[game] += lines * 10
+                self.assertEqual(grid.board, int(simulator.boards[game]))
+        self.assertEqual(simulator.scores.tolist(), scores)
+
+    def test_packed_boards_match_grid_rules(self):
+        size = 10
+        simulator = BatchSimulator(32, size=size, seed=5)
+        self.assertTrue(simulator.packed)
+        self.assertEqual(simulator.boards.shape, (32, size))
+        grids = [Grid((size, size)) for _ in range(simulator.games)]
+        scores = [0] * simulator.games
+        for _ in range(60):
+            boards_before = unpack_rows(simulator.boards, size)
+            placed = unpack_rows(simulator.step(), size)
+            for game, grid in enumerate(grids):
+                if not placed[game]:
+                    continue
+                self.assertEqual(grid.board, boards_before[game])
+                self.assertTrue(grid.can_place(placed[game]))
+                grid.board, lines = grid.clear_lines(grid.board | placed[game])
+                scores[game] += lines * 10
+            self.assertEqual(unpack_rows(simulator.boards, size), [grid.board for grid in grids])
+        self.assertEqual(simulator.scores.tolist(), scores)
+        self.assertEqual(simulator.run(500).finished, 32)
+        self.assertFalse(simulator.legal_candidates().any())
+
+    def test_board_sizes(self):
+        self.assertTrue(BatchSimulator(4, size=64, seed=0).run(5).moves > 0)
+        self.assertTrue(BatchSimulator(4, seed=0, packed=True).packed)
+        with self.assertRaises(ValueError):
+            BatchSimulator(4, size=65)
+        with self.assertRaises(ValueError):
+            BatchSimulator(4, size=9, packed=False)
+
+    def test_game_over_means_no_piece_fits(self):
+        simulator = BatchSimulator(32, seed=2)
+        stats = simulator.run(max_moves=500)
+        self.assertEqual(stats.finished, 32)
+        self.assertFalse(simulator.legal_candidates().any())
+        self.assertEqual(stats.moves, int(simulator.move_counts.sum()))
+        self.assertGreater(stats.moves_per_second, 0)
+
+    def test_seeded_runs_repeat(self):
+        first, second = BatchSimulator(16, seed=3), BatchSimulator(16, seed=3)
+        first.run(50)
+        second.run(50)
+        self.assertTrue(np.array_equal(first.boards, second.boards))
+        self.assertTrue(np.array_equal(first.scores, second.scores))
+
+    def test_does_not_import_pygame(self):
+        script = 'import sys, simulator; sys.exit("pygame" in sys.modules)'
+        self.assertEqual(subprocess.run([sys.executable, '-c', script], cwd=os.path.dirname(os.path.abspath(__file__))).returncode, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
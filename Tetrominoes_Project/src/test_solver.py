@@ -0,0 +1,68 @@
+import random
+import unittest
+from grid import Grid
+from shape_generation import ShapeGenerator
+from solver import Solver
+
+I3 = [[1, 1, 1],
+      [0, 0, 0],
+      [0, 0, 0]]
+SINGLE = [[1, 0, 0],
+          [0, 0, 0],
+          [0, 0, 0]]
+
+
+class TestSolver(unittest.TestCase):
+    def replay(self, grid, hotbar, result):
+        board = grid.board
+        for move in result.moves:
+            self.assertEqual(grid.mask_for(hotbar[move.hotbar_index], *move.position), move.mask)
+            self.assertFalse(board & move.mask)
+            board, _ = grid.clear_lines(board | move.mask)
+        return board
+
+    def test_finds_line_clear(self):
+        rows = [[0] * 8 for _ in range(8)]
+        rows[7] = [1, 1, 1, 1, 1, 0, 0, 0]
+        grid = Grid.from_rows(rows)
+        result = Solver(beam_width=16).solve(grid, [I3, SINGLE, SINGLE])
+
+        self.assertEqual(len(result.moves), 3)
+        self.assertGreaterEqual(result.lines_cleared, 1)
+        self.assertEqual(self.replay(grid, [I3, SINGLE, SINGLE], result), result.board)
+
+    def test_random_positions_are_valid(self):
+        rng = random.Random(3)
+        shapes = ShapeGenerator().unique_shapes_2D
+        solver = Solver(beam_width=8)
+        for _ in range(10):
+            grid = Grid((8, 8))
+            grid.board = rng.getrandbits(64) & rng.getrandbits(64)
+            hotbar = [rng.choice(shapes) for _ in range(3)]
+            result = solver.solve(grid, hotbar)
+            self.assertEqual(self.replay(grid, hotbar, result), result.board)
+            self.assertEqual(len({move.hotbar_index for move in result.moves}), len(result.moves))
+        self.assertGreater(solver.total_nodes, 0)
+        self.assertGreater(solver.nodes_per_second, 0)
+
+    def test_no_moves_when_nothing_fits(self):
+        rows = [[(i + j) % 2 for j in range(8)] for i in range(8)]
+        result = Solver().solve(rows, [I3])
+        self.assertEqual(result.moves, ())
+        self.assertEqual(result.nodes, 0)
+
+    def test_depth_and_time_budget(self):
+        grid = Grid((8, 8))
+        self.assertEqual(len(Solver(depth=1).solve(grid, [I3, I3, SINGLE]).moves), 1)
+        result = Solver(time_budget=0.0).solve(grid, [I3, I3, SINGLE])
+        self.assertTrue(result.timed_out)
+
+    def test_custom_evaluation(self):
+        # Prefer filled cells in the top-left corner
+        solver = Solver(evaluate=lambda board, grid: board & 1, line_reward=0)
+        result = solver.solve(Grid((8, 8)), [SINGLE])
+        self.assertEqual(result.moves[0].position, (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
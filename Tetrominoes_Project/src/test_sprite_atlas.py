@@ -0,0 +1,67 @@
+import os
+import unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+from shape_generation import ShapeGenerator
+from sprite_atlas import SpriteAtlas, Theme
+from tetromino_functionality import Tetromino
+
+
+class TestSpriteAtlas(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.shapes = sorted(ShapeGenerator().unique_shapes)
+
+    def test_catalog_ids_and_rotations(self):
+        atlas = SpriteAtlas(20)
+        self.assertEqual(len(atlas.shapes), len(self.shapes))
+        for shape_id, bitmask in enumerate(self.shapes):
+            self.assertEqual(atlas.key_for(bitmask), (shape_id, 0))
+            tetromino = Tetromino(ShapeGenerator.bitmask_to_2D(bitmask), 0, 0, [])
+            for rotation in range(1, 4):
+                tetromino.shape = tetromino.rotate_shape('cw')
+                key = atlas.key_for(tetromino.shape)
+                self.assertEqual(key[0], shape_id)
+                self.assertIs(atlas.board_sprites[key], atlas.board_sprites[(shape_id, rotation)])
+
+    def test_sprites_match_shape_cells(self):
+        atlas = SpriteAtlas(20, hotbar_cell_size=10)
+        shape = [[1, 1, 0], [0, 1, 0], [0, 0, 0]]
+        board = atlas.sprite(shape)
+        hotbar = atlas.sprite(shape, hotbar=True)
+        self.assertEqual(board.get_size(), (60, 60))
+        self.assertEqual(hotbar.get_size(), (30, 30))
+        for index in range(9):
+            filled = shape[index // 3][index % 3]
+            self.assertEqual(board.get_at((index % 3 * 20 + 10, index // 3 * 20 + 10))[3], 255 * filled)
+            self.assertEqual(hotbar.get_at((index % 3 * 10 + 5, index // 3 * 10 + 5))[3], 255 * filled)
+
+    def test_symmetric_rotations_share_a_surface(self):
+        atlas = SpriteAtlas(20)
+        shape_id = atlas.key_for([[0, 1, 0], [1, 1, 1], [0, 1, 0]])[0]
+        self.assertIs(atlas.board_sprites[(shape_id, 0)], atlas.board_sprites[(shape_id, 2)])
+
+    def test_rebuild_only_on_change(self):
+        atlas = SpriteAtlas(20)
+        self.assertFalse(atlas.configure(20, 10, Theme()))
+        self.assertEqual(atlas.rebuilds, 1)
+        self.assertTrue(atlas.configure(cell_size=30))
+        self.assertEqual(atlas.sprite(self.shapes[0]).get_size(), (90, 90))
+        self.assertTrue(atlas.configure(theme=Theme(fill=(1, 2, 3))))
+        self.assertEqual(atlas.rebuilds, 3)
+
+    def test_unknown_frame_gets_new_id(self):
+        atlas = SpriteAtlas(20)
+        split = [[1, 0, 1], [0, 0, 0], [0, 0, 0]]  # Not a rotation of any catalog shape
+        shape_id, rotation = atlas.key_for(split)
+        self.assertGreaterEqual(shape_id, len(self.shapes))
+        self.assertEqual(rotation, 0)
+        self.assertEqual(atlas.key_for([[0, 0, 1], [0, 0, 0], [0, 0, 1]]), (shape_id, 1))
+        self.assertEqual(atlas.rebuilds, 1)
+        self.assertEqual(atlas.sprite(split).get_at((10, 10))[3], 255)
+        self.assertEqual(atlas.sprite(split).get_at((30, 10))[3], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
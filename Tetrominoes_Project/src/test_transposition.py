@@ -0,0 +1,74 @@
+import random
+import unittest
+from grid import Grid
+from shape_generation import ShapeGenerator
+from solver import Solver
+from transposition import TranspositionTable, ZobristHasher
+
+
+class TestZobristHasher(unittest.TestCase):
+    def test_hash_is_incremental_xor(self):
+        hasher = ZobristHasher(64, seed=1)
+        a, b = 0b1011 << 20, 1 << 63
+        self.assertEqual(hasher.hash_board(a | b), hasher.hash_board(a) ^ hasher.hash_board(b))
+        self.assertEqual(hasher.hash_board(0), 0)
+        self.assertEqual(ZobristHasher(64, seed=1).hash_board(a), hasher.hash_board(a))
+
+    def test_pieces_are_a_multiset(self):
+        hasher = ZobristHasher(64)
+        self.assertEqual(hasher.hash_pieces([3, 7, 3]), hasher.hash_pieces([3, 3, 7]))
+        self.assertNotEqual(hasher.hash_pieces([3, 3]), hasher.hash_pieces([3]))
+        self.assertNotEqual(hasher.hash_pieces([3, 3]), 0)
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def test_probe_and_stats(self):
+        table = TranspositionTable(memory_budget=4096)
+        self.assertIsNone(table.probe(42))
+        table.store(42, 1.5, 2, 1)
+        self.assertEqual(table.probe(42), (1.5, 2, 0, 1))
+        stats = table.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['stores'], stats['entries']), (1, 1, 1, 1))
+
+    def test_memory_budget_bounds_capacity(self):
+        table = TranspositionTable(memory_budget=4096)
+        for key in range(10000):
+            table.store(key, 0.0, key % 3, 0)
+        self.assertLessEqual(table.stats()['entries'], table.capacity)
+        self.assertLessEqual(table.capacity * 96, 4096)
+        self.assertGreater(table.evictions, 0)
+
+    def test_depth_preferred_replacement(self):
+        table = TranspositionTable(memory_budget=2 * 96)
+        self.assertEqual(table.capacity, 2)
+        table.store(1, 0.0, 3, 0)
+        table.store(2, 0.0, 1, 0)  # Shallower: goes to the always-replace slot
+        table.store(3, 0.0, 1, 0)  # Evicts 2, keeps the deep entry
+        self.assertIsNotNone(table.probe(1))
+        self.assertIsNone(table.probe(2))
+
+        table.new_search()
+        table.store(4, 0.0, 0, 0)  # Entry 1 is stale now, so even a shallow state replaces it
+        self.assertEqual(table.probe(4).age, 1)
+        self.assertIsNotNone(table.probe(1))
+        self.assertIsNone(table.probe(3))
+
+
+class TestSolverWithTranspositions(unittest.TestCase):
+    def test_same_result_with_fewer_nodes(self):
+        rng = random.Random(11)
+        shapes = ShapeGenerator().unique_shapes_2D
+        table = TranspositionTable()
+        for _ in range(5):
+            grid = Grid((8, 8))
+            grid.board = rng.getrandbits(64) & rng.getrandbits(64)
+            hotbar = [rng.choice(shapes) for _ in range(3)]
+            plain = Solver(beam_width=10 ** 6).solve(grid, hotbar)
+            cached = Solver(beam_width=10 ** 6, transposition_table=table).solve(grid, hotbar)
+            self.assertEqual(plain.score, cached.score)
+            self.assertLessEqual(cached.nodes, plain.nodes)
+        self.assertGreater(table.stats()['hits'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
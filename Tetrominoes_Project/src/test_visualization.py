@@ -0,0 +1,164 @@
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+from tetromino_functionality import Tetromino
+from sprite_atlas import Theme
+from visualization import DIRTY_CELL_LIMIT, FrameStats, Visualization
+
+
+class TestDirtyRendering(unittest.TestCase):
+    def setUp(self):
+        self.view = Visualization((400, 400), 8, 20)
+
+    def tearDown(self):
+        pygame.quit()
+
+    def test_first_frame_is_full_and_idle_frames_push_nothing(self):
+        self.assertEqual(self.view.render(), [self.view.surface.get_rect()])
+        self.assertEqual(self.view.render(), [])
+        self.assertEqual(self.view.render(), [])
+
+    def test_only_changed_cells_are_pushed(self):
+        self.view.render()
+        self.view.set_cell(2, 3, 1)
+        self.view.set_cell(0, 0, 0)  # Unchanged, not dirty
+        self.assertEqual(self.view.render(), [self.view.cell_rect(2, 3)])
+        center = self.view.cell_rect(2, 3).center
+        self.assertEqual(self.view.surface.get_at(center)[:3], (255, 255, 255))
+
+    def test_moving_a_piece_redraws_the_cells_it_left_and_entered(self):
+        self.view.render()
+        tetromino = Tetromino([[1, 1, 0], [0, 0, 0], [0, 0, 0]], 0, 0, [])
+        self.view.update_grid_with_tetromino(tetromino)
+        self.assertEqual(self.view.dirty_cells, set())
+        self.assertEqual(self.view.render(), [pygame.Rect(self.view.grid_x, self.view.grid_y, 60, 60)])
+        self.assertEqual(self.view.render(), [])
+
+        # The old frame is redrawn from the tiles, then the piece is blitted once at its new place
+        tetromino.x = 1
+        self.view.update_grid_with_tetromino(tetromino)
+        frame = {(i, j) for i in range(3) for j in range(3)}
+        self.assertEqual(self.view.dirty_cells, frame)
+        with mock.patch.object(self.view, 'draw_tetromino', wraps=self.view.draw_tetromino) as draw_tetromino:
+            rects = self.view.render()
+        draw_tetromino.assert_called_once_with(self.view.surface, tetromino, self.view.cell_rect(0, 1).topleft)
+        self.assertEqual(sorted(map(tuple, rects[:-1])), sorted(tuple(self.view.cell_rect(i, j)) for i, j in frame))
+        self.assertEqual(rects[-1], pygame.Rect(self.view.cell_rect(0, 1).topleft, (60, 60)))
+        for j, color in enumerate(((0, 0, 0), (255, 255, 255), (255, 255, 255), (0, 0, 0))):
+            self.assertEqual(self.view.surface.get_at(self.view.cell_rect(0, j).center)[:3], color)
+        self.assertEqual(self.view.grid, self.view.board)
+
+    def test_piece_moves_over_the_settled_board(self):
+        self.view.hotbar = [[[1, 1, 1], [0, 0, 0], [0, 0, 0]]]
+        self.view.handle_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_1))
+        tetromino = self.view.selected_tetromino
+        positions = []
+        for _ in range(3):
+            self.view.handle_action(pygame.K_d)
+            positions.append(tetromino.x)
+        self.assertEqual(positions, [1, 2, 3])
+        self.assertEqual(self.view.board[0], [0] * 8)
+        self.assertEqual(self.view.grid, self.view.board)
+        self.view.render()
+        row = [self.view.surface.get_at(self.view.cell_rect(0, j).center)[:3] == (255, 255, 255) for j in range(8)]
+        self.assertEqual(row, [False, False, False, True, True, True, False, False])
+
+        # Setting the piece settles it into the board and erases the sprite through the dirty set
+        self.view.board[0][:3] = [1, 1, 1]
+        self.view.board[0][6:] = [1, 1]
+        self.view.handle_action(pygame.K_SPACE)
+        self.assertIsNone(self.view.selected_tetromino)
+        self.assertEqual(self.view.board[0], [0] * 8)  # The completed row was cleared
+        self.assertEqual(self.view.grid, self.view.board)
+        self.assertEqual(self.view.dirty_cells, {(i, j) for i in range(3) for j in range(3, 6)})
+        self.view.render()
+        self.assertEqual(self.view.surface.get_at(self.view.cell_rect(0, 4).center)[:3], (0, 0, 0))
+        self.assertTrue(self.view.is_idle())
+
+    def test_many_dirty_cells_collapse_to_the_board(self):
+        self.view.render()
+        self.view.set_grid([[1] * 8 for _ in range(8)])
+        self.assertGreater(64, DIRTY_CELL_LIMIT)
+        self.assertEqual(self.view.render(), [self.view.board_rect()])
+
+    def test_hotbar_redraws_only_when_the_cursor_moves(self):
+        self.view.render()
+        self.view.select(0)
+        self.assertEqual(self.view.render(), [])
+        self.view.select(1)
+        self.assertEqual(self.view.render(), [self.view.hotbar_rect(self.view.hotbar)])
+
+    def test_tiles_rebuilt_only_on_cell_size_change(self):
+        self.view.render()
+        tile = self.view.tiles[1]
+        self.view.invalidate()
+        self.view.render()
+        self.assertIs(self.view.tiles[1], tile)
+        self.view.cell_size = 10
+        self.view.invalidate()
+        self.view.render()
+        self.assertEqual(self.view.tiles[1].get_size(), (10, 10))
+
+    def test_run_blocks_for_events_and_exits_on_quit(self):
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_2))
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_d))
+        pygame.time.set_timer(pygame.QUIT, 100, loops=1)
+        stats = self.view.run(fps=0, idle_timeout=50, stats=FrameStats(60))
+        self.assertEqual(self.view.cursor_position, 1)
+        self.assertEqual(self.view.selected_tetromino.x, 1)
+        self.assertGreaterEqual(stats.frames, 1)
+
+    def test_idle_after_render(self):
+        self.assertFalse(self.view.is_idle())
+        self.view.render()
+        self.assertTrue(self.view.is_idle())
+        self.view.set_cell(0, 0, 1)
+        self.assertFalse(self.view.is_idle())
+
+    def test_draw_tetromino_is_one_sprite_blit(self):
+        self.view.render()
+        tetromino = Tetromino([[0, 1, 0], [1, 1, 1], [0, 0, 0]], 0, 0, [])
+        rect = self.view.draw_tetromino(self.view.surface, tetromino, (0, 0))
+        self.assertEqual(rect.size, (60, 60))
+        self.assertEqual(self.view.surface.get_at((30, 10))[:3], (255, 255, 255))
+        self.assertNotEqual(self.view.surface.get_at((10, 10))[:3], (255, 255, 255))
+
+    def test_theme_change_rebuilds_atlas_once(self):
+        self.view.render()
+        rebuilds = self.view.atlas.rebuilds
+        self.view.render()
+        self.view.set_theme(Theme(fill=(255, 0, 0)))
+        self.view.render()
+        self.assertEqual(self.view.atlas.rebuilds, rebuilds + 1)
+        self.assertEqual(self.view.tiles[1].get_at((5, 5))[:3], (255, 0, 0))
+
+
+class TestFrameStats(unittest.TestCase):
+    def test_mean_p99_and_skipped(self):
+        stats = FrameStats(fps=100, window=200)
+        for _ in range(98):
+            stats.record(0.005)
+        stats.record(0.025)  # Three frame budgets over, two frames skipped
+        stats.record(0.015)
+        self.assertEqual(stats.frames, 100)
+        self.assertEqual(stats.frames_skipped, 3)
+        self.assertAlmostEqual(stats.mean, (98 * 0.005 + 0.04) / 100)
+        self.assertAlmostEqual(stats.p99, 0.015)
+        self.assertAlmostEqual(stats.percentile(100), 0.025)
+        self.assertIn('3 skipped', stats.summary())
+
+    def test_window_and_uncapped(self):
+        stats = FrameStats(fps=0, window=2)
+        for frame_time in (1.0, 0.1, 0.3):
+            stats.record(frame_time)
+        self.assertEqual(stats.frames_skipped, 0)
+        self.assertAlmostEqual(stats.mean, 0.2)
+        self.assertEqual(FrameStats().mean, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,17 @@
-from typing import List, Callable, Dict, Any
+from typing import List, Callable, Dict, Any, Optional, Tuple
+from events import GAME_OVER, LINE_CLEAR, PLACEMENT, EventBus
+from grid import Grid, LineClear
+from placements import table_for
+from shapes import Shape, as_shape
 
 class Tetromino:
     """
     Class to represent a Tetromino shape in a Tetris game.
     """
-    def __init__(self, shape: List[List[int]], x: int, y: int, hotbar: List[List[List[int]]]):
+    __slots__ = ('shape', 'x', 'y', 'hotbar', 'score', 'last_clear', 'events')
+
+    def __init__(self, shape: List[List[int]], x: int, y: int, hotbar: List[List[List[int]]],
+                 events: Optional[EventBus] = None):
         """
         Initialize a Tetromino with a given shape at position (x, y) and provide a hotbar for game-over checks.
         
@@ -13,45 +20,49 @@ class Tetromino:
             x (int): The x-coordinate of the shape.
             y (int): The y-coordinate of the shape.
             hotbar (List[List[List[int]]]): List of available Tetromino shapes.
+            events (Optional[EventBus]): Bus the placement, line clear and game over events go to;
+                pass a shared bus to observe many pieces, a private one is created otherwise.
         """
         self.shape = shape
         self.x = x
         self.y = y
         self.hotbar = hotbar
         self.score = 0
+        self.last_clear: Optional[LineClear] = None
+        self.events = EventBus() if events is None else events
 
-    def event_handler(self, event_name: str) -> Callable[[Callable[[Any], None]], Callable[[Any], None]]:
+    def event_handler(self, event_name: str) -> Callable[[Callable[..., None]], Callable[..., None]]:
         """
-        Decorator to register event handlers for the Tetromino class.
+        Decorator to subscribe a function to one of this Tetromino's events.
         
         Parameters:
-            event_name (str): The name of the event.
+            event_name (str): The name of the event, e.g. events.PLACEMENT.
             
         Returns:
             The decorator function.
         """
-        def decorator(func: Callable[[Any], None]) -> Callable[[Any], None]:
-            setattr(self, event_name, func)
-            return func
-        return decorator
+        return self.events.on(event_name)
 
-    def trigger_event(self, event_name: str, grid: List[List[int]]) -> None:
+    def trigger_event(self, event_name: str, *args: Any) -> None:
         """
-        Trigger an event based on the name provided.
+        Emit an event to its subscribers; events nobody subscribed to are ignored.
         
         Parameters:
             event_name (str): The name of the event to be triggered.
-            grid (List[List[int]]): The current grid.
+            args: Arguments passed to every subscriber.
         """
-        handler = getattr(self, event_name, None)
-        if handler:
-            handler(grid)
-        else:
-            print(f"Unknown event: {event_name}")
+        self.events.emit(event_name, *args)
 
 
 
     def is_valid_move(self, new_shape: List[List[int]], x: int, y: int, grid: List[List[int]], set_in_place: bool = False) -> bool:
+        if isinstance(grid, Grid):
+            if isinstance(new_shape, Shape):
+                mask = table_for(grid).mask_at(new_shape, x, y)
+            else:
+                mask = grid.mask_for(new_shape, x, y)
+            return mask is not None and grid.can_place(mask)
+
         grid_height = len(grid)
         grid_width = len(grid[0])
         
@@ -90,6 +101,10 @@ class Tetromino:
         Returns:
             The rotated shape.
         """
+        if isinstance(self.shape, Shape):
+            # Interned shapes carry their rotations, nothing to copy
+            return {'cw': self.shape.cw, 'ccw': self.shape.ccw}.get(rotation_type, self.shape)
+
         # Create a copy of the current shape
         new_shape = [list(row) for row in self.shape]
         
@@ -117,6 +132,33 @@ class Tetromino:
         return new_shape
 
 
+    def rotate(self, turns: int, grid: List[List[int]]) -> bool:
+        """
+        Rotate the tetromino by a quarter turn through the shape's rotation links.
+
+        Square shapes are interned on their first rotation, after which rotating is a
+        lookup of the successor or predecessor Shape and, on a Grid, its validity is one
+        AND with the precomputed placement mask.
+
+        Parameters:
+            turns: 1 for clockwise, -1 for counterclockwise.
+            grid: The current grid.
+
+        Returns:
+            True if the rotated shape fit and was applied.
+        """
+        shape = self.shape
+        if isinstance(shape, Shape) or all(len(row) == len(shape) for row in shape):
+            shape = as_shape(shape)
+            new_shape = shape.cw if turns > 0 else shape.ccw
+        else:
+            new_shape = self.rotate_shape('cw' if turns > 0 else 'ccw')
+
+        if self.is_valid_move(new_shape, self.x, self.y, grid):
+            self.shape = new_shape
+            return True
+        return False
+
     def rotate_cw(self, grid: List[List[int]]) -> None:
         """
         Rotate the tetromino shape clockwise and update the grid.
@@ -124,9 +166,7 @@ class Tetromino:
         Parameters:
             grid: The current grid.
         """
-        new_shape = self.rotate_shape('cw')
-        if self.is_valid_move(new_shape, self.x, self.y, grid):
-            self.shape = new_shape
+        self.rotate(1, grid)
 
 
     def rotate_ccw(self, grid: List[List[int]]) -> None:
@@ -136,9 +176,7 @@ class Tetromino:
         Parameters:
             grid (List[List[int]]): The current grid.
         """
-        new_shape = self.rotate_shape('ccw')
-        if self.is_valid_move(new_shape, self.x, self.y, grid):
-            self.shape = new_shape
+        self.rotate(-1, grid)
 
 
     def set_in_place(self, grid: List[List[int]]) -> None:
@@ -150,32 +188,64 @@ class Tetromino:
         """
         if self.is_valid_move(self.shape, self.x, self.y, grid, set_in_place=True):
             self.update_grid(grid)
-            self.trigger_event('handle_line_clears', grid)
+            self.events.emit(PLACEMENT, self, grid)
+            self.handle_line_clears(grid)
         elif self.is_game_over(grid):
-            self.trigger_event('handle_set_in_place_failure', grid)
+            self.handle_set_in_place_failure(grid)
 
 
 
-    def handle_line_clears(self, grid: List[List[int]]) -> None:
-        rows_to_clear = {i for i, row in enumerate(grid) if all(cell == 1 for cell in row)}
-        
-        # Create a new grid with cleared rows removed and empty rows added at the top
-        new_grid = [[0] * len(grid[0])] * len(rows_to_clear) + [row for i, row in enumerate(grid) if i not in rows_to_clear]
+    def handle_line_clears(self, grid: List[List[int]]) -> LineClear:
+        """
+        Clear the rows and columns completed by the piece just set in place.
+
+        Only the lines the piece touches can have become full, so only those are
+        checked. Full rows and columns are cleared together, in place.
         
-        # Update the grid with the new grid
-        for i in range(len(grid)):
-            grid[i] = new_grid[i]
+        Parameters:
+            grid (List[List[int]]): The current grid.
+
+        Returns:
+            LineClear: The cleared rows and columns and the combo size.
+        """
+        if isinstance(grid, Grid):
+            line_clear = grid.row_column_clear()
+        else:
+            touched_rows = set()
+            touched_columns = set()
+            for i, row in enumerate(self.shape):
+                for j, cell in enumerate(row):
+                    if cell:
+                        touched_rows.add(self.y + i)
+                        touched_columns.add(self.x + j)
+
+            rows = tuple(sorted(r for r in touched_rows if 0 <= r < len(grid) and all(grid[r])))
+            columns = tuple(sorted(c for c in touched_columns
+                                   if 0 <= c < len(grid[0]) and all(grid_row[c] for grid_row in grid)))
+            for r in rows:
+                grid[r] = [0] * len(grid[r])
+            for c in columns:
+                for grid_row in grid:
+                    grid_row[c] = 0
+            line_clear = LineClear(rows, columns, len(rows) + len(columns))
         
         # Update the score
-        self.score += len(rows_to_clear) * 10
-        
-        # Optional: Add sound effects or animations here
+        self.score += line_clear.combo * 10
+        self.last_clear = line_clear
+        if line_clear.combo:
+            self.events.emit(LINE_CLEAR, self, line_clear)
+        return line_clear
 
 
 
-    def handle_set_in_place_failure(self) -> None:
-    # Logic for handling set in place failure (e.g., game over)
-        pass
+    def handle_set_in_place_failure(self, grid: List[List[int]]) -> None:
+        """
+        Handle a piece that could not be set while nothing in the hotbar fits: the game is over.
+        
+        Parameters:
+            grid (List[List[int]]): The current grid.
+        """
+        self.events.emit(GAME_OVER, self, grid)
 
 
     def update_grid(self, grid: List[List[int]]) -> None:
@@ -184,7 +254,17 @@ class Tetromino:
         
         Parameters:
             grid (List[List[int]]): The current grid.
+
+        Raises:
+            ValueError: If the Tetromino is out of bounds of a Grid or overlaps its filled cells.
         """
+        if isinstance(grid, Grid):
+            mask = grid.mask_for(self.shape, self.x, self.y)
+            if mask is None:
+                raise ValueError(f"Tetromino at ({self.x}, {self.y}) is out of bounds")
+            grid.place_mask(mask)
+            return
+
         for i, row in enumerate(self.shape):
             grid_row = grid[i + self.y]
             for j, cell in enumerate(row):
@@ -201,16 +281,22 @@ class Tetromino:
         Returns:
             bool: True if the game is over, False otherwise.
         """
-        for tetromino_shape in self.hotbar:
-            for y in range(len(grid)):
-                for x in range(len(grid[0])):
-                    if self.is_valid_move(tetromino_shape, x, y, grid):
-                        return False
-                    if y == 0 and x == 0:
-                        break
-                if y == 0:
-                    break
-        return True
+        return self.check_game_over(grid)[0]
+
+    def check_game_over(self, grid: List[List[int]]) -> Tuple[bool, List[int]]:
+        """
+        Check every hotbar shape against every board position at once.
+        
+        Parameters:
+            grid (List[List[int]]): The current grid.
+            
+        Returns:
+            Tuple[bool, List[int]]: Whether the game is over, and the number of valid
+            placements of each hotbar shape.
+        """
+        if not isinstance(grid, Grid):
+            grid = Grid.from_rows(grid)
+        return grid.hotbar_fits(self.hotbar)
 
 
     def __str__(self) -> str:
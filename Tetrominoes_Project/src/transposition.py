@@ -0,0 +1,183 @@
+import random
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+# Rough size of one entry across the parallel slot lists, used to turn a memory budget into a capacity
+_ENTRY_BYTES = 96
+
+
+class ZobristHasher:
+    """
+    Zobrist hashing of (board occupancy, remaining hotbar pieces).
+
+    Every board cell and every (piece, occurrence) pair gets a random 64-bit key and
+    a state hashes to the XOR of its keys. Board keys are folded into one 256-entry
+    table per byte of the bitboard, so hashing a board costs one lookup per 8 cells.
+    """
+
+    def __init__(self, cells: int, seed: int = 0):
+        """
+        Args:
+            cells: Number of cells on the board.
+            seed: Seed for the random keys, so hashes are reproducible.
+        """
+        self.cells = cells
+        self.rng = random.Random(seed)
+        cell_keys = [self.rng.getrandbits(64) for _ in range(cells)]
+
+        self.board_tables = []
+        for chunk in range((cells + 7) // 8):
+            keys = cell_keys[chunk * 8:chunk * 8 + 8]
+            table = [0] * 256
+            for value in range(1, 256):
+                low_bit = value & -value
+                index = low_bit.bit_length() - 1
+                table[value] = table[value ^ low_bit] ^ (keys[index] if index < len(keys) else 0)
+            self.board_tables.append(tuple(table))
+        self.piece_keys: Dict[Tuple[int, int], int] = {}
+
+    def hash_board(self, board: int) -> int:
+        """
+        Hash a board occupancy bitboard.
+        """
+        h = 0
+        for table in self.board_tables:
+            h ^= table[board & 0xFF]
+            board >>= 8
+        return h
+
+    def hash_pieces(self, pieces: Iterable[int]) -> int:
+        """
+        Hash a multiset of piece keys (e.g. shape bitmasks), independent of their order.
+        """
+        h = 0
+        counts: Dict[int, int] = {}
+        for piece in pieces:
+            occurrence = counts.get(piece, 0)
+            counts[piece] = occurrence + 1
+            key = self.piece_keys.get((piece, occurrence))
+            if key is None:
+                key = self.piece_keys[(piece, occurrence)] = self.rng.getrandbits(64)
+            h ^= key
+        return h
+
+    def hash_state(self, board: int, pieces: Iterable[int]) -> int:
+        """
+        Hash a board together with the pieces still to be placed.
+        """
+        return self.hash_board(board) ^ self.hash_pieces(pieces)
+
+
+class TableEntry(NamedTuple):
+    """
+    A stored search state: its static evaluation, remaining depth, the search generation
+    that last touched it and the most lines that generation reached it with.
+    """
+    value: float
+    depth: int
+    age: int
+    lines: int
+
+
+class TranspositionTable:
+    """
+    Fixed-size transposition table with two-slot buckets.
+
+    The first slot of a bucket is depth-preferred: it is only overwritten by a deeper
+    (or equally deep) state, or once its entry is stale from an earlier search. The
+    second slot always takes whatever the first slot rejected, so recent states are
+    kept as well. Entries are stored in parallel preallocated lists and never grow
+    past the capacity derived from the memory budget.
+    """
+
+    def __init__(self, memory_budget: int = 8 * 2 ** 20):
+        """
+        Args:
+            memory_budget: Approximate number of bytes the table may use.
+        """
+        buckets = 1
+        while (buckets * 2) * 2 * _ENTRY_BYTES <= memory_budget:
+            buckets *= 2
+        self.capacity = buckets * 2
+        self.bucket_mask = buckets - 1
+
+        self.keys = [None] * self.capacity
+        self.values = [0.0] * self.capacity
+        self.depths = [0] * self.capacity
+        self.ages = [0] * self.capacity
+        self.lines = [0] * self.capacity
+
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def new_search(self) -> None:
+        """
+        Start a new search generation, making older entries candidates for replacement.
+        """
+        self.generation += 1
+
+    def probe(self, key: int) -> Optional[TableEntry]:
+        """
+        Look up a state by its Zobrist hash.
+        """
+        slot = (key & self.bucket_mask) * 2
+        if self.keys[slot] != key:
+            slot += 1
+            if self.keys[slot] != key:
+                self.misses += 1
+                return None
+        self.hits += 1
+        return TableEntry(self.values[slot], self.depths[slot], self.ages[slot], self.lines[slot])
+
+    def store(self, key: int, value: float, depth: int, lines: int) -> None:
+        """
+        Store or refresh a state in the current generation.
+        """
+        slot = (key & self.bucket_mask) * 2
+        keys = self.keys
+        if keys[slot] != key and keys[slot + 1] != key:
+            if keys[slot] is None or self.ages[slot] != self.generation or depth >= self.depths[slot]:
+                if keys[slot] is not None:
+                    # Demote the depth-preferred entry into the always-replace slot
+                    if keys[slot + 1] is not None:
+                        self.evictions += 1
+                    self._write(slot + 1, keys[slot], self.values[slot], self.depths[slot], self.ages[slot], self.lines[slot])
+            else:
+                slot += 1
+                if keys[slot] is not None:
+                    self.evictions += 1
+        elif keys[slot] != key:
+            slot += 1
+
+        self._write(slot, key, value, depth, self.generation, lines)
+        self.stores += 1
+
+    def _write(self, slot: int, key: int, value: float, depth: int, age: int, lines: int) -> None:
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.depths[slot] = depth
+        self.ages[slot] = age
+        self.lines[slot] = lines
+
+    def clear(self) -> None:
+        """
+        Drop every entry and reset the statistics.
+        """
+        self.__init__(self.capacity * _ENTRY_BYTES)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Hit, miss, store and eviction counts plus the hit rate and fill level.
+        """
+        probes = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / probes if probes else 0.0,
+            'entries': self.capacity - self.keys.count(None),
+            'capacity': self.capacity,
+        }
@@ -1,17 +1,50 @@
+import argparse
+import math
+import time
+from collections import deque
+
 import pygame
+from events import PLACEMENT
 from shape_generation import ShapeGenerator
+from sprite_atlas import DEFAULT_THEME, SpriteAtlas, Theme
 from tetromino_functionality import Tetromino
-from typing import Tuple, List
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+BACKGROUND_COLOR = (0, 12, 102)
+EMPTY_COLOR = (0, 0, 0)
+HOTBAR_COLOR = (200, 200, 200)
+HIGHLIGHT_COLOR = (255, 255, 0)
+
+# Hotbar layout: each shape's 3x3 frame is drawn HOTBAR_SHAPE_SIZE pixels wide
+HOTBAR_SHAPE_SIZE = 30
+HOTBAR_GAP = 10
+HOTBAR_CELL_SIZE = HOTBAR_SHAPE_SIZE // 3
+
+# Above this many dirty cells one rectangle covering the board is cheaper than one per cell
+DIRTY_CELL_LIMIT = 32
+
+HOTBAR_KEYS = {
+    pygame.K_1: 0,
+    pygame.K_KP1: 0,
+    pygame.K_2: 1,
+    pygame.K_KP2: 1,
+    pygame.K_3: 2,
+    pygame.K_KP3: 2,
+}
+
 
 class Visualization:
     def __init__(self, window_size: Tuple[int, int], grid_size: int, cell_size: int):
         pygame.init()
         self.surface = pygame.display.set_mode(window_size)
         pygame.display.set_caption('Tetris Visualization')
-        
+
         self.shape_gen = ShapeGenerator()
         self.grid_size = grid_size
         self.cell_size = cell_size
+        # board holds the settled cells the pieces collide with; grid is the cells on screen,
+        # which only change through set_cell. The selected piece is a sprite drawn over them.
+        self.board = [[0] * grid_size for _ in range(grid_size)]
         self.grid = [[0] * grid_size for _ in range(grid_size)]
         self.grid_x = (window_size[0] - grid_size * cell_size) // 2
         self.grid_y = (window_size[1] - grid_size * cell_size) // 2
@@ -21,10 +54,103 @@ class Visualization:
         self.grid_center_y = self.grid_y + (self.grid_size * self.cell_size) // 2
         self.cursor_position = 0
 
+        # Dirty-region state: cells and the hotbar waiting to be redrawn, and the
+        # screen rectangles to push on the next display update
+        self.tiles: Dict[int, pygame.Surface] = {}
+        self.tile_key: Optional[Tuple[int, Theme]] = None
+        self.theme = DEFAULT_THEME
+        self.atlas: Optional[SpriteAtlas] = None
+        self.dirty_cells: Set[Tuple[int, int]] = set()
+        self.dirty_rects: List[pygame.Rect] = []
+        # The piece sprite on screen, the board cells its frame covers and whether it must be redrawn
+        self.piece: Optional[Tetromino] = None
+        self.piece_state: Optional[Tuple[Tuple[Tuple[int, ...], ...], int, int]] = None
+        self.piece_cells: Set[Tuple[int, int]] = set()
+        self.piece_dirty = False
+        self.hotbar_dirty = True
+        self.full_redraw = True
+
+    def build_tiles(self) -> None:
+        """
+        Pre-render one bordered tile per cell state, so drawing a cell is a single blit,
+        and the piece sprite atlas. Only rebuilt when the cell size or theme changes.
+        """
+        if self.atlas is None:
+            self.atlas = SpriteAtlas(self.cell_size, HOTBAR_CELL_SIZE, self.theme)
+        else:
+            self.atlas.configure(self.cell_size, HOTBAR_CELL_SIZE, self.theme)
+        if self.tile_key == (self.cell_size, self.theme):
+            return
+        for value, color in ((0, EMPTY_COLOR), (1, self.theme.fill)):
+            tile = pygame.Surface((self.cell_size, self.cell_size))
+            tile.fill(color)
+            pygame.draw.rect(tile, self.theme.border, tile.get_rect(), 1)
+            self.tiles[value] = tile.convert() if pygame.display.get_surface() else tile
+        self.tile_key = (self.cell_size, self.theme)
+
+    def cell_rect(self, i: int, j: int) -> pygame.Rect:
+        """
+        Screen rectangle of the board cell in row i, column j.
+        """
+        return pygame.Rect(self.grid_x + j * self.cell_size, self.grid_y + i * self.cell_size,
+                           self.cell_size, self.cell_size)
+
+    def board_rect(self) -> pygame.Rect:
+        """
+        Screen rectangle covering the whole board.
+        """
+        return pygame.Rect(self.grid_x, self.grid_y, self.grid_size * self.cell_size, self.grid_size * self.cell_size)
+
+    def set_cell(self, i: int, j: int, value: int) -> None:
+        """
+        Change one board cell, marking it dirty only if its value actually changed.
+        """
+        if self.grid[i][j] != value:
+            self.grid[i][j] = value
+            self.dirty_cells.add((i, j))
+
+    def set_grid(self, grid: List[List[int]]) -> None:
+        """
+        Replace the displayed board, marking only the cells that differ as dirty.
+        """
+        for i, row in enumerate(grid):
+            for j, value in enumerate(row):
+                self.set_cell(i, j, value)
+
+    def set_hotbar(self, hotbar: List[List[List[int]]]) -> None:
+        """
+        Replace the hotbar shapes and schedule a hotbar redraw.
+        """
+        self.hotbar = hotbar
+        self.hotbar_dirty = True
+
+    def select(self, index: int) -> None:
+        """
+        Move the hotbar cursor, redrawing the hotbar only if the cursor moved.
+        """
+        if index != self.cursor_position:
+            self.cursor_position = index
+            self.hotbar_dirty = True
+
+    def invalidate(self) -> None:
+        """
+        Force a full redraw on the next frame, e.g. after the window was exposed or resized.
+        """
+        self.full_redraw = True
+        self.hotbar_dirty = True
+
+    def set_theme(self, theme: Theme) -> None:
+        """
+        Change the piece colors; the sprites are re-rendered on the next frame.
+        """
+        if theme != self.theme:
+            self.theme = theme
+            self.invalidate()
+
     def draw_background(self, color: Tuple[int, int, int]) -> None:
         """
         Draws a rectangle on the given surface.
-        
+
         Parameters:
             surface (pygame.Surface): The surface to draw on.
             color (Tuple[int, int, int]): The color of the rectangle (R, G, B).
@@ -32,174 +158,321 @@ class Visualization:
         """
         self.surface.fill(color)
 
-    def draw_grid(self):
-        start_x = self.grid_x
-        start_y = self.grid_y
+    def draw_grid(self, full: bool = True):
+        """
+        Blit board cells from the cached tiles.
+
+        Parameters:
+            full (bool): Draw every cell; otherwise only the dirty cells are drawn and
+                their rectangles queued for the next display update.
+        """
+        self.build_tiles()
+        tiles = self.tiles
+        blit = self.surface.blit
+        if full:
+            cells = [(i, j) for i in range(self.grid_size) for j in range(self.grid_size)]
+        else:
+            cells = self.dirty_cells
 
-        for i in range(self.grid_size):
-            for j in range(self.grid_size):
-                cell_color = (255, 255, 255) if self.grid[i][j] == 1 else (0, 0, 0)
-                rect = pygame.Rect(start_x + j * self.cell_size, start_y + i * self.cell_size, self.cell_size, self.cell_size)
-                pygame.draw.rect(self.surface, cell_color, rect)
-                pygame.draw.rect(self.surface, (128, 128, 128), rect, 1)
+        rects = [blit(tiles[self.grid[i][j]], self.cell_rect(i, j)) for i, j in cells]
+        if not full:
+            if len(rects) > DIRTY_CELL_LIMIT:
+                self.dirty_rects.append(self.board_rect())
+            else:
+                self.dirty_rects.extend(rects)
+        self.dirty_cells.clear()
 
-        grid_bottom = start_y + self.grid_size * self.cell_size
+        grid_bottom = self.grid_y + self.grid_size * self.cell_size
         return grid_bottom
 
 
-    def draw_tetromino(self, surface: pygame.Surface, tetromino: 'Tetromino', position: Tuple[int, int]) -> None:
+    def draw_piece(self) -> None:
+        """
+        Blit the selected piece over the board cells and queue its rectangle.
+        """
+        if self.piece is not None:
+            rect = self.draw_tetromino(self.surface, self.piece, self.cell_rect(self.piece.y, self.piece.x).topleft)
+            self.dirty_rects.append(rect.clip(self.board_rect()))
+        self.piece_dirty = False
+
+    def draw_tetromino(self, surface: pygame.Surface, tetromino: 'Tetromino', position: Tuple[int, int]) -> pygame.Rect:
         """
         Draws a Tetromino on the given Pygame surface at the specified position.
-        
+
         Parameters:
             surface (pygame.Surface): The surface to draw on.
             tetromino (Tetromino): The Tetromino to draw.
-            position (Tuple[int, int]): The position to draw the Tetromino.
-        """
-        # Pygame drawing logic here
-        pass
-
+            position (Tuple[int, int]): Pixel position of the top-left corner of the shape's frame.
 
-    def draw_hotbar(self, tetrominos: List[List[List[int]]]):
-        standard_shape_size = 30
-        gap = 10
-        num_tetrominos = len(tetrominos)
-
-        grid_bottom_y = self.grid_center_y + (self.grid_size * self.cell_size) // 2
+        Returns:
+            pygame.Rect: The area drawn over.
+        """
+        self.build_tiles()
+        return surface.blit(self.atlas.sprite(tetromino.shape), position)
 
-        # Define bounding box dimensions and scaling factors before using them
-        bounding_box_width = 3
-        bounding_box_height = 3
-        width_scale = standard_shape_size // bounding_box_width
-        height_scale = standard_shape_size // bounding_box_height
 
-        # Calculate total shapes' width including gaps
-        shapes_width = sum(len(t) * width_scale for t in tetrominos)
+    def hotbar_origin(self, tetrominos: List[List[List[int]]]) -> Tuple[int, int]:
+        """
+        Top-left corner of the hotbar background, centered under the board.
+        """
+        shapes_width = sum(len(t) * HOTBAR_CELL_SIZE for t in tetrominos)
+        total_width = shapes_width + (len(tetrominos) - 1) * HOTBAR_GAP
+        return self.grid_center_x - (total_width // 2), self.grid_center_y + (self.grid_size * self.cell_size) // 2
 
-        # Total hotbar width including shapes and gaps
-        total_width = shapes_width + (len(tetrominos) - 1) * gap
+    def hotbar_rect(self, tetrominos: List[List[List[int]]]) -> pygame.Rect:
+        """
+        Screen rectangle covering the hotbar, including the cursor highlight.
+        """
+        start_x, start_y = self.hotbar_origin(tetrominos)
+        hotbar_width = len(tetrominos) * (HOTBAR_SHAPE_SIZE + HOTBAR_GAP) - HOTBAR_GAP
+        return pygame.Rect(start_x - 5, start_y, hotbar_width + 10, HOTBAR_SHAPE_SIZE + 20)
 
-        hotbar_width = (num_tetrominos * standard_shape_size) + ((num_tetrominos - 1) * gap)
-        start_x = self.grid_center_x - (total_width // 2)
-        start_y = grid_bottom_y
+    def draw_hotbar(self, tetrominos: List[List[List[int]]]):
+        self.build_tiles()
+        start_x, start_y = self.hotbar_origin(tetrominos)
+        hotbar_width = len(tetrominos) * (HOTBAR_SHAPE_SIZE + HOTBAR_GAP) - HOTBAR_GAP
 
-        # Fill the background of the hotbar 
-        self.surface.fill((200, 200, 200), (start_x, start_y, hotbar_width, standard_shape_size + 20))
+        # Clear what the previous hotbar (and its highlight) left behind, then fill its background
+        area = self.hotbar_rect(tetrominos)
+        self.surface.fill(BACKGROUND_COLOR, area)
+        self.surface.fill(HOTBAR_COLOR, (start_x, start_y, hotbar_width, HOTBAR_SHAPE_SIZE + 20))
 
         for idx, tetromino in enumerate(tetrominos):
-            x_offset = start_x + (idx * (standard_shape_size + gap))
-            
+            x_offset = start_x + (idx * (HOTBAR_SHAPE_SIZE + HOTBAR_GAP))
+
             if idx == self.cursor_position:
                 highlight_rect = pygame.Rect(
                     x_offset - 5, start_y + 5,
-                    standard_shape_size + 10, standard_shape_size + 10
+                    HOTBAR_SHAPE_SIZE + 10, HOTBAR_SHAPE_SIZE + 10
                 )
-                pygame.draw.rect(self.surface, (255, 255, 0), highlight_rect, 3)  # Moved this line inside the loop and condition
+                pygame.draw.rect(self.surface, HIGHLIGHT_COLOR, highlight_rect, 3)
+
+            self.surface.blit(self.atlas.sprite(tetromino, hotbar=True), (x_offset, start_y + 10))
 
-            for i, row in enumerate(tetromino):
-                for j, cell in enumerate(row):
-                    if cell == 1:
-                        color = (255, 255, 255)
-                        rect = pygame.Rect(
-                            x_offset + int(j * width_scale),
-                            start_y + 10 + int(i * height_scale),
-                            int(width_scale),
-                            int(height_scale)
-                        )
-                        self.surface.fill(color, rect)
+        self.dirty_rects.append(area)
+        self.hotbar_dirty = False
+
+
+    def render(self) -> List[pygame.Rect]:
+        """
+        Draw whatever changed since the last frame and push only those rectangles to the display.
 
+        Returns:
+            List[pygame.Rect]: The rectangles that were updated, empty if nothing changed.
+        """
+        if self.full_redraw:
+            self.draw_background(BACKGROUND_COLOR)
+            self.draw_grid(full=True)
+            self.draw_piece()
+            self.draw_hotbar(self.hotbar)
+            self.full_redraw = False
+            self.dirty_rects = [self.surface.get_rect()]
+        else:
+            if self.dirty_cells:
+                # Redrawn cells under the piece paint over it, so it goes back on top
+                if not self.dirty_cells.isdisjoint(self.piece_cells):
+                    self.piece_dirty = True
+                self.draw_grid(full=False)
+            if self.piece_dirty:
+                self.draw_piece()
+            if self.hotbar_dirty:
+                self.draw_hotbar(self.hotbar)
 
+        rects = self.dirty_rects
+        self.dirty_rects = []
+        if rects:
+            pygame.display.update(rects)
+        return rects
 
-    def update_grid_with_tetromino(self, tetromino: Tetromino) -> None:
+    def update_grid_with_tetromino(self, tetromino: Optional[Tetromino]) -> None:
         """
-        Updates the grid to reflect the position of the Tetromino.
-        
+        Updates the grid to show the settled board with the Tetromino drawn over it.
+
+        Only the settled cells that changed become dirty. The Tetromino is drawn as one
+        sprite blit; when it moves or turns, the cells under its old frame are redrawn to
+        erase it.
+
         Parameters:
-            tetromino (Tetromino): The Tetromino object to place on the grid.
+            tetromino (Optional[Tetromino]): The Tetromino to draw, or None for the settled board alone.
         """
-        # Clear the grid
-        self.grid = [[0] * self.grid_size for _ in range(self.grid_size)]
+        self.set_grid(self.board)
+        state = None if tetromino is None else (tuple(map(tuple, tetromino.shape)), tetromino.x, tetromino.y)
+        if state == self.piece_state and tetromino is self.piece:
+            return
 
-        for i, row in enumerate(tetromino.get_shape()):
-            for j, cell in enumerate(row):
-                if cell == 1:
-                    x, y = tetromino.x + j, tetromino.y + i
-                    if 0 <= x < self.grid_size and 0 <= y < self.grid_size:
-                        self.grid[y][x] = 1
+        self.dirty_cells |= self.piece_cells
+        self.piece, self.piece_state = tetromino, state
+        self.piece_cells = set()
+        if tetromino is not None:
+            self.piece_cells = {(tetromino.y + i, tetromino.x + j)
+                                for i, row in enumerate(tetromino.shape) for j in range(len(row))
+                                if 0 <= tetromino.y + i < self.grid_size and 0 <= tetromino.x + j < self.grid_size}
+            self.piece_dirty = True
 
     def handle_action(self, key):
         if not self.selected_tetromino:
             return
-        
+
+        tetromino = self.selected_tetromino
         actions = {
             # Movement Keys
-            pygame.K_a: self.selected_tetromino.move_left,
-            pygame.K_d: self.selected_tetromino.move_right,
-            pygame.K_s: self.selected_tetromino.move_down,
-            pygame.K_w: self.selected_tetromino.move_up,
-            pygame.K_q: self.selected_tetromino.rotate_counter_clockwise,
-            pygame.K_e: self.selected_tetromino.rotate_clockwise,
-            pygame.K_SPACE: self.selected_tetromino.set_in_place,
-            
-            # Hotbar keys
-            pygame.K_1: 1,
-            pygame.K_KP1: 1,
-            pygame.K_2: 2,
-            pygame.K_KP2: 2,
-            pygame.K_3: 3,
-            pygame.K_KP3: 3,
+            pygame.K_a: lambda grid: tetromino.player_move("left", grid),
+            pygame.K_d: lambda grid: tetromino.player_move("right", grid),
+            pygame.K_s: lambda grid: tetromino.player_move("down", grid),
+            pygame.K_w: lambda grid: tetromino.player_move("up", grid),
+            pygame.K_q: tetromino.rotate_ccw,
+            pygame.K_e: tetromino.rotate_cw,
+            pygame.K_SPACE: tetromino.set_in_place,
         }
         if key in actions:
-            actions[key](self.grid)
+            # Pieces collide with and settle into the board, never the piece overlay on screen
+            actions[key](self.board)
+            self.update_grid_with_tetromino(self.selected_tetromino)
 
+    def on_placement(self, tetromino: Tetromino, grid: List[List[int]]) -> None:
+        """
+        Drop the selection once its piece is set in place; it is part of the board now.
+        """
+        if tetromino is self.selected_tetromino:
+            self.selected_tetromino = None
+
+
+    def is_idle(self) -> bool:
+        """
+        Check whether the next frame would draw nothing, so the loop can block on input.
+        """
+        return not (self.full_redraw or self.hotbar_dirty or self.dirty_cells or self.piece_dirty)
+
+    def handle_event(self, event: pygame.event.Event) -> bool:
+        """
+        Apply one pygame event to the view.
 
-    def run(self):
+        Returns:
+            bool: False once the window was closed, True otherwise.
+        """
+        if event.type == pygame.QUIT:
+            return False
+        elif event.type in (pygame.VIDEOEXPOSE, pygame.VIDEORESIZE):
+            self.invalidate()
+        elif event.type == pygame.KEYDOWN:
+            if event.key in HOTBAR_KEYS:
+                index = HOTBAR_KEYS[event.key]
+                self.select(index)
+                self.selected_tetromino = Tetromino(self.hotbar[index], 0, 0, self.hotbar)
+                self.selected_tetromino.event_handler(PLACEMENT)(self.on_placement)
+                self.update_grid_with_tetromino(self.selected_tetromino)
+            else:
+                self.handle_action(event.key)
+        return True
+
+    def run(self, fps: int = 60, idle_timeout: Optional[int] = None,
+            stats: Optional['FrameStats'] = None) -> Optional['FrameStats']:
+        """
+        Event-driven main loop.
+
+        While nothing needs drawing the loop blocks in pygame.event.wait instead of
+        polling, and while frames are being drawn their rate is capped by a Clock.
+
+        Parameters:
+            fps (int): Frame-rate cap, 0 for uncapped.
+            idle_timeout (Optional[int]): Milliseconds an idle wait may block before the loop
+                wakes up anyway, None to block until the next event.
+            stats (Optional[FrameStats]): Collects frame times of the frames that drew something.
+
+        Returns:
+            Optional[FrameStats]: The stats passed in, once the window was closed.
+        """
+        clock = pygame.time.Clock()
         running = True
-        
-        hotbar_keys = {
-            pygame.K_1: 0,
-            pygame.K_KP1: 0,
-            pygame.K_2: 1,
-            pygame.K_KP2: 1,
-            pygame.K_3: 2,
-            pygame.K_KP3: 2,
-        }
-        
+
         while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key in hotbar_keys:
-                        index = hotbar_keys[event.key]
-                        self.selected_tetromino = Tetromino(self.hotbar[index])
-                    else:
-                        self.handle_action(event.key)
-                        for key, action in key_mapping.items():
-                            if event.key == key:
-                                action(self.grid)
-                                self.update_grid_with_tetromino(self.selected_tetromino)
-                    
-
-                    
-                    if event.key in hotbar_keys:
-                        index = hotbar_keys[event.key]
-                        self.selected_tetromino = Tetromino(self.hotbar[index])
-
-            self.draw_background((0, 12, 102))
-            self.draw_grid()
-
-            # Draw the hotbar and other UI elements
-            self.draw_hotbar(self.hotbar)
+            if self.is_idle():
+                # Sleep in the event queue until there is input to react to
+                events = [pygame.event.wait(idle_timeout) if idle_timeout else pygame.event.wait()]
+                events.extend(pygame.event.get())
+            else:
+                events = pygame.event.get()
+
+            start = time.perf_counter()
+            for event in events:
+                running = self.handle_event(event) and running
 
-            pygame.display.update()
+            # Only the cells and hotbar that changed are drawn and pushed to the display
+            if running and self.render() and stats is not None:
+                stats.record(time.perf_counter() - start)
+            clock.tick(fps)
 
         pygame.quit()
+        return stats
+
+
+class FrameStats:
+    """
+    Frame-time statistics of a Visualization session.
+
+    A frame's time is the work of handling its events and rendering, so time spent
+    blocked waiting for input does not count. A frame whose work overran the frame
+    budget made the loop skip one frame for every extra budget it took.
+    """
+
+    def __init__(self, fps: int = 60, window: int = 1000):
+        """
+        Args:
+            fps: Target frame rate the budget is derived from, 0 for no budget.
+            window: Number of most recent frame times kept for the mean and percentiles.
+        """
+        self.budget = 1.0 / fps if fps else None
+        self.frame_times: Deque[float] = deque(maxlen=window)
+        self.frames = 0
+        self.frames_skipped = 0
+
+    def record(self, frame_time: float) -> None:
+        """
+        Record the duration of one drawn frame in seconds.
+        """
+        self.frame_times.append(frame_time)
+        self.frames += 1
+        if self.budget is not None and frame_time > self.budget:
+            self.frames_skipped += math.ceil(frame_time / self.budget) - 1
+
+    @property
+    def mean(self) -> float:
+        """
+        Mean frame time in seconds over the window.
+        """
+        return sum(self.frame_times) / len(self.frame_times) if self.frame_times else 0.0
+
+    def percentile(self, q: float) -> float:
+        """
+        Frame time in seconds that q percent of the frames in the window stayed under.
+        """
+        if not self.frame_times:
+            return 0.0
+        ordered = sorted(self.frame_times)
+        return ordered[min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1)]
+
+    @property
+    def p99(self) -> float:
+        return self.percentile(99)
+
+    def summary(self) -> str:
+        return (f"{self.frames} frames, mean {self.mean * 1000:.2f} ms, "
+                f"p99 {self.p99 * 1000:.2f} ms, {self.frames_skipped} skipped")
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Play Block Puzzle in a pygame window.')
+    parser.add_argument('--fps', type=int, default=60, help='Frame-rate cap, 0 for uncapped')
+    parser.add_argument('--stats', action='store_true', help='Print frame-time statistics on exit')
+    parser.add_argument('--size', type=int, default=8, help='Side of the square board')
+    args = parser.parse_args()
+
     window_size = (800, 600)
-    grid_size = 8
-    cell_size = 50
-    
+    grid_size = args.size
+    # Shrink the cells of large boards so the board and the hotbar below it fit the window
+    cell_size = max(1, min(50, (window_size[1] - 2 * (HOTBAR_SHAPE_SIZE + HOTBAR_GAP)) // grid_size))
+
     view = Visualization(window_size, grid_size, cell_size)
-    view.run()
\ No newline at end of file
+    stats = view.run(args.fps, stats=FrameStats(args.fps) if args.stats else None)
+    if stats is not None:
+        print(stats.summary())